@@ -1,29 +1,57 @@
+import os
 import time
 import hmac
 import hashlib
-import urllib.request
 import urllib.parse
-import urllib.error
 import json
 import logging
+import asyncio
+import threading
+from transport import PooledTransport, AsyncTransport
+from market_cache import MarketDataCache
+from rate_limiter import ORDER, READ
 
 logger = logging.getLogger(__name__)
 
-class RoostooClient:
-    """Client for interacting with the Roostoo mock exchange API"""
+# Event loop shared by all sync clients in this process, run on a daemon thread
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+
+def _get_background_loop():
+    """Return the process-wide event loop used to drive sync client calls"""
+    global _loop, _loop_pid
+    with _loop_lock:
+        # Threads don't survive a fork (e.g. gunicorn workers), so start a new loop per process
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name="roostoo-client-loop", daemon=True).start()
+        return _loop
+
+class AsyncRoostooClient:
+    """Asyncio client for interacting with the Roostoo mock exchange API"""
     
-    def __init__(self, api_key, secret_key, base_url="https://mock-api.roostoo.com"):
+    def __init__(self, api_key, secret_key, base_url="https://mock-api.roostoo.com", transport=None, timeout=10.0, max_connections=4, limiter=None):
         """
-        Initialize the Roostoo API client
+        Initialize the async Roostoo API client
         
         Args:
             api_key (str): API key for authenticating with the Roostoo API
             secret_key (str): Secret key for signing requests
             base_url (str): Base URL for the API
+            transport (Transport, optional): HTTP transport. Defaults to a keep-alive connection pool.
+            timeout (float, optional): Connect/read timeout in seconds for the default transport. Defaults to 10.
+            max_connections (int, optional): Keep-alive pool size for the default transport. Defaults to 4.
+            limiter (RequestLimiter, optional): Request budgets to enforce. Defaults to None (unlimited).
         """
         self.api_key = api_key
+        self.limiter = limiter
         self.secret_key = secret_key
         self.base_url = base_url
+        self.transport = transport or PooledTransport(timeout=timeout, max_connections=max_connections)
+        # Blocking transports run on a thread pool sized to the connection pool
+        self.async_transport = AsyncTransport(self.transport, max_workers=max_connections)
         
     def _generate_signature(self, params):
         """Generate HMAC-SHA256 signature for authentication
@@ -45,38 +73,89 @@ class RoostooClient:
         ).hexdigest()
         
         return signature
+    
+    async def _request(self, method, path, params=None, signed=False, priority=READ):
+        """Send a request through the transport and decode the JSON response
         
-    def get_server_time(self):
+        Args:
+            method (str): "GET" (params in the query string) or "POST" (form body)
+            path (str): Endpoint path, e.g. "/v3/ticker"
+            params (dict, optional): Request parameters. Defaults to None.
+            signed (bool, optional): Add the API key and HMAC signature headers. Defaults to False.
+            priority (int, optional): Rate limiter priority, ORDER or READ. Defaults to READ.
+            
+        Returns:
+            dict: Decoded JSON response
+            
+        Raises:
+            RateLimitExceeded: If the limiter sheds the request
+        """
+        if self.limiter is not None:
+            waited = await self.limiter.acquire("signed" if signed else "public", priority)
+            if waited and params and "timestamp" in params:
+                # Requests are signed with their timestamp, which must not be stale after queueing
+                params["timestamp"] = type(params["timestamp"])(int(time.time() * 1000))
+        
+        url = f"{self.base_url}{path}"
+        headers = {}
+        body = None
+        
+        if signed:
+            headers["RST-API-KEY"] = self.api_key
+            headers["MSG-SIGNATURE"] = self._generate_signature(params)
+        
+        if method == "POST":
+            # Encode data for POST request
+            body = urllib.parse.urlencode(params or {}).encode('utf-8')
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        elif params:
+            # Build URL with query params
+            url = f"{url}?{urllib.parse.urlencode(params)}"
+        
+        response = await self.async_transport.request(method, url, headers, body)
+        return json.loads(response.decode('utf-8'))
+    
+    def get_metrics(self):
+        """Return per-endpoint latency and connection reuse counters
+        
+        Returns:
+            dict: Transport metrics snapshot
+        """
+        return self.transport.metrics.snapshot()
+    
+    def get_rate_limit_stats(self):
+        """Return request budget counters (empty without a limiter)"""
+        return self.limiter.stats() if self.limiter is not None else {}
+    
+    def close(self):
+        """Close any pooled connections"""
+        self.async_transport.close()
+        
+    async def get_server_time(self):
         """Fetch server time
         
         Returns:
             dict: Server time response
         """
-        url = f"{self.base_url}/v3/serverTime"
-        
         try:
-            with urllib.request.urlopen(url) as response:
-                return json.loads(response.read().decode('utf-8'))
+            return await self._request("GET", "/v3/serverTime")
         except Exception as e:
             logger.error(f"Error fetching server time: {str(e)}")
             return {"Success": False, "ErrMsg": str(e)}
     
-    def get_exchange_info(self):
+    async def get_exchange_info(self):
         """Fetch exchange information
         
         Returns:
             dict: Exchange information response
         """
-        url = f"{self.base_url}/v3/exchangeInfo"
-        
         try:
-            with urllib.request.urlopen(url) as response:
-                return json.loads(response.read().decode('utf-8'))
+            return await self._request("GET", "/v3/exchangeInfo")
         except Exception as e:
             logger.error(f"Error fetching exchange info: {str(e)}")
             return {"Success": False, "ErrMsg": str(e)}
     
-    def get_ticker(self, pair=None):
+    async def get_ticker(self, pair=None):
         """Fetch market ticker data
         
         Args:
@@ -92,18 +171,13 @@ class RoostooClient:
         if pair:
             params["pair"] = pair
         
-        # Build URL with query params
-        query_string = urllib.parse.urlencode(params)
-        url = f"{self.base_url}/v3/ticker?{query_string}"
-        
         try:
-            with urllib.request.urlopen(url) as response:
-                return json.loads(response.read().decode('utf-8'))
+            return await self._request("GET", "/v3/ticker", params)
         except Exception as e:
             logger.error(f"Error fetching ticker data: {str(e)}")
             return {"Success": False, "ErrMsg": str(e)}
     
-    def get_balance(self):
+    async def get_balance(self):
         """Fetch wallet balance
         
         Returns:
@@ -114,26 +188,13 @@ class RoostooClient:
         
         params = {"timestamp": timestamp}
         
-        # Generate signature
-        signature = self._generate_signature(params)
-        
-        # Build URL with query params
-        query_string = urllib.parse.urlencode(params)
-        url = f"{self.base_url}/v3/balance?{query_string}"
-        
-        # Create request with headers
-        req = urllib.request.Request(url)
-        req.add_header("RST-API-KEY", self.api_key)
-        req.add_header("MSG-SIGNATURE", signature)
-        
         try:
-            with urllib.request.urlopen(req) as response:
-                return json.loads(response.read().decode('utf-8'))
+            return await self._request("GET", "/v3/balance", params, signed=True)
         except Exception as e:
             logger.error(f"Error fetching balance: {str(e)}")
             return {"Success": False, "ErrMsg": str(e)}
     
-    def place_order(self, pair="BTC/USD", side="BUY", quantity=0.01, price=None):
+    async def place_order(self, pair="BTC/USD", side="BUY", quantity=0.01, price=None):
         """Place an order on the exchange
         
         Args:
@@ -145,8 +206,6 @@ class RoostooClient:
         Returns:
             dict: Order response
         """
-        url = f"{self.base_url}/v3/place_order"
-        
         # Get current timestamp in milliseconds
         timestamp = int(time.time() * 1000)
         
@@ -165,37 +224,26 @@ class RoostooClient:
         else:
             params["type"] = "MARKET"
         
-        # Generate signature
-        signature = self._generate_signature(params)
-        
-        # Encode data for POST request
-        data = urllib.parse.urlencode(params).encode('utf-8')
-        
-        # Create request with headers
-        req = urllib.request.Request(url, data=data, method="POST")
-        req.add_header("Content-Type", "application/x-www-form-urlencoded")
-        req.add_header("RST-API-KEY", self.api_key)
-        req.add_header("MSG-SIGNATURE", signature)
-        
         try:
-            with urllib.request.urlopen(req) as response:
-                return json.loads(response.read().decode('utf-8'))
+            return await self._request("POST", "/v3/place_order", params, signed=True, priority=ORDER)
         except Exception as e:
             logger.error(f"Error placing order: {str(e)}")
             return {"Success": False, "ErrMsg": str(e)}
     
-    def query_order(self, order_id=None, pair=None):
+    async def query_order(self, order_id=None, pair=None, offset=None, limit=None, pending_only=None, fresh=False):
         """Query order status
         
         Args:
             order_id (int, optional): Order ID. Defaults to None.
             pair (str, optional): Trading pair. Defaults to None.
+            offset (int, optional): Orders to skip, newest first. Defaults to None.
+            limit (int, optional): Orders per response (exchange default 100). Defaults to None.
+            pending_only (bool, optional): Only return orders that are still open. Defaults to None.
+            fresh (bool, optional): Bypass any response cache (this client has none). Defaults to False.
             
         Returns:
             dict: Order status response
         """
-        url = f"{self.base_url}/v3/query_order"
-        
         # Get current timestamp in milliseconds
         timestamp = int(time.time() * 1000)
         
@@ -208,26 +256,22 @@ class RoostooClient:
         if pair:
             params["pair"] = pair
         
-        # Generate signature
-        signature = self._generate_signature(params)
+        if offset:
+            params["offset"] = str(offset)
         
-        # Encode data for POST request
-        data = urllib.parse.urlencode(params).encode('utf-8')
+        if limit:
+            params["limit"] = str(limit)
         
-        # Create request with headers
-        req = urllib.request.Request(url, data=data, method="POST")
-        req.add_header("Content-Type", "application/x-www-form-urlencoded")
-        req.add_header("RST-API-KEY", self.api_key)
-        req.add_header("MSG-SIGNATURE", signature)
+        if pending_only is not None:
+            params["pending_only"] = "TRUE" if pending_only else "FALSE"
         
         try:
-            with urllib.request.urlopen(req) as response:
-                return json.loads(response.read().decode('utf-8'))
+            return await self._request("POST", "/v3/query_order", params, signed=True)
         except Exception as e:
             logger.error(f"Error querying order: {str(e)}")
             return {"Success": False, "ErrMsg": str(e)}
     
-    def cancel_order(self, pair="BTC/USD"):
+    async def cancel_order(self, pair="BTC/USD"):
         """Cancel orders for a trading pair
         
         Args:
@@ -236,8 +280,6 @@ class RoostooClient:
         Returns:
             dict: Cancellation response
         """
-        url = f"{self.base_url}/v3/cancel_order"
-        
         # Get current timestamp in milliseconds
         timestamp = int(time.time() * 1000)
         
@@ -247,28 +289,18 @@ class RoostooClient:
             "pair": pair
         }
         
-        # Generate signature
-        signature = self._generate_signature(params)
-        
-        # Encode data for POST request
-        data = urllib.parse.urlencode(params).encode('utf-8')
-        
-        # Create request with headers
-        req = urllib.request.Request(url, data=data, method="POST")
-        req.add_header("Content-Type", "application/x-www-form-urlencoded")
-        req.add_header("RST-API-KEY", self.api_key)
-        req.add_header("MSG-SIGNATURE", signature)
-        
         try:
-            with urllib.request.urlopen(req) as response:
-                return json.loads(response.read().decode('utf-8'))
+            return await self._request("POST", "/v3/cancel_order", params, signed=True, priority=ORDER)
         except Exception as e:
             logger.error(f"Error cancelling order: {str(e)}")
             return {"Success": False, "ErrMsg": str(e)}
     
-    def pending_count(self):
+    async def pending_count(self, fresh=False):
         """Get count of pending orders
         
+        Args:
+            fresh (bool, optional): Bypass any response cache (this client has none). Defaults to False.
+        
         Returns:
             dict: Pending order count response
         """
@@ -278,21 +310,166 @@ class RoostooClient:
         # Build params dict
         params = {"timestamp": str(timestamp)}
         
-        # Generate signature
-        signature = self._generate_signature(params)
-        
-        # Build URL with query params
-        query_string = urllib.parse.urlencode(params)
-        url = f"{self.base_url}/v3/pending_count?{query_string}"
-        
-        # Create request with headers
-        req = urllib.request.Request(url)
-        req.add_header("RST-API-KEY", self.api_key)
-        req.add_header("MSG-SIGNATURE", signature)
-        
         try:
-            with urllib.request.urlopen(req) as response:
-                return json.loads(response.read().decode('utf-8'))
+            return await self._request("GET", "/v3/pending_count", params, signed=True)
         except Exception as e:
             logger.error(f"Error fetching pending count: {str(e)}")
-            return {"Success": False, "ErrMsg": str(e)}
\ No newline at end of file
+            return {"Success": False, "ErrMsg": str(e)}
+    
+    async def get_snapshot(self, pair=None, include_pending=False):
+        """Fetch ticker, balance and (optionally) pending order count concurrently
+        
+        The reads are independent, so the total latency is that of the slowest
+        call rather than the sum of all of them.
+        
+        Args:
+            pair (str, optional): Trading pair for the ticker. Defaults to None (all pairs).
+            include_pending (bool, optional): Also fetch the pending order count. Defaults to False.
+            
+        Returns:
+            dict: {"ticker": ..., "balance": ..., "pending": ...} with the individual responses
+        """
+        calls = [self.get_ticker(pair), self.get_balance()]
+        if include_pending:
+            calls.append(self.pending_count())
+        results = await asyncio.gather(*calls)
+        return {
+            "ticker": results[0],
+            "balance": results[1],
+            "pending": results[2] if include_pending else None
+        }
+
+class CachedAsyncRoostooClient(AsyncRoostooClient):
+    """AsyncRoostooClient that serves reads from a shared MarketDataCache
+    
+    Orders bypass the cache and invalidate the account-dependent entries. Order
+    tracking reads with ``fresh=True`` so fills and cancels are seen on the next poll.
+    """
+    
+    def __init__(self, api_key, secret_key, base_url="https://mock-api.roostoo.com", transport=None, timeout=10.0, max_connections=4, cache=None, limiter=None):
+        super(CachedAsyncRoostooClient, self).__init__(api_key, secret_key, base_url, transport, timeout, max_connections, limiter)
+        self.cache = cache or MarketDataCache()
+    
+    async def get_exchange_info(self):
+        return await self.cache.get("exchange_info", None, super(CachedAsyncRoostooClient, self).get_exchange_info)
+    
+    async def get_ticker(self, pair=None):
+        parent = super(CachedAsyncRoostooClient, self)
+        return await self.cache.get("ticker", pair, lambda: parent.get_ticker(pair))
+    
+    async def get_balance(self):
+        return await self.cache.get("balance", None, super(CachedAsyncRoostooClient, self).get_balance)
+    
+    async def pending_count(self, fresh=False):
+        parent = super(CachedAsyncRoostooClient, self)
+        if fresh:
+            return await parent.pending_count()
+        return await self.cache.get("pending_count", None, parent.pending_count)
+    
+    async def query_order(self, order_id=None, pair=None, offset=None, limit=None, pending_only=None, fresh=False):
+        parent = super(CachedAsyncRoostooClient, self)
+        if fresh:
+            return await parent.query_order(order_id, pair, offset, limit, pending_only)
+        return await self.cache.get("query_order", (order_id, pair, offset, limit, pending_only),
+                                    lambda: parent.query_order(order_id, pair, offset, limit, pending_only))
+    
+    async def place_order(self, pair="BTC/USD", side="BUY", quantity=0.01, price=None):
+        result = await super(CachedAsyncRoostooClient, self).place_order(pair, side, quantity, price)
+        self.cache.invalidate("balance", "pending_count", "query_order")
+        return result
+    
+    async def cancel_order(self, pair="BTC/USD"):
+        result = await super(CachedAsyncRoostooClient, self).cancel_order(pair)
+        self.cache.invalidate("balance", "pending_count", "query_order")
+        return result
+
+class RoostooClient:
+    """Client for interacting with the Roostoo mock exchange API
+    
+    Thin blocking wrapper that runs AsyncRoostooClient coroutines on a shared
+    background event loop.
+    """
+    
+    def __init__(self, api_key, secret_key, base_url="https://mock-api.roostoo.com", transport=None, timeout=10.0, max_connections=4, cache=None, limiter=None):
+        """
+        Initialize the Roostoo API client
+        
+        Args:
+            api_key (str): API key for authenticating with the Roostoo API
+            secret_key (str): Secret key for signing requests
+            base_url (str): Base URL for the API
+            transport (Transport, optional): HTTP transport. Defaults to a keep-alive connection pool.
+            timeout (float, optional): Connect/read timeout in seconds for the default transport. Defaults to 10.
+            max_connections (int, optional): Keep-alive pool size for the default transport. Defaults to 4.
+            cache (MarketDataCache, optional): Serve reads through this TTL cache. Defaults to None (no caching).
+            limiter (RequestLimiter, optional): Request budgets to enforce. Defaults to None (unlimited).
+        """
+        if cache is not None:
+            self.async_client = CachedAsyncRoostooClient(api_key, secret_key, base_url, transport, timeout, max_connections, cache, limiter)
+        else:
+            self.async_client = AsyncRoostooClient(api_key, secret_key, base_url, transport, timeout, max_connections, limiter)
+        self.cache = cache
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.base_url = base_url
+        self.transport = self.async_client.transport
+    
+    def _run(self, coro):
+        """Run a client coroutine to completion from synchronous code"""
+        return asyncio.run_coroutine_threadsafe(coro, _get_background_loop()).result()
+    
+    def _generate_signature(self, params):
+        """Generate HMAC-SHA256 signature for authentication"""
+        return self.async_client._generate_signature(params)
+    
+    def get_metrics(self):
+        """Return per-endpoint latency and connection reuse counters"""
+        return self.async_client.get_metrics()
+    
+    def get_cache_stats(self):
+        """Return cache hit/miss counters per endpoint (empty without a cache)"""
+        return self.cache.stats() if self.cache is not None else {}
+    
+    def get_rate_limit_stats(self):
+        """Return request budget counters (empty without a limiter)"""
+        return self.async_client.get_rate_limit_stats()
+    
+    def close(self):
+        """Close any pooled connections"""
+        self.async_client.close()
+    
+    def get_server_time(self):
+        """Fetch server time"""
+        return self._run(self.async_client.get_server_time())
+    
+    def get_exchange_info(self):
+        """Fetch exchange information"""
+        return self._run(self.async_client.get_exchange_info())
+    
+    def get_ticker(self, pair=None):
+        """Fetch market ticker data"""
+        return self._run(self.async_client.get_ticker(pair))
+    
+    def get_balance(self):
+        """Fetch wallet balance"""
+        return self._run(self.async_client.get_balance())
+    
+    def place_order(self, pair="BTC/USD", side="BUY", quantity=0.01, price=None):
+        """Place an order on the exchange"""
+        return self._run(self.async_client.place_order(pair, side, quantity, price))
+    
+    def query_order(self, order_id=None, pair=None, offset=None, limit=None, pending_only=None, fresh=False):
+        """Query order status (``fresh`` bypasses the cache)"""
+        return self._run(self.async_client.query_order(order_id, pair, offset, limit, pending_only, fresh))
+    
+    def cancel_order(self, pair="BTC/USD"):
+        """Cancel orders for a trading pair"""
+        return self._run(self.async_client.cancel_order(pair))
+    
+    def pending_count(self, fresh=False):
+        """Get count of pending orders (``fresh`` bypasses the cache)"""
+        return self._run(self.async_client.pending_count(fresh))
+    
+    def get_snapshot(self, pair=None, include_pending=False):
+        """Fetch ticker, balance and (optionally) pending order count concurrently"""
+        return self._run(self.async_client.get_snapshot(pair, include_pending))
@@ -1,152 +1,103 @@
 import os
 import logging
-from flask import Flask, render_template, request, jsonify, flash, session
-import threading
-import time
+from flask import Flask, render_template, request, jsonify, flash, session, Response
 from datetime import datetime, timedelta
-from config import API_KEY, SECRET_KEY, BASE_URL
+from config import (API_KEY, SECRET_KEY, BASE_URL, API_TIMEOUT, API_POOL_SIZE, STREAM_INTERVALS,
+                    DATABASE_URL, TRADE_HISTORY_PAGE_SIZE, TRADE_HISTORY_MAX_PAGE_SIZE)
 from api_client import RoostooClient
+from market_cache import MarketDataCache
+from rate_limiter import RequestLimiter
+from trader_state import TraderState
+from event_stream import EventBroadcaster
+from database import db, create_tables, ENGINE_OPTIONS
+from trade_store import TradeWriter, trades_page, trades_after, last_trade_id
+from order_sync import OrderSync, order_record
+from order_manager import OrderManager, is_final_execution
+from metrics import REGISTRY, CONTENT_TYPE, family, component_families, render
+from structured_logging import setup_logging
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# Set up logging: JSON records written by a background thread (LOG_LEVEL, LOG_FORMAT)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "default_secret_key_for_dev")
+app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = ENGINE_OPTIONS
+db.init_app(app)
 
-# Initialize API client
-api_client = RoostooClient(API_KEY, SECRET_KEY, BASE_URL)
+with app.app_context():
+    create_tables(db.engine)
+    # Trades recorded by this worker (manual trades, exchange sync) go through the buffered writer
+    trade_writer = TradeWriter(db.engine)
 
-# Trading environment variables
-is_trading_active = False
-trader_thread = None
-trade_history = []
+# Initialize API client; dashboard endpoints share one cache and one request budget
+market_cache = MarketDataCache()
+api_client = RoostooClient(API_KEY, SECRET_KEY, BASE_URL, timeout=API_TIMEOUT,
+                           max_connections=API_POOL_SIZE, cache=market_cache, limiter=RequestLimiter())
 
-def start_trading_thread():
-    """Function to run trading in background thread"""
-    global is_trading_active
-    try:
-        logger.info("Starting trading thread...")
-        while is_trading_active:
-            # Execute trading logic
-            execute_trading_step()
-            # Very short interval to see trading activity quickly (10 seconds)
-            time.sleep(10)  
-    except Exception as e:
-        logger.error(f"Error in trading thread: {str(e)}")
-        is_trading_active = False
-        logger.info("Trading thread stopped due to error")
+# Exchange orders are copied into the trade history incrementally (see order_sync.py)
+order_sync = OrderSync(api_client, trade_writer)
 
-def execute_trading_step():
-    """Execute a trading step based on market conditions"""
-    global trade_history
-    try:
-        logger.info("Executing trading step...")
-        
-        # Get current market data
-        market_data = api_client.get_ticker("BTC/USD")
-        
-        if "Success" not in market_data or not market_data.get("Success"):
-            logger.error(f"Failed to get market data: {market_data.get('ErrMsg', 'Unknown error')}")
-            return
-        
-        # Get current wallet balance
-        balance_data = api_client.get_balance()
-        
-        if "Success" not in balance_data or not balance_data.get("Success"):
-            logger.error(f"Failed to get wallet balance: {balance_data.get('ErrMsg', 'Unknown error')}")
-            return
-        
-        # Extract price and balance information
-        if "Data" not in market_data or "BTC/USD" not in market_data["Data"]:
-            logger.error(f"Market data missing expected structure: {market_data}")
-            return
-            
-        price_data = market_data["Data"]["BTC/USD"]
-        current_price = price_data["LastPrice"]
-        
-        logger.info(f"Current BTC price: ${current_price}")
-        
-        # Wallet data could be in different formats depending on API version
-        wallet_data = balance_data.get("Wallet", balance_data.get("SpotWallet", {}))
-        btc_balance = wallet_data.get("BTC", {}).get("Free", 0)
-        usd_balance = wallet_data.get("USD", {}).get("Free", 0)
-        
-        logger.info(f"Current balance - BTC: {btc_balance}, USD: {usd_balance}")
-        
-        # We'll implement a more advanced trading strategy using a simple model
-        # For now, let's force a trade on every cycle to test the trading functionality
-        
-        # Decide whether to buy or sell based on current holdings and a model-like decision
-        # In a real model this would be based on ML predictions
-        timestamp = int(time.time())
-        should_buy = (timestamp % 60 < 30)  # Buy in the first 30 seconds of each minute
-        
-        logger.info(f"Model decision - Should buy: {should_buy}")
-        
-        if should_buy and usd_balance > current_price * 0.01:  # BUY
-            quantity = 0.01  # Fixed quantity for demonstration
-            logger.info(f"Model suggests BUY - Attempting to BUY {quantity} BTC at ${current_price:.2f}")
-            
-            result = api_client.place_order("BTC/USD", "BUY", quantity)
-            logger.info(f"API response for BUY order: {result}")
-            
-            if result.get("Success", False):
-                logger.info(f"Successfully executed BUY: {quantity} BTC at ${current_price:.2f}")
-                
-                # Record trade in history
-                order_detail = result.get("OrderDetail", {})
-                trade_record = {
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "pair": order_detail.get("Pair", "BTC/USD"),
-                    "side": "BUY",
-                    "price": current_price,
-                    "quantity": quantity,
-                    "total": quantity * current_price,
-                    "status": order_detail.get("Status", "FILLED"),
-                    "order_id": order_detail.get("OrderID", f"local-{int(time.time())}")
-                }
-                trade_history.append(trade_record)
-                logger.info(f"Added trade to history: {trade_record}")
-            else:
-                logger.error(f"Failed to execute BUY: {result.get('ErrMsg', 'Unknown error')}")
-                
-        elif not should_buy and btc_balance >= 0.01:  # SELL
-            quantity = 0.01  # Fixed quantity for demonstration
-            logger.info(f"Model suggests SELL - Attempting to SELL {quantity} BTC at ${current_price:.2f}")
-            
-            result = api_client.place_order("BTC/USD", "SELL", quantity)
-            logger.info(f"API response for SELL order: {result}")
-            
-            if result.get("Success", False):
-                logger.info(f"Successfully executed SELL: {quantity} BTC at ${current_price:.2f}")
-                
-                # Record trade in history
-                order_detail = result.get("OrderDetail", {})
-                trade_record = {
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "pair": order_detail.get("Pair", "BTC/USD"),
-                    "side": "SELL",
-                    "price": current_price,
-                    "quantity": quantity,
-                    "total": quantity * current_price,
-                    "status": order_detail.get("Status", "FILLED"),
-                    "order_id": order_detail.get("OrderID", f"local-{int(time.time())}")
-                }
-                trade_history.append(trade_record)
-                logger.info(f"Added trade to history: {trade_record}")
-            else:
-                logger.error(f"Failed to execute SELL: {result.get('ErrMsg', 'Unknown error')}")
-        else:
-            if should_buy:
-                logger.info(f"Model suggested BUY but insufficient USD balance: {usd_balance}")
-            else:
-                logger.info(f"Model suggested SELL but insufficient BTC balance: {btc_balance}")
+# Manual orders are tracked until they fill or are canceled; only executed quantity is recorded
+order_manager = OrderManager(api_client)
 
-    except Exception as e:
-        logger.error(f"Error executing trading step: {str(e)}")
+def _record_order_event(event, order):
+    if is_final_execution(event, order):
+        trade_writer.add_trade(order_record(order))
+
+order_manager.add_listener(_record_order_event)
+
+# Trading runs in the dedicated trader process (trader.py); web workers only share its state
+trader_state = TraderState()
+
+def trading_status_payload():
+    """Trader status as served by /api/trading-status and the event stream"""
+    status = trader_state.status()
+    return {
+        "is_active": status["is_active"],
+        "requested": status["requested"],
+        "environment_ready": True,
+        "trader_ready": status["trader_ready"],
+        "cycles": status.get("cycles", 0),
+        "last_cycle": status.get("last_cycle"),
+        "schedules": status.get("schedules", {})
+    }
+
+class _NewTrades:
+    """Event source returning the trades stored since the previous call"""
+    
+    def __init__(self):
+        self.last_id = last_trade_id(trade_writer.engine)
+    
+    def __call__(self):
+        order_sync.sync()
+        order_manager.poll()
+        records = trades_after(trade_writer.engine, self.last_id)
+        if not records:
+            return None
+        self.last_id = records[-1]["id"]
+        return records
+
+def _successful(fetch):
+    """Wrap an exchange call so failed responses are not pushed to dashboards"""
+    def poll():
+        response = fetch()
+        return response if response.get("Success") else None
+    return poll
+
+# One upstream producer per worker pushes dashboard updates to every open stream
+event_broadcaster = EventBroadcaster()
+event_broadcaster.add_source("ticker", STREAM_INTERVALS["ticker"], _successful(lambda: api_client.get_ticker("BTC/USD")))
+event_broadcaster.add_source("balance", STREAM_INTERVALS["balance"], _successful(api_client.get_balance))
+event_broadcaster.add_source("status", STREAM_INTERVALS["status"], trading_status_payload, only_changes=True)
+event_broadcaster.add_source("trades", STREAM_INTERVALS["trades"], _NewTrades(), replay=False)
+
+# Component stats are read when /metrics is scraped, so they cost nothing in between
+REGISTRY.add_collector(lambda: component_families(
+    cache=api_client.get_cache_stats(), rate_limits=api_client.get_rate_limit_stats(), storage=trade_writer.stats(),
+    orders=order_manager.stats(), order_sync=order_sync.stats(), stream=event_broadcaster.stats()))
 
 @app.route('/')
 def index():
@@ -187,15 +138,12 @@ def get_wallet_balance():
 @app.route('/api/start-trading', methods=['POST'])
 def start_trading():
     """API endpoint to start automated trading"""
-    global trader_thread, is_trading_active
-    
     try:
-        # Start trading thread if not already running
-        if not is_trading_active:
-            is_trading_active = True
-            trader_thread = threading.Thread(target=start_trading_thread)
-            trader_thread.daemon = True
-            trader_thread.start()
+        # The trader process picks up the request on its next control poll
+        if not trader_state.trading_requested():
+            trader_state.request_trading(True)
+            if not trader_state.status()["trader_ready"]:
+                logger.warning("Trading requested but no trader process is running")
             flash('Trading bot started successfully!', 'success')
             return jsonify({"success": True, "message": "Trading bot started"})
         else:
@@ -208,10 +156,8 @@ def start_trading():
 @app.route('/api/stop-trading', methods=['POST'])
 def stop_trading():
     """API endpoint to stop automated trading"""
-    global is_trading_active
-    
     try:
-        is_trading_active = False
+        trader_state.request_trading(False)
         flash('Trading bot stopped successfully!', 'success')
         return jsonify({"success": True, "message": "Trading bot stopped"})
     except Exception as e:
@@ -226,21 +172,11 @@ def execute_manual_trade():
         side = request.form.get('side', 'BUY')
         quantity = float(request.form.get('quantity', 0.01))
         
-        # Execute the trade using the API client
-        result = api_client.place_order(pair, side, quantity)
+        # Execute the trade; the order manager records it once the exchange reports it filled
+        result = order_manager.place_order(pair, side, quantity)
         
         if result.get("Success", False):
-            # Record the trade in history
-            order_detail = result.get("OrderDetail", {})
-            trade_history.append({
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "pair": order_detail.get("Pair", pair),
-                "side": side,
-                "price": order_detail.get("Price", 0),
-                "quantity": quantity,
-                "total": quantity * order_detail.get("Price", 0),
-                "status": order_detail.get("Status", "FILLED")
-            })
+            trade_writer.flush()  # The dashboard reloads the history right away
             
             flash(f'Trade executed successfully: {side} {quantity} {pair}', 'success')
             return jsonify({"success": True, "data": result})
@@ -257,59 +193,70 @@ def execute_manual_trade():
 @app.route('/api/trading-status')
 def trading_status():
     """API endpoint to get trading bot status"""
-    global is_trading_active
+    return jsonify(trading_status_payload())
+
+@app.route('/api/stream')
+def event_stream():
+    """Server-Sent Events: ticker, balance, status and new trades for the dashboard"""
+    subscription = event_broadcaster.subscribe()
+    
+    def generate():
+        try:
+            for chunk in subscription.events():
+                yield chunk
+        finally:
+            event_broadcaster.unsubscribe(subscription)
     
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/cache-stats')
+def cache_stats():
+    """API endpoint to get exchange cache hit/miss counters"""
     return jsonify({
-        "is_active": is_trading_active,
-        "environment_ready": True,
-        "trader_ready": True
+        "success": True,
+        "data": {
+            "cache": api_client.get_cache_stats(),
+            "transport": api_client.get_metrics(),
+            "rate_limits": api_client.get_rate_limit_stats(),
+            "stream": event_broadcaster.stats(),
+            "storage": trade_writer.stats(),
+            "order_sync": order_sync.stats(),
+            "orders": order_manager.stats()
+        }
     })
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint: this worker's metrics plus the ones last published by the trader"""
+    status = trader_state.status()
+    trader_families = trader_state.metrics() + component_families(
+        rate_limits=status.get("rate_limits"), storage=status.get("storage"), orders=status.get("orders"),
+        portfolio=status.get("portfolio"))
+    trader_families.append(family("trader_up", "gauge", "Whether the trader process heartbeat is recent",
+                                  [("trader_up", {}, int(status["trader_ready"]))]))
+    text = render([(REGISTRY.collect(), {"process": "web", "worker": str(os.getpid())}),
+                   (trader_families, {"process": "trader"})])
+    return Response(text, content_type=CONTENT_TYPE)
+
 @app.route('/api/trade-history')
 def get_trade_history():
-    """API endpoint to get trade history"""
-    global trade_history
-    
+    """API endpoint to get one page of trade history, newest page first"""
     try:
-        logger.info("Fetching trade history...")
+        pair = request.args.get('pair', 'BTC/USD')
+        cursor = request.args.get('cursor')
+        per_page = request.args.get('per_page', TRADE_HISTORY_PAGE_SIZE, type=int)
+        per_page = min(max(per_page, 1), TRADE_HISTORY_MAX_PAGE_SIZE)
         
-        # Always try to fetch the latest orders from the API
-        orders = api_client.query_order(pair="BTC/USD")
-        logger.info(f"API order query response: {orders}")
+        # Older pages do not change, so only the newest one pulls new orders from the exchange
+        if not cursor:
+            order_sync.sync()
+            order_manager.poll()
         
-        # If we have a successful response with orders
-        if orders.get("Success", False) and "OrderList" in orders:
-            # Create a new history list starting with existing trades
-            updated_history = list(trade_history) if trade_history else []
-            
-            # Add new orders from API that aren't already in our history
-            existing_order_ids = [trade.get("order_id") for trade in updated_history if "order_id" in trade]
-            
-            for order in orders["OrderList"]:
-                if order.get("Status") in ["FILLED", "PARTIALLY_FILLED"]:
-                    # Skip if we already have this order
-                    if order.get("OrderID") in existing_order_ids:
-                        continue
-                        
-                    # Add to history
-                    new_trade = {
-                        "timestamp": datetime.fromtimestamp(order.get("CreateTimestamp", 0)/1000).strftime("%Y-%m-%d %H:%M:%S"),
-                        "pair": order.get("Pair", "BTC/USD"),
-                        "side": order.get("Side", "BUY"),
-                        "price": order.get("FilledAverPrice", 0),
-                        "quantity": order.get("FilledQuantity", 0),
-                        "total": order.get("FilledQuantity", 0) * order.get("FilledAverPrice", 0),
-                        "status": order.get("Status", "FILLED"),
-                        "order_id": order.get("OrderID")
-                    }
-                    updated_history.append(new_trade)
-                    logger.info(f"Added order to history: {new_trade}")
-            
-            # Update the global trade history
-            trade_history = updated_history
+        trade_history, next_cursor = trades_page(trade_writer.engine, pair, cursor, per_page)
         
-        # If we still don't have any trades, create some sample ones for testing
-        if not trade_history:
+        # If we still don't have any trades, show some sample ones for testing (not stored)
+        if not trade_history and not cursor:
             logger.info("No trade history found, creating sample trades for testing")
             current_time = datetime.now()
             
@@ -336,8 +283,8 @@ def get_trade_history():
                 "order_id": "sample-2"
             })
         
-        logger.info(f"Returning trade history with {len(trade_history)} entries")
-        return jsonify({"success": True, "data": trade_history})
+        logger.info("Returning trade history page with %d entries", len(trade_history))
+        return jsonify({"success": True, "data": trade_history, "next_cursor": next_cursor})
     except Exception as e:
         logger.error(f"Error fetching trade history: {str(e)}")
         return jsonify({"success": False, "error": str(e)})
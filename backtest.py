@@ -0,0 +1,198 @@
+import logging
+import numpy as np
+from config import INITIAL_BALANCE, WINDOW_SIZE, REWARD_SCALING
+from vec_trading_env import ORDER_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Relative margin under which a BUY's affordability is settled by the exact scalar path,
+# so rounding differences between cumulative sums and sequential updates never flip it
+AFFORDABILITY_MARGIN = 1e-9
+
+# Smallest number of steps evaluated in one vectorized pass
+MIN_CHUNK = 256
+
+
+class BacktestResult:
+    """Portfolio path and trades of one backtest
+
+    Arrays are indexed by backtest step; step ``i`` trades at ``prices[start_step + i]``
+    exactly like the i-th ``TradingEnv.step`` after a reset.
+    """
+
+    def __init__(self, prices, balance, crypto_owned, trade_steps, trade_sides, trade_quantities,
+                 fees, initial_balance):
+        self.prices = prices
+        self.balance = balance
+        self.crypto_owned = crypto_owned
+        self.portfolio_value = balance + crypto_owned * prices
+        self.trade_steps = trade_steps
+        self.trade_sides = trade_sides  # 1 = BUY, 2 = SELL
+        self.trade_quantities = trade_quantities
+        self.fees = fees
+        self.initial_balance = initial_balance
+
+    @property
+    def rewards(self):
+        """Per-step rewards as TradingEnv computes them"""
+        previous = np.concatenate(([self.initial_balance], self.portfolio_value[:-1]))
+        return (self.portfolio_value - previous) * REWARD_SCALING
+
+    @property
+    def pnl(self):
+        """Profit and loss at the end of the backtest"""
+        final = self.portfolio_value[-1] if len(self.portfolio_value) else self.initial_balance
+        return final - self.initial_balance
+
+    @property
+    def trades(self):
+        """Executed trades as a list of dicts"""
+        return [
+            {'step': int(step), 'action': 'BUY' if side == 1 else 'SELL', 'price': float(self.prices[step]),
+             'quantity': float(quantity)}
+            for step, side, quantity in zip(self.trade_steps, self.trade_sides, self.trade_quantities)
+        ]
+
+    def summary(self):
+        """Headline statistics of the run
+
+        Returns:
+            dict: final_value, pnl, return_pct, buys, sells, fees and max_drawdown
+        """
+        value = self.portfolio_value
+        peak = np.maximum.accumulate(value) if len(value) else value
+        drawdown = float(np.max(1 - value / peak)) if len(value) else 0.0
+        return {
+            'final_value': float(value[-1]) if len(value) else self.initial_balance,
+            'pnl': float(self.pnl),
+            'return_pct': float(self.pnl / self.initial_balance * 100),
+            'buys': int(np.count_nonzero(self.trade_sides == 1)),
+            'sells': int(np.count_nonzero(self.trade_sides == 2)),
+            'fees': float(self.fees),
+            'max_drawdown': drawdown
+        }
+
+
+def _optimistic_path(prices, actions, balance, lots, order_size, fee_rate):
+    """Cash and lot path assuming every BUY is affordable
+
+    SELL closes all lots bought since the previous SELL (plus ``lots`` held at the
+    start), so the whole path is a handful of cumulative sums.
+
+    Returns:
+        tuple: (balance after each step, lots after each step, first unaffordable BUY or -1)
+    """
+    buy = actions == 1
+    sell = actions == 2
+
+    buy_cost = np.where(buy, order_size * prices * (1 + fee_rate), 0.0)
+    lots_after = lots + np.cumsum(buy)
+
+    # Lots closed by each SELL: everything held since the previous SELL
+    sell_steps = np.flatnonzero(sell)
+    held = np.diff(lots_after[sell_steps], prepend=0)
+    proceeds = np.zeros(len(actions))
+    proceeds[sell_steps] = held * order_size * prices[sell_steps] * (1 - fee_rate)
+
+    # Lots are zero right after every SELL
+    lots_after = lots_after - np.maximum.accumulate(np.where(sell, lots_after, 0))
+
+    balance_after = balance + np.cumsum(proceeds - buy_cost)
+    balance_before = balance_after + buy_cost
+    unaffordable = buy & (balance_before < buy_cost * (1 + AFFORDABILITY_MARGIN))
+    first = int(np.argmax(unaffordable)) if unaffordable.any() else -1
+    return balance_after, lots_after, first
+
+
+def backtest(prices, actions, initial_balance=INITIAL_BALANCE, start_step=WINDOW_SIZE,
+             order_size=ORDER_SIZE, fee_rate=0.0):
+    """Replay a precomputed action sequence with TradingEnv's trading rules
+
+    BUY adds ``order_size`` when the cash covers it, SELL liquidates the whole
+    position, HOLD does nothing. Runs of affordable trades are evaluated with
+    vectorized cumulative sums; only stretches where the cash runs out fall back
+    to a scalar loop, until the next SELL resets the position.
+
+    Args:
+        prices (np.ndarray): Close prices of the whole series
+        actions (np.ndarray): Actions (0 = HOLD, 1 = BUY, 2 = SELL), one per step from ``start_step``
+        initial_balance (float, optional): Starting cash. Defaults to INITIAL_BALANCE.
+        start_step (int, optional): Index of the first traded bar. Defaults to WINDOW_SIZE.
+        order_size (float, optional): Quantity bought per BUY. Defaults to ORDER_SIZE.
+        fee_rate (float, optional): Fee charged on each trade's notional. Defaults to 0.0.
+
+    Returns:
+        BacktestResult: Portfolio path and trades
+    """
+    actions = np.asarray(actions)
+    prices = np.asarray(prices, dtype=np.float64)[start_step:start_step + len(actions)]
+    if len(prices) < len(actions):
+        raise ValueError(f"{len(actions)} actions need {start_step + len(actions)} prices, got {start_step + len(prices)}")
+
+    n = len(actions)
+    balance_path = np.empty(n)
+    lots_path = np.empty(n, dtype=np.int64)
+    balance = float(initial_balance)
+    lots = 0
+    t = 0
+    chunk = MIN_CHUNK
+    while t < n:
+        # Chunks grow while trades stay affordable and shrink after a miss, keeping the
+        # total vectorized work linear even when the cash keeps running out
+        stop = min(n, t + chunk)
+        balance_after, lots_after, first = _optimistic_path(
+            prices[t:stop], actions[t:stop], balance, lots, order_size, fee_rate
+        )
+        end = stop if first < 0 else t + first
+        chunk = chunk * 2 if first < 0 else max(MIN_CHUNK, 2 * first)
+        balance_path[t:end] = balance_after[:end - t]
+        lots_path[t:end] = lots_after[:end - t]
+        if end > t:
+            balance = float(balance_path[end - 1])
+            lots = int(lots_path[end - 1])
+        t = end
+        if first < 0:
+            continue
+
+        # Cash-constrained stretch: step exactly until a SELL closes the position
+        while t < n:
+            price = prices[t]
+            action = actions[t]
+            if action == 1:
+                cost = order_size * price * (1 + fee_rate)
+                if balance >= cost:
+                    balance -= cost
+                    lots += 1
+            elif action == 2 and lots > 0:
+                balance += lots * order_size * price * (1 - fee_rate)
+                lots = 0
+            balance_path[t] = balance
+            lots_path[t] = lots
+            t += 1
+            if action == 2:
+                break
+
+    # Executed trades are the steps where the lot count changes
+    lots_before = np.concatenate(([0], lots_path[:-1]))
+    traded = lots_path != lots_before
+    trade_steps = np.flatnonzero(traded)
+    trade_sides = np.where(lots_path[trade_steps] > lots_before[trade_steps], 1, 2)
+    trade_quantities = np.abs(lots_path[trade_steps] - lots_before[trade_steps]) * order_size
+    fees = float(np.sum(trade_quantities * prices[trade_steps])) * fee_rate
+
+    return BacktestResult(prices, balance_path, lots_path * order_size, trade_steps, trade_sides,
+                          trade_quantities, fees, float(initial_balance))
+
+
+def backtest_batch(prices, actions, **kwargs):
+    """Backtest several action sequences over the same prices
+
+    Args:
+        prices (np.ndarray): Close prices of the whole series
+        actions (np.ndarray): Actions of shape (num_policies, steps)
+        **kwargs: Passed to ``backtest``
+
+    Returns:
+        list: One BacktestResult per policy
+    """
+    return [backtest(prices, policy_actions, **kwargs) for policy_actions in np.atleast_2d(actions)]
@@ -0,0 +1,67 @@
+"""Benchmark RoostooClient request latency with fresh vs pooled connections,
+and sequential vs concurrent per-cycle reads
+
+Runs against the local stub server, so it works offline.
+
+Usage: python -m benchmarks.bench_api_client [--requests N] [--latency S]
+"""
+import argparse
+import logging
+
+from api_client import RoostooClient
+from benchmarks.common import timed
+from benchmarks.stub_server import start_stub_server
+from transport import PooledTransport, UrllibTransport
+
+
+def run(client, requests):
+    """Alternate the two calls the trading loop makes every cycle"""
+    for _ in range(requests // 2):
+        client.get_ticker("BTC/USD")
+        client.get_balance()
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API client transports')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per transport (default: 2000)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Stub server delay per request in seconds')
+    parser.add_argument('--cycle-latency', type=float, default=0.02,
+                        help='Stub server delay for the cycle fan-out comparison (default: 0.02)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    server = start_stub_server(latency=args.latency)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    for name, transport in (("urllib (new connection)", UrllibTransport()),
+                            ("pooled keep-alive", PooledTransport())):
+        client = RoostooClient("key", "secret", base_url, transport=transport)
+        total, elapsed = timed(run, client, args.requests)
+        metrics = client.get_metrics()
+        if isinstance(transport, PooledTransport):
+            connections = (f"{metrics['connections_opened']} connections opened "
+                           f"(avg connect {metrics['avg_connect_ms']:.3f} ms), "
+                           f"{metrics['connections_reused']} requests reused one")
+        else:
+            connections = f"{total} connections opened (one per request)"
+        print(f"{name:>24}: {elapsed / total * 1e6:8.1f} us/request, {connections}")
+        client.close()
+
+    server.shutdown()
+
+    # Cycle reads with a realistic per-call server delay: sequential vs fanned out
+    server = start_stub_server(latency=args.cycle_latency)
+    client = RoostooClient("key", "secret", f"http://127.0.0.1:{server.server_port}")
+    cycles = 20
+    _, sequential = timed(lambda: [(client.get_ticker("BTC/USD"), client.get_balance(), client.pending_count())
+                                   for _ in range(cycles)])
+    _, concurrent = timed(lambda: [client.get_snapshot("BTC/USD", include_pending=True) for _ in range(cycles)])
+    print(f"ticker+balance+pending at {args.cycle_latency * 1000:.0f} ms/call: "
+          f"sequential {sequential / cycles * 1000:.1f} ms/cycle, concurrent {concurrent / cycles * 1000:.1f} ms/cycle")
+    client.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
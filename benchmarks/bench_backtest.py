@@ -0,0 +1,88 @@
+"""Benchmark the vectorized backtest engine against the TradingEnv step loop
+
+Also checks that both produce the same portfolio path for random policies,
+including cash-constrained ones where BUYs start failing.
+
+Usage: python -m benchmarks.bench_backtest [--rows N] [--loop-rows M] [--policies P]
+"""
+import argparse
+import logging
+import numpy as np
+
+from benchmarks.common import synthetic_ohlcv, timed
+from backtest import backtest, backtest_batch
+from trading_env import TradingEnv
+
+WINDOW_SIZE = 12
+
+
+def step_loop(data, actions, initial_balance):
+    """Replay actions through TradingEnv and collect balance, holdings and rewards"""
+    env = TradingEnv(data=data, initial_balance=initial_balance, window_size=WINDOW_SIZE)
+    env.reset()
+    balance, crypto, rewards = [], [], []
+    for action in actions:
+        _, reward, done, _ = env.step(action)
+        balance.append(env.balance)
+        crypto.append(env.crypto_owned)
+        rewards.append(reward)
+        if done:
+            break
+    return np.array(balance), np.array(crypto), np.array(rewards)
+
+
+def check_equivalence(rows):
+    """Compare engine and step loop on a few policies; returns the largest relative balance error"""
+    worst = 0.0
+    cases = [(10000, (0.4, 0.3, 0.3)), (1000, (0.2, 0.7, 0.1)), (300, (0.1, 0.85, 0.05)), (5000, (0.0, 1.0, 0.0))]
+    for seed, (initial_balance, probabilities) in enumerate(cases):
+        data = synthetic_ohlcv(rows, seed=seed)
+        actions = np.random.default_rng(seed).choice(3, len(data) - 1 - WINDOW_SIZE, p=probabilities)
+        balance, crypto, rewards = step_loop(data, actions, initial_balance)
+        result = backtest(data['close'].to_numpy(), actions, initial_balance=initial_balance, start_step=WINDOW_SIZE)
+        if not (np.allclose(crypto, result.crypto_owned, rtol=0, atol=1e-9)
+                and np.allclose(rewards, result.rewards, rtol=1e-9, atol=1e-12)):
+            raise AssertionError(f"Backtest diverged from the step loop for case {seed}")
+        worst = max(worst, float(np.max(np.abs(balance - result.balance) / initial_balance)))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the vectorized backtest engine')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Bars for the engine (default: 1000000)')
+    parser.add_argument('--loop-rows', type=int, default=20000, help='Bars for the step loop (default: 20000)')
+    parser.add_argument('--policies', type=int, default=16, help='Policies in the batch run (default: 16)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    worst = check_equivalence(5000)
+    print(f"equivalence vs TradingEnv.step: ok (max balance error {worst:.1e} of initial balance)")
+
+    rng = np.random.default_rng(0)
+    loop_data = synthetic_ohlcv(args.loop_rows)
+    loop_actions = rng.integers(0, 3, len(loop_data) - 1 - WINDOW_SIZE)
+    _, loop_time = timed(step_loop, loop_data, loop_actions, 10000)
+    loop_rate = len(loop_actions) / loop_time
+
+    data = synthetic_ohlcv(args.rows)
+    prices = data['close'].to_numpy()
+    actions = rng.integers(0, 3, len(data) - 1 - WINDOW_SIZE)
+    _, engine_time = timed(backtest, prices, actions, start_step=WINDOW_SIZE, repeat=3)
+    engine_rate = len(actions) / engine_time
+
+    # Always buying exhausts the cash, exercising the scalar fallback
+    _, constrained_time = timed(backtest, prices, np.ones_like(actions), start_step=WINDOW_SIZE)
+
+    batch = rng.integers(0, 3, (args.policies, len(actions)))
+    _, batch_time = timed(backtest_batch, prices, batch, start_step=WINDOW_SIZE)
+
+    print(f"step loop: {loop_rate:,.0f} steps/s")
+    print(f"engine:    {engine_rate:,.0f} steps/s ({engine_rate / loop_rate:.0f}x), "
+          f"{len(actions)} steps in {engine_time:.2f}s")
+    print(f"engine, cash-constrained (always BUY): {constrained_time:.2f}s")
+    print(f"batch of {args.policies} policies: {batch_time:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
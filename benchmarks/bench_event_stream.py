@@ -0,0 +1,150 @@
+"""Load test the /api/stream push channel with 1 to 500 connected dashboards
+
+The app runs in a subprocess against the local stub exchange, with the stream
+intervals shortened 10x so a few seconds show many events. For each dashboard
+count the test reports the server's CPU time, the exchange requests it made and
+the events every client received. With one upstream producer both CPU and
+exchange calls should stay flat as dashboards are added.
+
+Usage: python -m benchmarks.bench_event_stream [--clients 1 10 100 500] [--duration S]
+"""
+import os
+import sys
+import time
+import shutil
+import socket
+import argparse
+import selectors
+import tempfile
+import subprocess
+import urllib.request
+
+from benchmarks.stub_server import start_stub_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER = """
+import config
+config.STREAM_INTERVALS.update(ticker=0.5, balance=1.5, status=0.2, trades=0.5)
+import logging
+from main import app
+logging.disable(logging.WARNING)
+app.run(host="127.0.0.1", port={port}, threaded=True)
+"""
+
+# What the polling dashboard.js issued per minute and dashboard (5s, 15s, 10s, 10s loops)
+POLLING_REQUESTS_PER_MINUTE = 60 / 5 + 60 / 15 + 60 / 10 + 60 / 10
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def cpu_seconds(pid):
+    """User + system CPU time of a process from /proc"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def start_app(port, env):
+    process = subprocess.Popen([sys.executable, '-c', SERVER.format(port=port)], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/trading-status', timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("App did not start")
+
+
+class StreamClients:
+    """Many SSE connections read by one selector loop, counting received events"""
+
+    def __init__(self, port, count):
+        self.selector = selectors.DefaultSelector()
+        self.events = {}
+        self.tails = {}
+        request = (b"GET /api/stream HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                   b"Accept: text/event-stream\r\n\r\n")
+        for _ in range(count):
+            sock = socket.create_connection(('127.0.0.1', port))
+            sock.sendall(request)
+            sock.setblocking(False)
+            self.selector.register(sock, selectors.EVENT_READ)
+            self.events[sock] = 0
+            self.tails[sock] = b""
+
+    def pump(self, seconds):
+        """Read for ``seconds``; returns events received per client during that time"""
+        start = dict(self.events)
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for key, _ in self.selector.select(timeout=max(0.0, deadline - time.monotonic())):
+                sock = key.fileobj
+                data = sock.recv(65536)
+                if not data:
+                    self.selector.unregister(sock)
+                    continue
+                # Count event lines, including ones split across reads
+                data = self.tails[sock] + data
+                self.events[sock] += data.count(b"event: ")
+                self.tails[sock] = data[-6:]
+        return [self.events[sock] - start[sock] for sock in self.events]
+
+    def close(self):
+        for sock in list(self.events):
+            sock.close()
+        self.selector.close()
+
+
+def run(clients, duration, stub, env):
+    port = free_port()
+    process = start_app(port, env)
+    connections = StreamClients(port, clients)
+    try:
+        connections.pump(2.0)  # Warm-up: connect and receive the initial snapshot
+        with stub.counts_lock:
+            requests_before = sum(stub.request_counts.values())
+        cpu_before = cpu_seconds(process.pid)
+        received = connections.pump(duration)
+        cpu = cpu_seconds(process.pid) - cpu_before
+        with stub.counts_lock:
+            exchange_requests = sum(stub.request_counts.values()) - requests_before
+    finally:
+        connections.close()
+        process.terminate()
+        process.wait()
+    return cpu / duration, exchange_requests / duration, min(received), max(received)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the dashboard event stream')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 10, 100, 500],
+                        help='Connected dashboards per run (default: 1 10 100 500)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Measured seconds per run (default: 10)')
+    args = parser.parse_args()
+
+    stub = start_stub_server()
+    directory = tempfile.mkdtemp(prefix='stream_bench_')
+    env = dict(os.environ, BASE_URL=f'http://127.0.0.1:{stub.server_port}',
+               TRADER_STATE_PATH=os.path.join(directory, 'trader_state.db'))
+    try:
+        print(f"{'dashboards':>10} {'server CPU':>11} {'exchange req/s':>15} {'events/client':>14} "
+              f"{'polling req/min':>16}")
+        for clients in args.clients:
+            cpu, exchange_rate, fewest, most = run(clients, args.duration, stub, env)
+            print(f"{clients:>10} {cpu * 100:>10.1f}% {exchange_rate:>15.2f} {fewest:>6}-{most:<7} "
+                  f"{clients * POLLING_REQUESTS_PER_MINUTE:>16.0f}")
+    finally:
+        stub.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
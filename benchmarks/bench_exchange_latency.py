@@ -0,0 +1,67 @@
+"""Client throughput and tail latency against the offline exchange simulator
+
+Signed and public reads (balance, ticker, pending_count) are issued by N concurrent
+coroutines through one AsyncRoostooClient. The simulator adds a fixed latency plus
+an exponential tail and fails a fraction of requests, all from a fixed seed, so the
+percentiles are reproducible without network access.
+
+Usage: python -m benchmarks.bench_exchange_latency [--concurrency 1 4 16] [--requests N]
+       [--latency S] [--jitter S] [--error-rate P]
+"""
+import time
+import asyncio
+import logging
+import argparse
+import numpy as np
+
+from api_client import AsyncRoostooClient
+from benchmarks.exchange_simulator import ExchangeSimulator, PriceReplay, load_bars, start_simulator
+
+
+async def run(base_url, concurrency, requests):
+    client = AsyncRoostooClient("key", "secret", base_url, max_connections=concurrency)
+    calls = (client.get_ticker, client.get_balance, client.pending_count)
+    latencies, failures = [], 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal failures
+        for i in remaining:
+            start = time.perf_counter()
+            response = await calls[i % len(calls)]()
+            latencies.append(time.perf_counter() - start)
+            failures += not response.get("Success", False)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    client.close()
+    return np.array(latencies), failures, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark client latency percentiles on the exchange simulator')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16], help='Concurrent callers (default: 1 4 16)')
+    parser.add_argument('--requests', type=int, default=600, help='Requests per run (default: 600)')
+    parser.add_argument('--latency', type=float, default=0.005, help='Simulated latency in seconds (default: 0.005)')
+    parser.add_argument('--jitter', type=float, default=0.005, help='Mean exponential tail in seconds (default: 0.005)')
+    parser.add_argument('--error-rate', type=float, default=0.01, help='Fraction of failed requests (default: 0.01)')
+    args = parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    print(f"simulated latency {args.latency * 1000:.0f} ms + exp({args.jitter * 1000:.0f} ms), "
+          f"{args.error_rate:.1%} errors")
+    print(f"{'concurrency':>12} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'p99.9 ms':>9} {'failed':>7}")
+    for concurrency in args.concurrency:
+        simulator = ExchangeSimulator(PriceReplay(load_bars(["BTC/USD"])), latency=args.latency,
+                                      jitter=args.jitter, error_rate=args.error_rate, seed=0)
+        server = start_simulator(simulator)
+        latencies, failures, elapsed = asyncio.run(run(f"http://127.0.0.1:{server.server_port}",
+                                                       concurrency, args.requests))
+        p50, p99, p999 = np.percentile(latencies, [50, 99, 99.9]) * 1000
+        print(f"{concurrency:>12} {len(latencies) / elapsed:>8.0f} {p50:>8.1f} {p99:>8.1f} {p999:>9.1f} {failures:>7}")
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
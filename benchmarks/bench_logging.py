@@ -0,0 +1,93 @@
+"""Logging cost on the trading thread: synchronous f-string logging vs the queued JSON pipeline
+
+A cycle logs what TradingBot logs around an order: the placement line and the
+exchange's order payload. "sync" is the old setup, with f-strings formatted eagerly and a
+StreamHandler writing text inline. "async" is the setup_logging pipeline: lazy arguments,
+the sampled payload log, no caller lookup, and the AsyncHandler/QueueListener pair writing
+JSON from the background thread. Both write to os.devnull; the time is what the calling thread spends
+per cycle, and the async run also reports how long the writer then takes to drain its queue
+(work that happens while the trading thread waits on the exchange).
+
+Usage: python -m benchmarks.bench_logging [--cycles N]
+"""
+import os
+import time
+import logging
+import argparse
+from logging.handlers import QueueListener
+
+from structured_logging import (AsyncHandler, JsonFormatter, SamplingFilter, TEXT_FORMAT,
+                                skip_record_details, restore_record_details)
+
+ORDER_PAYLOAD = {
+    "Success": True, "ErrMsg": "",
+    "OrderDetail": {"Pair": "BTC/USD", "OrderID": 81, "Status": "FILLED", "Role": "TAKER", "ServerTimeUsage": 0.0017,
+                    "CreateTimestamp": 1760000000000, "FinishTimestamp": 1760000000001, "Side": "BUY",
+                    "Type": "MARKET", "StopType": "GTC", "Price": 68812.5, "Quantity": 0.0125, "FilledQuantity": 0.0125,
+                    "FilledAverPrice": 68812.5, "CoinChange": 0.0125, "UnitChange": 860.15625,
+                    "CommissionCoin": "USD", "CommissionChargeValue": 0.86, "CommissionPercent": 0.001}
+}
+
+
+def sync_cycle(logger, quantity, price):
+    logger.info(f"Placing BUY order for {quantity} BTC at {price}")
+    logger.info(f"BUY order executed: {ORDER_PAYLOAD}")
+
+
+def async_cycle(logger, quantity, price):
+    logger.info("Placing BUY order for %s %s at %s", quantity, "BTC", price,
+                extra={"pair": "BTC/USD", "side": "BUY", "quantity": quantity, "price": price})
+    logger.info("BUY order executed: %s", ORDER_PAYLOAD, extra={"sample": True})
+
+
+def run(name, cycles, output):
+    logger = logging.getLogger(f"bench.{name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    target = logging.StreamHandler(output)
+    listener = None
+    details = None
+    if name == "sync":
+        target.setFormatter(logging.Formatter(TEXT_FORMAT))
+        logger.addHandler(target)
+        cycle = sync_cycle
+    else:
+        target.setFormatter(JsonFormatter())
+        handler = AsyncHandler(maxsize=cycles * 2)
+        handler.addFilter(SamplingFilter())
+        # Started after the timed loop: in the trader the writer runs while the loop waits on the
+        # exchange, so only the enqueue side lands on the trading thread
+        listener = QueueListener(handler.queue, target)
+        logger.addHandler(handler)
+        cycle = async_cycle
+        details = skip_record_details()
+
+    start = time.perf_counter()
+    for i in range(cycles):
+        cycle(logger, 0.0125, 68812.5 + i)
+    elapsed = time.perf_counter() - start
+    drain = 0.0
+    if listener is not None:
+        listener.start()
+        listener.stop()
+        drain = time.perf_counter() - start - elapsed
+    logger.handlers.clear()
+    if details is not None:
+        restore_record_details(details)
+    return elapsed / cycles * 1e6, drain * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark logging overhead per trading cycle')
+    parser.add_argument('--cycles', type=int, default=20000, help='Logged cycles (default: 20000)')
+    args = parser.parse_args()
+
+    with open(os.devnull, 'w') as output:
+        print(f"{'pipeline':<8} {'us/cycle':>9} {'writer drain ms':>16}")
+        for name in ("sync", "async"):
+            per_cycle, drain = run(name, args.cycles, output)
+            print(f"{name:<8} {per_cycle:>9.1f} {drain:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
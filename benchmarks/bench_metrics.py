@@ -0,0 +1,82 @@
+"""Cost of the hot-path instrumentation: recording calls and a /metrics render
+
+Times Histogram.observe, the Histogram.time context manager and Counter.inc on
+private metrics (single thread and with contending threads), then a full
+collect + render of registries filled the way a running trader fills them. A trading
+cycle records about a dozen values (four stages, the cycle, two per exchange request
+and the scheduler lag), so the per-cycle overhead is about twelve recordings.
+
+Usage: python -m benchmarks.bench_metrics [--calls N] [--threads 1 4]
+"""
+import time
+import argparse
+import threading
+
+from metrics import Registry, Counter, Histogram, render
+
+RECORDINGS_PER_CYCLE = 12
+
+
+def per_call_ns(func, calls, threads):
+    def run():
+        for _ in range(calls):
+            func()
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) / (calls * threads) * 1e9
+
+
+def timed_block(histogram):
+    with histogram.time("predict"):
+        pass
+
+
+def filled_registry():
+    registry = Registry()
+    stages = Histogram("stage_seconds", "Stage time", ["stage"], registry=registry)
+    requests = Counter("requests", "Requests", ["endpoint", "status"], registry=registry)
+    latency = Histogram("request_seconds", "Request latency", ["endpoint"], registry=registry)
+    for i in range(1000):
+        for stage in ("fetch", "observation", "predict", "orders"):
+            stages.observe(i * 1e-5, stage)
+        for endpoint in ("/v3/ticker", "/v3/balance", "/v3/place_order", "/v3/query_order", "/v3/pending_count"):
+            requests.inc(endpoint, "200")
+            latency.observe(i * 1e-5, endpoint)
+    return registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark metric recording overhead')
+    parser.add_argument('--calls', type=int, default=200000, help='Calls per thread (default: 200000)')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4], help='Recording threads (default: 1 4)')
+    args = parser.parse_args()
+
+    registry = Registry()
+    histogram = Histogram("bench_seconds", "Benchmark", ["stage"], registry=registry)
+    counter = Counter("bench", "Benchmark", ["endpoint", "status"], registry=registry)
+    calls = {
+        "Histogram.observe": lambda: histogram.observe(0.003, "fetch"),
+        "Histogram.time": lambda: timed_block(histogram),
+        "Counter.inc": lambda: counter.inc("/v3/ticker", "200")
+    }
+    print(f"{'call':<20} {'threads':>8} {'ns/call':>8}")
+    for name, func in calls.items():
+        for threads in args.threads:
+            print(f"{name:<20} {threads:>8} {per_call_ns(func, args.calls // threads, threads):>8.0f}")
+
+    observe_ns = per_call_ns(calls["Histogram.observe"], args.calls, 1)
+    print(f"\nper trading cycle: ~{RECORDINGS_PER_CYCLE} recordings = {observe_ns * RECORDINGS_PER_CYCLE / 1000:.1f} us")
+
+    registry = filled_registry()
+    start = time.perf_counter()
+    text = render([(registry.collect(), {"process": "trader"})])
+    print(f"collect + render: {(time.perf_counter() - start) * 1000:.2f} ms for {text.count(chr(10))} lines")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark fetch_historical_data with and without the local OHLCV cache
+
+The download is simulated by a generator with a fixed delay, so this runs
+offline and shows the cost of the cached paths themselves.
+
+Usage: python -m benchmarks.bench_ohlcv_cache [--rows N] [--download-delay S]
+"""
+import sys
+import time
+import shutil
+import argparse
+import logging
+import tempfile
+import pandas as pd
+
+from benchmarks.common import synthetic_ohlcv, timed
+from ohlcv_cache import OHLCVCache, parse_duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the OHLCV cache')
+    parser.add_argument('--rows', type=int, default=200000, help='Cached 1m bars (default: 200000)')
+    parser.add_argument('--download-delay', type=float, default=2.0,
+                        help='Simulated seconds per full download (default: 2.0)')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    now = pd.Timestamp.now(tz='UTC').floor('1min')
+    bars = synthetic_ohlcv(args.rows).rename(columns=str.capitalize)
+    bars.index = pd.date_range(end=now, periods=args.rows, freq='1min', name='Datetime')
+    period = f"{args.rows // 1440}d"
+
+    downloads = []
+
+    def download(period=None, start=None):
+        downloads.append(start)
+        if start is None:
+            time.sleep(args.download_delay)
+            return bars
+        return bars[bars.index >= start]
+
+    directory = tempfile.mkdtemp(prefix='ohlcv_bench_')
+    try:
+        cache = OHLCVCache(directory)
+        _, cold = timed(cache.fetch, 'BTC-USD', period, '1m', download)
+        _, warm = timed(cache.fetch, 'BTC-USD', period, '1m', download, repeat=5)
+
+        # Stale cache: drop the newest bars so the next fetch only downloads the tail
+        cache.save('BTC-USD', '1m', bars.iloc[:-60], now - parse_duration(period))
+        _, tail = timed(cache.fetch, 'BTC-USD', period, '1m', download)
+
+        print(f"{args.rows} bars, {len(downloads)} downloads ({sum(s is not None for s in downloads)} tail-only)")
+        print(f"cold (download + write): {cold * 1000:.1f} ms")
+        print(f"warm (memory-mapped):    {warm * 1000:.1f} ms")
+        print(f"stale (tail download):   {tail * 1000:.1f} ms")
+        print(f"yfinance imported: {'yfinance' in sys.modules}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
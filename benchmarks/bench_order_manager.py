@@ -0,0 +1,118 @@
+"""Count exchange calls needed to track open orders: per-order polling vs OrderManager
+
+A fake exchange holds N resting LIMIT orders; every tick a few of them fill or are
+canceled. Per-order polling issues one query_order per open order per tick. The
+OrderManager issues a pending_count check, and a single pending_only sweep (plus one
+recent-orders page when something finished) only when the count changed.
+Events must match: every order is reported exactly once as filled or canceled.
+
+Usage: python -m benchmarks.bench_order_manager [--orders 1 10 100] [--ticks N]
+"""
+import argparse
+import logging
+import numpy as np
+
+from order_manager import OrderManager, FILL, CANCEL
+
+
+class FakeExchange:
+    """Orders that fill or cancel at random ticks; counts calls per endpoint"""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.orders = {}
+        self.next_id = 1
+        self.calls = {"place_order": 0, "pending_count": 0, "query_order": 0}
+
+    def place_order(self, pair="BTC/USD", side="BUY", quantity=0.01, price=None):
+        self.calls["place_order"] += 1
+        order = {"OrderID": self.next_id, "Pair": pair, "Side": side, "Type": "LIMIT", "Status": "PENDING",
+                 "Price": price, "Quantity": quantity, "FilledQuantity": 0.0, "FilledAverPrice": 0.0,
+                 "CreateTimestamp": self.next_id}
+        self.orders[self.next_id] = order
+        self.next_id += 1
+        return {"Success": True, "ErrMsg": "", "OrderDetail": dict(order)}
+
+    def tick(self, probability):
+        """Fill or cancel each open order with the given probability"""
+        for order in self.orders.values():
+            if order["Status"] == "PENDING" and self.rng.random() < probability:
+                if self.rng.random() < 0.8:
+                    order.update(Status="FILLED", FilledQuantity=order["Quantity"], FilledAverPrice=order["Price"])
+                else:
+                    order["Status"] = "CANCELED"
+
+    def pending(self):
+        return [order for order in self.orders.values() if order["Status"] == "PENDING"]
+
+    def pending_count(self, fresh=False):
+        self.calls["pending_count"] += 1
+        pending = self.pending()
+        return {"Success": True, "ErrMsg": "", "TotalPending": len(pending),
+                "OrderPairs": {"BTC/USD": len(pending)} if pending else {}}
+
+    def query_order(self, order_id=None, pair=None, offset=None, limit=None, pending_only=None, fresh=False):
+        self.calls["query_order"] += 1
+        if order_id is not None:
+            orders = [self.orders[order_id]] if order_id in self.orders else []
+        elif pending_only:
+            orders = self.pending()
+        else:
+            orders = sorted(self.orders.values(), key=lambda order: -order["OrderID"])
+            orders = orders[offset or 0:(offset or 0) + (limit or 100)]
+        if not orders:
+            return {"Success": False, "ErrMsg": "no order matched"}
+        return {"Success": True, "ErrMsg": "", "OrderMatched": [dict(order) for order in orders]}
+
+
+def per_order_polling(exchange, order_ids, ticks, probability):
+    """One query_order per open order per tick"""
+    open_ids, events = set(order_ids), {}
+    for _ in range(ticks):
+        exchange.tick(probability)
+        for order_id in list(open_ids):
+            order = exchange.query_order(order_id=order_id)["OrderMatched"][0]
+            if order["Status"] != "PENDING":
+                events[order_id] = FILL if order["Status"] == "FILLED" else CANCEL
+                open_ids.discard(order_id)
+    return events
+
+
+def managed(exchange, ticks, probability, count):
+    manager = OrderManager(exchange, interval=0, max_sweep_age=float('inf'))
+    events = {}
+    manager.add_listener(lambda event, order: events.__setitem__(order["OrderID"], event))
+    for _ in range(count):
+        manager.place_order("BTC/USD", "BUY", 0.01, price=60000.0)
+    for _ in range(ticks):
+        exchange.tick(probability)
+        manager.poll()
+    return events, manager.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched order status polling')
+    parser.add_argument('--orders', type=int, nargs='+', default=[1, 10, 100], help='Open orders (default: 1 10 100)')
+    parser.add_argument('--ticks', type=int, default=200, help='Poll intervals simulated (default: 200)')
+    parser.add_argument('--probability', type=float, default=0.02,
+                        help='Chance per tick that an open order fills or is canceled (default: 0.02)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print(f"{'orders':>7} {'per-order calls':>16} {'manager calls':>14} {'sweeps':>7} {'skipped':>8} {'events':>7}")
+    for count in args.orders:
+        exchange = FakeExchange(np.random.default_rng(0))
+        order_ids = [exchange.place_order(price=60000.0)["OrderDetail"]["OrderID"] for _ in range(count)]
+        expected = per_order_polling(exchange, order_ids, args.ticks, args.probability)
+        per_order_calls = exchange.calls["query_order"]
+
+        exchange = FakeExchange(np.random.default_rng(0))
+        events, stats = managed(exchange, args.ticks, args.probability, count)
+        manager_calls = exchange.calls["query_order"] + exchange.calls["pending_count"]
+        assert events == expected, "the manager reported different fills/cancels"
+        print(f"{count:>7} {per_order_calls:>16} {manager_calls:>14} {stats['sweeps']:>7} "
+              f"{stats['skipped']:>8} {len(events):>7}")
+
+
+if __name__ == '__main__':
+    main()
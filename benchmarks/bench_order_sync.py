@@ -0,0 +1,124 @@
+"""Benchmark /api/trade-history as the exchange order history grows to 100k orders
+
+An in-process fake exchange serves query_order newest first with offset/limit
+paging, and a few orders arrive between requests. For each history size the script
+times the incremental OrderSync route and the previous approach (re-read every
+order, dedup against a list of known ids, return the whole history).
+
+Usage: python -m benchmarks.bench_order_sync [--sizes 1000 10000 100000] [--requests N]
+"""
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import numpy as np
+
+
+class FakeExchange:
+    """query_order over an in-memory order list, newest first"""
+
+    def __init__(self):
+        self.orders = []  # Oldest first
+        self.calls = 0
+
+    def add_orders(self, count):
+        start = len(self.orders)
+        now = int(time.time() * 1000)
+        for i in range(start, start + count):
+            self.orders.append({"Pair": "BTC/USD", "OrderID": i + 1, "Status": "FILLED",
+                                "Side": "BUY" if i % 2 else "SELL", "Type": "MARKET",
+                                "CreateTimestamp": now - (10 ** 9) + i, "FilledQuantity": 0.01,
+                                "FilledAverPrice": 60000.0 + i % 100})
+
+    def query_order(self, order_id=None, pair=None, offset=None, limit=None):
+        self.calls += 1
+        offset, limit = offset or 0, limit or 100
+        end = len(self.orders) - offset
+        page = self.orders[max(0, end - limit):max(0, end)][::-1]
+        if not page:
+            return {"Success": False, "ErrMsg": "no order matched"}
+        return {"Success": True, "ErrMsg": "", "OrderMatched": page}
+
+
+def full_resync(exchange, writer):
+    """What the route did before: every order, list membership, the whole history"""
+    from order_sync import order_record
+    from trade_store import trades_after
+    orders, offset = [], 0
+    while True:
+        page = exchange.query_order(offset=offset).get("OrderMatched") or []
+        orders.extend(page)
+        if len(page) < 100:
+            break
+        offset += len(page)
+    history = trades_after(writer.engine, 0, limit=None)
+    existing_order_ids = [trade["order_id"] for trade in history]
+    new_trades = [order_record(order) for order in orders if order["OrderID"] not in existing_order_ids]
+    if new_trades:
+        writer.add_trades(new_trades)
+        writer.flush()
+    return trades_after(writer.engine, 0, limit=None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark incremental order sync for the trade history')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Orders in the history (default: 1000 10000 100000)')
+    parser.add_argument('--requests', type=int, default=20, help='Timed requests per size (default: 20)')
+    parser.add_argument('--new', type=int, default=5, help='Orders arriving between requests (default: 5)')
+    parser.add_argument('--baseline-max', type=int, default=10000,
+                        help='Largest size the old approach is timed at (default: 10000)')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='order_sync_bench_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'trading.db')}"
+    os.environ['TRADER_STATE_PATH'] = os.path.join(directory, 'trader_state.db')
+    try:
+        import app as app_module
+        from app import app, trade_writer
+        from database import db
+        from order_sync import OrderSync
+        logging.disable(logging.WARNING)
+        client = app.test_client()
+
+        print(f"{'orders':>8} {'incremental ms':>15} {'exchange calls':>15} {'old approach ms':>16}")
+        for size in args.sizes:
+            with app.app_context():
+                db.drop_all()
+                db.create_all()
+            exchange = FakeExchange()
+            exchange.add_orders(size)
+            sync = OrderSync(exchange, trade_writer, interval=0)
+            stored = sync.sync()  # Initial copy of the history, not timed
+            assert stored == size, f"stored {stored} of {size} orders"
+            app_module.order_sync = sync
+
+            timings = []
+            exchange.calls = 0
+            for _ in range(args.requests):
+                exchange.add_orders(args.new)
+                start = time.perf_counter()
+                response = client.get('/api/trade-history')
+                timings.append(time.perf_counter() - start)
+                assert response.get_json()["success"]
+            calls = exchange.calls / args.requests
+
+            baseline = float('nan')
+            if size <= args.baseline_max:
+                runs = []
+                for _ in range(3):
+                    exchange.add_orders(args.new)
+                    start = time.perf_counter()
+                    full_resync(exchange, trade_writer)
+                    runs.append(time.perf_counter() - start)
+                baseline = np.median(runs) * 1000
+            print(f"{size:>8} {np.median(timings) * 1000:>15.2f} {calls:>15.1f} {baseline:>16.1f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""Benchmark rollout throughput of SharedSubprocVecEnv as workers are added
+
+Usage: python -m benchmarks.bench_parallel_env [--rows N] [--steps S]
+"""
+import argparse
+import logging
+import os
+import numpy as np
+
+from benchmarks.common import synthetic_ohlcv, timed
+from parallel_env import SharedSubprocVecEnv
+
+WINDOW_SIZE = 20
+
+
+def run(env, actions):
+    """Step a vectorized env through a precomputed action matrix"""
+    env.reset()
+    for batch in actions:
+        env.step(batch)
+    return actions.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark shared-memory worker scaling')
+    parser.add_argument('--rows', type=int, default=20000, help='Number of bars (default: 20000)')
+    parser.add_argument('--steps', type=int, default=2000, help='Vector steps per run (default: 2000)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    data = synthetic_ohlcv(args.rows)
+    rng = np.random.default_rng(0)
+
+    counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    base_rate = None
+    print(f"{'workers':>8} {'steps/sec':>12} {'scaling':>8}")
+    for num_envs in counts:
+        env = SharedSubprocVecEnv(data, num_envs, window_size=WINDOW_SIZE)
+        try:
+            actions = rng.integers(0, 3, (args.steps, num_envs))
+            total, elapsed = timed(run, env, actions)
+        finally:
+            env.close()
+        rate = total / elapsed
+        base_rate = base_rate or rate
+        print(f"{num_envs:>8} {rate:>12,.0f} {rate / base_rate:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Compare cold start and memory of PPO.load against the exported NumPy policy
+
+Also checks that both choose the same actions on a fixed observation set.
+
+Usage: python -m benchmarks.bench_policy_export [--observations N]
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import logging
+import tempfile
+import subprocess
+import numpy as np
+from stable_baselines3 import PPO
+
+from benchmarks.common import synthetic_ohlcv
+from policy_export import export_policy, NumpyPolicy
+from trading_env import TradingEnv
+
+# Run in a fresh interpreter: import, load and predict once, then report time and peak RSS
+COLD_START = """
+import sys, time, json
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+if {numpy_path!r}:
+    from policy_export import NumpyPolicy
+    policy = NumpyPolicy.load({numpy_path!r})
+else:
+    from stable_baselines3 import PPO
+    policy = PPO.load({model_path!r})
+import numpy as np
+policy.predict(np.zeros({obs_size}, dtype=np.float32), deterministic=True)
+seconds = time.perf_counter() - start
+# VmHWM rather than ru_maxrss, which keeps the forking parent's peak across exec
+peak = next(line for line in open("/proc/self/status") if line.startswith("VmHWM"))
+print(json.dumps({{"seconds": seconds, "rss_mb": int(peak.split()[1]) / 1024}}))
+"""
+
+
+def cold_start(model_path, numpy_path, obs_size):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = COLD_START.format(root=root, model_path=model_path, numpy_path=numpy_path, obs_size=obs_size)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the exported NumPy policy')
+    parser.add_argument('--observations', type=int, default=100000, help='Observations in the parity check (default: 100000)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    env = TradingEnv(data=synthetic_ohlcv(1000), window_size=12)
+    model = PPO("MlpPolicy", env, verbose=0, n_steps=256)
+    model.learn(total_timesteps=512)
+
+    directory = tempfile.mkdtemp(prefix='policy_export_')
+    try:
+        model_path = os.path.join(directory, 'ppo_trading_bot')
+        model.save(model_path)
+        numpy_path = export_policy(model, model_path)
+
+        observations = np.random.default_rng(0).normal(0, 2, (args.observations,) + env.observation_space.shape)
+        observations = observations.astype(np.float32)
+        torch_actions, _ = model.predict(observations, deterministic=True)
+        numpy_actions, _ = NumpyPolicy.load(numpy_path).predict(observations)
+        mismatches = int(np.count_nonzero(torch_actions != numpy_actions))
+        print(f"action parity on {args.observations} observations: {mismatches} mismatches")
+
+        obs_size = env.observation_space.shape[0]
+        torch_run = cold_start(model_path, '', obs_size)
+        numpy_run = cold_start(model_path, numpy_path, obs_size)
+        print(f"PPO.load:    {torch_run['seconds'] * 1000:7.0f} ms, peak RSS {torch_run['rss_mb']:6.1f} MB "
+              f"(checkpoint {os.path.getsize(model_path + '.zip') / 1024:.0f} KB)")
+        print(f"NumpyPolicy: {numpy_run['seconds'] * 1000:7.0f} ms, peak RSS {numpy_run['rss_mb']:6.1f} MB "
+              f"(export {os.path.getsize(numpy_path) / 1024:.0f} KB)")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
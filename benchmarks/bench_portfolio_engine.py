@@ -0,0 +1,120 @@
+"""Trading cycle time versus the number of pairs: one loop per pair vs PortfolioEngine
+
+Every pair has its own random NumpyPolicy. The per-pair loop does what one
+TradingBot/LiveTrader per pair does: a ticker+balance snapshot for its pair, its
+bar history, its observation and its model call. The engine fetches all tickers and
+the balance once and decides for every pair in one vectorized pass. Both see the same
+prices from the local stub exchange (with artificial latency) and an empty wallet, so
+no orders are placed; their actions must match.
+
+Usage: python -m benchmarks.bench_portfolio_engine [--pairs 1 10 50 200] [--cycles N] [--latency S]
+"""
+import time
+import logging
+import argparse
+import numpy as np
+
+from api_client import RoostooClient
+from feature_store import build_feature_table, NUM_EXTRA_FEATURES, BALANCE_COL, CRYPTO_COL, POSITION_COL
+from order_manager import OrderManager
+from policy_export import NumpyPolicy
+from portfolio_engine import PortfolioEngine
+from price_history import PriceHistory
+from benchmarks.stub_server import start_stub_server
+
+WINDOW = 12
+BAR_INTERVAL = 1e-6  # Every cycle starts a new bar
+
+
+def random_policy(rng, inputs, hidden=64):
+    shapes = [(inputs, hidden), (hidden, hidden), (hidden, 3)]
+    weights = [rng.normal(0, 1 / np.sqrt(n), (n, m)).astype(np.float32) for n, m in shapes]
+    biases = [np.zeros(m, dtype=np.float32) for _, m in shapes]
+    return NumpyPolicy(["Linear", "Tanh", "Linear", "Tanh", "Linear"], weights, biases, (inputs,))
+
+
+class Market:
+    """Random-walk prices for every pair; ``step`` advances them"""
+
+    def __init__(self, pairs, rng):
+        self.pairs = pairs
+        self.prices = 100 * np.exp(rng.normal(0, 1, len(pairs)))
+        self.rng = rng
+
+    def step(self):
+        self.prices *= np.exp(self.rng.normal(0, 0.01, len(self.pairs)))
+
+    def ticker(self, pair=None):
+        return {"Success": True, "ErrMsg": "", "ServerTime": int(time.time() * 1000),
+                "Data": {name: {"LastPrice": float(price)} for name, price in zip(self.pairs, self.prices)
+                         if pair is None or name == pair}}
+
+
+def per_pair_cycle(client, pairs, models, histories):
+    """One snapshot, bar update, observation and model call per pair"""
+    actions = []
+    for pair, model, history in zip(pairs, models, histories):
+        snapshot = client.get_snapshot(pair)
+        price = snapshot["ticker"]["Data"][pair]["LastPrice"]
+        wallet = snapshot["balance"]["Wallet"]
+        history.add_tick(price)
+        if len(history) < WINDOW:
+            actions.append(0)
+            continue
+        obs = build_feature_table(history.closes(WINDOW), None, WINDOW)[0]
+        obs[WINDOW + BALANCE_COL] = wallet.get("USD", {}).get("Free", 0) / 10000.0
+        obs[WINDOW + CRYPTO_COL] = wallet.get(pair.split('/')[0], {}).get("Free", 0)
+        obs[WINDOW + POSITION_COL] = obs[WINDOW + CRYPTO_COL] > 0
+        actions.append(int(model.predict(obs, deterministic=True)[0]))
+    return np.array(actions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark multi-pair trading cycles')
+    parser.add_argument('--pairs', type=int, nargs='+', default=[1, 10, 50, 200], help='Pairs traded (default: 1 10 50 200)')
+    parser.add_argument('--cycles', type=int, default=20, help='Timed cycles after the warm-up (default: 20)')
+    parser.add_argument('--latency', type=float, default=0.005, help='Stub exchange latency in seconds (default: 0.005)')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    print(f"{'pairs':>6} {'per-pair ms':>12} {'requests':>9} {'engine ms':>10} {'requests':>9} {'compute ms':>11}")
+    for count in args.pairs:
+        rng = np.random.default_rng(0)
+        pairs = [f"C{i:03d}/USD" for i in range(count)]
+        market = Market(pairs, rng)
+        models = [random_policy(rng, WINDOW + NUM_EXTRA_FEATURES) for _ in pairs]
+        stub = start_stub_server(latency=args.latency, responses={
+            "/v3/ticker": market.ticker,
+            "/v3/balance": lambda: {"Success": True, "ErrMsg": "", "Wallet": {"USD": {"Free": 0, "Lock": 0}}}
+        })
+        client = RoostooClient("key", "secret", f"http://127.0.0.1:{stub.server_port}", max_connections=8)
+        histories = [PriceHistory(capacity=64, interval=BAR_INTERVAL) for _ in pairs]
+        engine = PortfolioEngine(client, OrderManager(client), pairs, dict(zip(pairs, models)),
+                                 window_size=WINDOW, capacity=64, bar_interval=BAR_INTERVAL, initial_balance=10000.0)
+
+        timings = {"per-pair": [], "engine": []}
+        requests = {"per-pair": 0, "engine": 0}
+        for cycle in range(WINDOW + args.cycles):
+            market.step()
+            for name in ("per-pair", "engine"):
+                stub.request_counts.clear()
+                start = time.perf_counter()
+                if name == "per-pair":
+                    expected = per_pair_cycle(client, pairs, models, histories)
+                else:
+                    engine.run_cycle()
+                elapsed = time.perf_counter() - start
+                if cycle >= WINDOW:
+                    timings[name].append(elapsed)
+                    requests[name] += sum(stub.request_counts.values())
+            assert np.array_equal(engine.actions, expected), "the engine decided differently"
+
+        compute = engine.stats()["last_compute_ms"]
+        print(f"{count:>6} {np.median(timings['per-pair']) * 1000:>12.1f} {requests['per-pair'] / args.cycles:>9.0f} "
+              f"{np.median(timings['engine']) * 1000:>10.1f} {requests['engine'] / args.cycles:>9.0f} {compute:>11.2f}")
+        client.close()
+        stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Order latency and exchange request rate under dashboard read pressure
+
+Many "dashboard" coroutines poll the signed balance endpoint through the async
+client while a "trader" places an order every half second, all against the local
+stub exchange. Three setups are compared:
+
+  unlimited  no limiter: the exchange sees the full read burst
+  fifo       token bucket, but orders queue behind reads (no priority, no shedding)
+  priority   RequestLimiter as configured: orders first, reads shed when exhausted
+
+Usage: python -m benchmarks.bench_rate_limiter [--readers N] [--duration S]
+"""
+import time
+import asyncio
+import logging
+import argparse
+import numpy as np
+
+from api_client import AsyncRoostooClient
+from rate_limiter import RequestLimiter, READ
+from benchmarks.stub_server import start_stub_server
+
+
+class FifoLimiter(RequestLimiter):
+    """Same budgets, but every request is a read and nothing is shed"""
+
+    def __init__(self):
+        super(FifoLimiter, self).__init__(max_wait=float('inf'), max_queue=10 ** 9, order_reserve=0)
+
+    async def acquire(self, budget, priority=READ):
+        return await super(FifoLimiter, self).acquire(budget, READ)
+
+
+async def scenario(base_url, limiter, readers, duration, stub):
+    client = AsyncRoostooClient("key", "secret", base_url, max_connections=8, limiter=limiter)
+    deadline = time.monotonic() + duration
+    order_latencies = []
+    reads = {"ok": 0, "shed": 0}
+
+    async def dashboard():
+        while time.monotonic() < deadline:
+            response = await client.get_balance()
+            reads["ok" if response.get("Success") else "shed"] += 1
+            await asyncio.sleep(0.1)
+
+    async def trader():
+        while time.monotonic() < deadline:
+            start = time.monotonic()
+            await client.place_order("BTC/USD", "BUY", 0.01)
+            order_latencies.append(time.monotonic() - start)
+            await asyncio.sleep(0.5)
+
+    with stub.counts_lock:
+        stub.request_counts.clear()
+    start = time.monotonic()
+    await asyncio.gather(trader(), *(dashboard() for _ in range(readers)))
+    elapsed = time.monotonic() - start
+    with stub.counts_lock:
+        signed = stub.request_counts["/v3/balance"] + stub.request_counts["/v3/place_order"]
+    client.close()
+    return np.array(order_latencies), reads, signed / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the client-side rate limiter')
+    parser.add_argument('--readers', type=int, default=50, help='Concurrent dashboard pollers (default: 50)')
+    parser.add_argument('--duration', type=float, default=6.0, help='Seconds per setup (default: 6)')
+    args = parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    stub = start_stub_server(latency=0.005)
+    base_url = f"http://127.0.0.1:{stub.server_port}"
+    budget = RequestLimiter().buckets["signed"]
+    print(f"signed budget: {budget.rate:.0f} req/s, burst {budget.burst}; "
+          f"{args.readers} dashboards each polling every 0.1 s")
+    print(f"{'setup':>10} {'signed req/s':>13} {'order p50 ms':>13} {'order max ms':>13} {'reads ok':>9} {'shed':>6}")
+    for name, limiter in (('unlimited', None), ('fifo', FifoLimiter()), ('priority', RequestLimiter())):
+        latencies, reads, rate = asyncio.run(scenario(base_url, limiter, args.readers, args.duration, stub))
+        print(f"{name:>10} {rate:>13.1f} {np.median(latencies) * 1000:>13.1f} {latencies.max() * 1000:>13.1f} "
+              f"{reads['ok']:>9} {reads['shed']:>6}")
+    stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Compare the old sleep-after-step loop with DeadlineScheduler under variable step latency
+
+Each step sleeps for a random "exchange" latency. The sleep loop's period grows by
+that latency and drifts off the bar grid; the scheduler keeps ticks on fixed deadlines.
+
+Usage: python -m benchmarks.bench_scheduler [--interval S] [--ticks N] [--latency S]
+"""
+import time
+import argparse
+import logging
+import numpy as np
+
+from scheduler import DeadlineScheduler, SKIP
+
+
+def sleep_loop(interval, ticks, latencies):
+    """``execute_trading_step(); time.sleep(interval)`` as app.py used to run it"""
+    starts = []
+    for latency in latencies[:ticks]:
+        starts.append(time.monotonic())
+        time.sleep(latency)
+        time.sleep(interval)
+    return np.array(starts)
+
+
+def scheduled(interval, ticks, latencies):
+    """The same steps on a DeadlineScheduler; returns (tick start times, lag stats)"""
+    scheduler = DeadlineScheduler()
+    starts = []
+
+    def step():
+        starts.append(time.monotonic())
+        time.sleep(latencies[len(starts) - 1])
+        if len(starts) == ticks:
+            scheduler.stop()
+
+    scheduler.add('step', interval, step, policy=SKIP)
+    scheduler.run()
+    return np.array(starts), scheduler.stats()['step']
+
+
+def report(name, starts, interval):
+    offsets = (starts - starts[0]) - interval * np.arange(len(starts))
+    periods = np.diff(starts)
+    print(f"{name:10s} mean period {periods.mean() * 1000:7.1f} ms (target {interval * 1000:.0f}), "
+          f"drift after {len(starts)} ticks {offsets[-1] * 1000:7.1f} ms, "
+          f"p99 |offset| {np.percentile(np.abs(offsets), 99) * 1000:6.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the deadline scheduler')
+    parser.add_argument('--interval', type=float, default=0.05, help='Seconds between steps (default: 0.05)')
+    parser.add_argument('--ticks', type=int, default=100, help='Steps per run (default: 100)')
+    parser.add_argument('--latency', type=float, default=0.01, help='Mean simulated step latency (default: 0.01)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = np.random.default_rng(0)
+    latencies = np.minimum(rng.exponential(args.latency, args.ticks), args.interval * 0.9)
+
+    report('sleep loop', sleep_loop(args.interval, args.ticks, latencies), args.interval)
+
+    starts, stats = scheduled(args.interval, args.ticks, latencies)
+    report('scheduler', starts, args.interval)
+    print(f"scheduler lag: avg {stats['avg_lag_ms']:.2f} ms, max {stats['max_lag_ms']:.2f} ms, "
+          f"skipped {stats['skipped']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Measure web tier cold start: import cost per module and time to first request
+
+The import report comes from ``python -X importtime`` in a fresh interpreter,
+so it shows what a new autoscale instance pays before serving anything. Heavy
+ML/data libraries must not appear in the web tier's import graph.
+
+Usage: python -m benchmarks.bench_startup [--modules main trading_bot ...] [--top N] [--server flask|gunicorn]
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import subprocess
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that only the trading/training code should load, and only on first use
+HEAVY_MODULES = ('torch', 'stable_baselines3', 'gym', 'gymnasium', 'yfinance', 'ta', 'pandas', 'pyarrow')
+
+
+def import_profile(module):
+    """Import ``module`` in a fresh interpreter under -X importtime
+
+    Returns:
+        list: (name, self_us, cumulative_us, depth) per imported module, in import order
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def report_imports(module, top):
+    """Print import time of ``module``, its slowest direct imports and any heavy library pulled in"""
+    entries = import_profile(module)
+    # importtime lists children before their parent; the module's direct imports
+    # are the depth-1 entries between the previous top-level entry and the module
+    position = max(i for i, entry in enumerate(entries) if entry[0] == module and entry[3] == 0)
+    children = []
+    for entry in reversed(entries[:position]):
+        if entry[3] == 0:
+            break
+        if entry[3] == 1:
+            children.append(entry)
+    heavy = sorted({name.split('.')[0] for name, _, _, _ in entries if name.split('.')[0] in HEAVY_MODULES})
+    print(f"import {module}: {entries[position][2] / 1000:.0f} ms, {len(entries)} modules, "
+          f"heavy: {', '.join(heavy) if heavy else 'none'}")
+    for name, _, cumulative, _ in sorted(children, key=lambda entry: -entry[2])[:top]:
+        print(f"    {cumulative / 1000:8.1f} ms  {name}")
+    return heavy
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(server, path='/api/trading-status', timeout=60.0):
+    """Start the app in a new process and poll ``path`` until it answers
+
+    Returns:
+        float: Seconds from process start to the first successful response
+    """
+    port = free_port()
+    if server == 'gunicorn':
+        command = ['gunicorn', '--bind', f'127.0.0.1:{port}', 'main:app']
+    else:
+        command = [sys.executable, '-c', f'from main import app; app.run(host="127.0.0.1", port={port})']
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"{server} server exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.005)
+        raise TimeoutError(f"No response from {path} within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark web tier cold start')
+    parser.add_argument('--modules', nargs='+', default=['main', 'trading_bot', 'live_trader'],
+                        help='Modules to profile (default: main trading_bot live_trader)')
+    parser.add_argument('--top', type=int, default=8, help='Slowest direct imports to list (default: 8)')
+    parser.add_argument('--server', choices=['flask', 'gunicorn'], default='flask',
+                        help='Server started for the first-request test (default: flask)')
+    parser.add_argument('--runs', type=int, default=3, help='Cold starts to time (default: 3)')
+    args = parser.parse_args()
+
+    web_heavy = []
+    for module in args.modules:
+        heavy = report_imports(module, args.top)
+        if module == 'main':
+            web_heavy = heavy
+
+    runs = [time_to_first_request(args.server) for _ in range(args.runs)]
+    print(f"time to first request ({args.server}): best {min(runs) * 1000:.0f} ms, "
+          f"worst {max(runs) * 1000:.0f} ms over {args.runs} cold starts")
+
+    if web_heavy:
+        sys.exit(f"web tier imports heavy libraries: {', '.join(web_heavy)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark trade persistence: per-trade commits vs the buffered TradeWriter, and paged reads
+
+Writes the same trades once with an INSERT + COMMIT per trade and once through
+TradeWriter, reporting the time the trading loop spends per recorded trade. Then
+times /api/trade-history's indexed page query against loading the whole table.
+
+Usage: python -m benchmarks.bench_trade_store [--trades N] [--rows N] [--per-page N]
+"""
+import os
+import time
+import shutil
+import argparse
+import logging
+import tempfile
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import insert, select
+
+from database import make_engine, create_tables
+from models import Trade
+from trade_store import TradeWriter, trade_row, trade_record
+
+
+def make_records(count, start_id=0):
+    start = datetime(2024, 1, 1)
+    return [{
+        "timestamp": (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S"),
+        "pair": "BTC/USD" if i % 4 else "ETH/USD",
+        "side": "BUY" if i % 2 else "SELL",
+        "price": 60000.0 + i % 100,
+        "quantity": 0.01,
+        "status": "FILLED",
+        "order_id": start_id + i
+    } for i in range(count)]
+
+
+def per_trade_commits(engine, records):
+    """One INSERT and COMMIT per trade, as a naive ORM session.add/commit would do"""
+    latencies = []
+    for record in records:
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(insert(Trade), [trade_row(record)])
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies)
+
+
+def buffered(engine, records):
+    """TradeWriter.add_trade on the hot path; returns (latencies, seconds until everything is written)"""
+    writer = TradeWriter(engine)
+    latencies = []
+    start_all = time.perf_counter()
+    for record in records:
+        start = time.perf_counter()
+        writer.add_trade(record)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+    return np.array(latencies), time.perf_counter() - start_all, writer.stats()
+
+
+def report(name, latencies):
+    print(f"{name:18s} per trade: mean {latencies.mean() * 1e6:8.1f} us, "
+          f"p99 {np.percentile(latencies, 99) * 1e6:8.1f} us, total {latencies.sum():6.2f} s")
+
+
+def time_query(engine, statement, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        with engine.connect() as conn:
+            rows = [trade_record(row) for row in conn.execute(statement).all()]
+    return (time.perf_counter() - start) / repeat, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark buffered trade writes and paged history reads')
+    parser.add_argument('--trades', type=int, default=2000, help='Trades written per method (default: 2000)')
+    parser.add_argument('--rows', type=int, default=100000, help='Rows in the history table (default: 100000)')
+    parser.add_argument('--per-page', type=int, default=50, help='History page size (default: 50)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    directory = tempfile.mkdtemp(prefix='trade_store_bench_')
+    try:
+        engine = make_engine(f"sqlite:///{os.path.join(directory, 'trading.db')}")
+        create_tables(engine)
+
+        report('commit per trade', per_trade_commits(engine, make_records(args.trades)))
+        latencies, total, stats = buffered(engine, make_records(args.trades, start_id=args.trades))
+        report('TradeWriter', latencies)
+        print(f"{'':18s} all rows written after {total:.2f} s in {stats['flushes']} flushes")
+
+        writer = TradeWriter(engine, max_pending=args.rows)
+        writer.add_trades(make_records(args.rows - 2 * args.trades, start_id=2 * args.trades))
+        writer.close()
+
+        page = (select(Trade).where(Trade.pair == "BTC/USD")
+                .order_by(Trade.timestamp.desc(), Trade.id.desc()).limit(args.per_page))
+        everything = select(Trade).order_by(Trade.id)
+        for name, statement in (('page query', page), ('full table', everything)):
+            seconds, count = time_query(engine, statement, repeat=20 if name == 'page query' else 3)
+            print(f"{name:18s} {seconds * 1000:8.2f} ms for {count} of {args.rows} trades")
+        engine.dispose()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
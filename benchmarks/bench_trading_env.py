@@ -0,0 +1,104 @@
+"""Benchmark TradingEnv stepping and check observation parity
+
+Compares the precomputed feature store against the original per-step ``ta``
+computation on the same series.
+
+Usage: python -m benchmarks.bench_trading_env [--rows N] [--window W]
+"""
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+import ta
+
+from benchmarks.common import synthetic_ohlcv, timed
+from trading_env import TradingEnv
+
+
+def legacy_observation(data, step, window_size, balance_norm, crypto_owned):
+    """Per-step observation as TradingEnv built it before the feature store"""
+    price_history = data.iloc[step - window_size:step]['close'].values
+    if len(price_history) > 0 and price_history.max() > 0:
+        price_history = price_history / price_history.max()
+
+    frame = data.iloc[step - window_size:step].copy()
+    frame['sma5'] = ta.trend.sma_indicator(frame['close'], window=5)
+    frame['sma20'] = ta.trend.sma_indicator(frame['close'], window=20)
+    frame['rsi'] = ta.momentum.rsi(frame['close'], window=14)
+    frame = frame.fillna(0)
+
+    close_max = frame['close'].max()
+    sma5 = frame['sma5'].iloc[-1] / close_max if close_max > 0 else 0
+    sma20 = frame['sma20'].iloc[-1] / close_max if close_max > 0 else 0
+    rsi = frame['rsi'].iloc[-1] / 100.0
+    macd = ta.trend.macd(frame['close'], window_slow=26, window_fast=12)
+    macd_line = macd.iloc[-1] / close_max if close_max > 0 else 0
+    volume_sma = frame['volume'].rolling(5).mean().iloc[-1]
+
+    obs = np.concatenate([
+        price_history,
+        [balance_norm, crypto_owned, sma5, sma20, rsi, macd_line,
+         0 if pd.isna(volume_sma) else volume_sma, 1 if crypto_owned > 0 else 0]
+    ])
+    return np.nan_to_num(obs).astype(np.float32)
+
+
+def check_parity(data, window_size, samples=200):
+    """Compare feature-store observations with the legacy computation"""
+    env = TradingEnv(data=data, window_size=window_size)
+    rng = np.random.default_rng(1)
+    steps = rng.integers(window_size, len(data), samples)
+    worst = 0.0
+    for step in steps:
+        env.current_step = int(step)
+        env.balance = float(rng.uniform(0, 2)) * env.initial_balance
+        env.crypto_owned = float(rng.choice([0.0, 0.01, 0.05]))
+        expected = legacy_observation(env.data, int(step), window_size,
+                                      env.balance / env.initial_balance, env.crypto_owned)
+        actual = env._get_observation()
+        np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-6)
+        worst = max(worst, float(np.max(np.abs(actual - expected))))
+    return worst
+
+
+def run_episode(env, actions):
+    """Step through one episode with a fixed action sequence"""
+    env.reset()
+    steps = 0
+    for action in actions:
+        _, _, done, _ = env.step(action)
+        steps += 1
+        if done:
+            break
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark TradingEnv stepping')
+    parser.add_argument('--rows', type=int, default=20000, help='Number of bars (default: 20000)')
+    parser.add_argument('--window', type=int, default=30, help='Observation window (default: 30)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    data = synthetic_ohlcv(args.rows)
+
+    worst = check_parity(data, args.window)
+    print(f"parity: max abs diff vs per-step ta = {worst:.3g}")
+
+    env, build_time = timed(TradingEnv, data=data, window_size=args.window)
+    print(f"feature store build: {build_time * 1000:.1f} ms for {args.rows} rows")
+
+    actions = np.random.default_rng(2).integers(0, 3, args.rows)
+    steps, elapsed = timed(run_episode, env, actions)
+    print(f"feature store: {steps / elapsed:,.0f} steps/sec")
+
+    legacy_steps = min(2000, args.rows - args.window - 1)
+    _, legacy_elapsed = timed(
+        lambda: [legacy_observation(env.data, s, args.window, 1.0, 0.0)
+                 for s in range(args.window, args.window + legacy_steps)]
+    )
+    print(f"per-step ta:   {legacy_steps / legacy_elapsed:,.0f} observations/sec")
+
+
+if __name__ == '__main__':
+    main()
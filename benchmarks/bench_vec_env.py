@@ -0,0 +1,68 @@
+"""Benchmark batched VecTradingEnv against DummyVecEnv of TradingEnv
+
+Before timing, a smoke check builds PPO on a VecTradingEnv and runs one rollout and
+update, so an env that Stable-Baselines3 rejects (e.g. spaces from the wrong gym
+package) fails here instead of in ``train_model --num-envs N``.
+
+Usage: python -m benchmarks.bench_vec_env [--rows N] [--steps S]
+"""
+import argparse
+import logging
+import numpy as np
+from stable_baselines3 import PPO
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from benchmarks.common import synthetic_ohlcv, timed
+from trading_env import TradingEnv
+from vec_trading_env import VecTradingEnv
+
+WINDOW_SIZE = 20
+
+
+def run(env, actions):
+    """Step a vectorized env through a precomputed action matrix"""
+    env.reset()
+    for batch in actions:
+        env.step(batch)
+    return actions.size
+
+
+def check_training(data, num_envs=4, n_steps=64):
+    """Construct PPO on a VecTradingEnv and learn one rollout"""
+    env = VecTradingEnv(data, num_envs=num_envs, window_size=WINDOW_SIZE, random_start=True, seed=0)
+    model = PPO("MlpPolicy", env, n_steps=n_steps, batch_size=n_steps, verbose=0)
+    model.learn(total_timesteps=num_envs * n_steps)
+    env.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark vectorized trading environments')
+    parser.add_argument('--rows', type=int, default=5000, help='Number of bars (default: 5000)')
+    parser.add_argument('--steps', type=int, default=1000, help='Vector steps per run (default: 1000)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    data = synthetic_ohlcv(args.rows)
+    rng = np.random.default_rng(0)
+    check_training(data)
+    print("PPO on VecTradingEnv: ok")
+
+    print(f"{'envs':>6} {'DummyVecEnv':>14} {'VecTradingEnv':>14} {'speedup':>8}")
+    for num_envs in (1, 4, 16, 64, 256):
+        actions = rng.integers(0, 3, (args.steps, num_envs))
+
+        dummy = DummyVecEnv([
+            lambda: TradingEnv(data=data, window_size=WINDOW_SIZE) for _ in range(num_envs)
+        ])
+        total, dummy_time = timed(run, dummy, actions)
+        dummy_rate = total / dummy_time
+
+        batched = VecTradingEnv(data, num_envs=num_envs, window_size=WINDOW_SIZE, random_start=True, seed=0)
+        total, batched_time = timed(run, batched, actions)
+        batched_rate = total / batched_time
+
+        print(f"{num_envs:>6} {dummy_rate:>14,.0f} {batched_rate:>14,.0f} {batched_rate / dummy_rate:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+import time
+import numpy as np
+import pandas as pd
+
+
+def synthetic_ohlcv(rows, seed=0, start_price=30000.0):
+    """Generate a reproducible random-walk OHLCV frame
+
+    Args:
+        rows (int): Number of bars
+        seed (int): Random seed
+        start_price (float): Price of the first bar
+
+    Returns:
+        pd.DataFrame: Frame with open, high, low, close and volume columns
+    """
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 0.002, rows)))
+    spread = close * rng.uniform(0, 0.002, rows)
+    return pd.DataFrame({
+        'open': np.roll(close, 1),
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.uniform(10, 1000, rows)
+    })
+
+
+def timed(func, *args, repeat=1, **kwargs):
+    """Run ``func`` and return (result, best wall time in seconds)"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return result, best
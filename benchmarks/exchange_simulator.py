@@ -0,0 +1,418 @@
+"""Offline simulator of the Roostoo /v3 API
+
+Unlike the canned stub server, the simulator keeps an account: a wallet, market
+orders filled at the replayed price, resting LIMIT orders that fill when the price
+crosses them, and cancellation. Signed endpoints check the RST-API-KEY header and the
+MSG-SIGNATURE HMAC exactly as AsyncRoostooClient._generate_signature computes it.
+Prices replay a cached OHLCV series (``ohlcv_cache``) per pair, or a seeded random
+walk when none is cached, and every response can be delayed (base latency plus an
+exponential tail) or replaced by an HTTP 503 at a configurable rate. All randomness
+comes from one seed, so runs are reproducible.
+
+Run standalone with ``python -m benchmarks.exchange_simulator [--port 8901] [--latency S]
+[--jitter S] [--error-rate P] [--pairs BTC/USD ETH/USD]``.
+"""
+import hmac
+import json
+import time
+import hashlib
+import argparse
+import threading
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+from ohlcv_cache import get_default_cache
+from benchmarks.common import synthetic_ohlcv
+
+SIGNED_PATHS = ("/v3/balance", "/v3/place_order", "/v3/query_order", "/v3/cancel_order", "/v3/pending_count")
+
+# Orders returned by query_order when no limit is given, as on the exchange
+DEFAULT_QUERY_LIMIT = 100
+
+
+class PriceReplay:
+    """Replays close prices bar by bar, either with the wall clock or when ``advance`` is called"""
+
+    def __init__(self, bars, seconds_per_bar=None):
+        """
+        Initialize the replay
+
+        Args:
+            bars (dict): Pair -> OHLCV frame with 'close' and 'volume' columns
+            seconds_per_bar (float, optional): Wall-clock seconds per replayed bar. Defaults to
+                None (the price only moves on ``advance``).
+        """
+        self.closes = {pair: frame['close'].to_numpy(dtype=np.float64) for pair, frame in bars.items()}
+        self.volumes = {pair: frame['volume'].to_numpy(dtype=np.float64) for pair, frame in bars.items()}
+        self.seconds_per_bar = seconds_per_bar
+        self.started = time.monotonic()
+        self.offset = 0
+
+    def index(self):
+        """Bar currently replayed (wraps around at the end of the series)"""
+        bar = self.offset
+        if self.seconds_per_bar:
+            bar += int((time.monotonic() - self.started) / self.seconds_per_bar)
+        return bar
+
+    def advance(self, bars=1):
+        """Move the replay forward by ``bars``"""
+        self.offset += bars
+
+    def price(self, pair, bar=None):
+        closes = self.closes[pair]
+        return float(closes[(self.index() if bar is None else bar) % len(closes)])
+
+    def volume(self, pair):
+        volumes = self.volumes[pair]
+        return float(volumes[self.index() % len(volumes)])
+
+
+def load_bars(pairs, interval="1m", rows=10000, seed=0):
+    """
+    Bars to replay for each pair: the cached yfinance series when there is one, else a random walk
+
+    Args:
+        pairs (list): Trading pairs, e.g. ["BTC/USD"] (cached as "BTC-USD")
+        interval (str, optional): Cached interval to replay. Defaults to "1m".
+        rows (int, optional): Length of the synthetic series. Defaults to 10000.
+        seed (int, optional): Seed of the synthetic series. Defaults to 0.
+
+    Returns:
+        dict: Pair -> OHLCV frame with lowercase columns
+    """
+    cache = get_default_cache()
+    bars = {}
+    for i, pair in enumerate(pairs):
+        cached = cache.load(pair.replace('/', '-'), interval)
+        if cached is not None and len(cached):
+            cached = cached.rename(columns=str.lower)
+            if 'volume' not in cached.columns:
+                cached['volume'] = 0.0
+            bars[pair] = cached
+        else:
+            bars[pair] = synthetic_ohlcv(rows, seed=seed + i)
+    return bars
+
+
+class ExchangeSimulator:
+    """Account, order and market state behind the simulated endpoints
+
+    Every handler runs under one lock, so concurrent requests see a consistent account.
+    """
+
+    def __init__(self, replay, api_key="key", secret_key="secret", balances=None, latency=0.0, jitter=0.0,
+                 error_rate=0.0, spread=0.0002, max_clock_skew=60.0, seed=0):
+        """
+        Initialize the simulator
+
+        Args:
+            replay (PriceReplay): Prices of the traded pairs
+            api_key (str, optional): Accepted RST-API-KEY. Defaults to "key".
+            secret_key (str, optional): Secret the signatures must be made with. Defaults to "secret".
+            balances (dict, optional): Starting free balance per currency. Defaults to 50000 USD.
+            latency (float, optional): Seconds every response is delayed. Defaults to 0.
+            jitter (float, optional): Mean of an extra exponential delay, for a latency tail. Defaults to 0.
+            error_rate (float, optional): Fraction of requests answered with HTTP 503. Defaults to 0.
+            spread (float, optional): Relative bid/ask spread around the replayed price. Defaults to 0.0002.
+            max_clock_skew (float, optional): Largest accepted age of a signed request's timestamp
+                in seconds. Defaults to 60.
+            seed (int, optional): Seed of the latency and error draws. Defaults to 0.
+        """
+        self.replay = replay
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.spread = spread
+        self.max_clock_skew = max_clock_skew
+        self.rng = np.random.default_rng(seed)
+        self.wallet = {currency: {"Free": float(amount), "Lock": 0.0}
+                       for currency, amount in (balances or {"USD": 50000.0}).items()}
+        self.orders = {}  # OrderID -> order, in creation order
+        self.pending = {}  # OrderID -> resting LIMIT order
+        self.next_order_id = 1
+        self.lock = threading.Lock()
+        self.request_counts = Counter()
+        self.errors = Counter()  # Injected errors and rejected signatures
+
+    def signature(self, params):
+        """HMAC-SHA256 of the sorted parameters, as the client signs them"""
+        query_string = '&'.join([f"{key}={params[key]}" for key in sorted(params)])
+        return hmac.new(self.secret_key.encode('utf-8'), query_string.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    def draw_fault(self):
+        """Delay and whether to fail the next response"""
+        with self.lock:
+            delay = self.latency + (self.rng.exponential(self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self.rng.random() < self.error_rate
+        return delay, fail
+
+    def authenticate(self, headers, params):
+        """Return an error message, or None when the key, signature and timestamp are valid"""
+        if headers.get("RST-API-KEY") != self.api_key:
+            return "invalid api key"
+        if not hmac.compare_digest(headers.get("MSG-SIGNATURE", ""), self.signature(params)):
+            return "signature mismatch"
+        try:
+            timestamp = int(params.get("timestamp", "")) / 1000
+        except ValueError:
+            return "missing timestamp"
+        if abs(time.time() - timestamp) > self.max_clock_skew:
+            return "timestamp out of range"
+        return None
+
+    def handle(self, path, params):
+        """
+        Answer one request
+
+        Args:
+            path (str): Endpoint path
+            params (dict): Decoded query or form parameters
+
+        Returns:
+            tuple: (HTTP status, response dict)
+        """
+        handler = {
+            "/v3/serverTime": self.server_time,
+            "/v3/exchangeInfo": self.exchange_info,
+            "/v3/ticker": self.ticker,
+            "/v3/balance": self.balance,
+            "/v3/place_order": self.place_order,
+            "/v3/query_order": self.query_order,
+            "/v3/cancel_order": self.cancel_order,
+            "/v3/pending_count": self.pending_count
+        }.get(path)
+        if handler is None:
+            return 404, {"Success": False, "ErrMsg": "not found"}
+        with self.lock:
+            self.request_counts[path] += 1
+            self._match_limit_orders()
+            return 200, handler(params)
+
+    def _currencies(self, pair):
+        coin, unit = pair.split('/')
+        for currency in (coin, unit):
+            self.wallet.setdefault(currency, {"Free": 0.0, "Lock": 0.0})
+        return self.wallet[coin], self.wallet[unit]
+
+    def _fill(self, order, price):
+        """Settle an order at ``price`` out of the funds it locked"""
+        coin, unit = self._currencies(order["Pair"])
+        quantity = order["Quantity"]
+        if order["Side"] == "BUY":
+            unit["Lock"] -= order["_locked"]
+            unit["Free"] += order["_locked"] - quantity * price
+            coin["Free"] += quantity
+        else:
+            coin["Lock"] -= quantity
+            unit["Free"] += quantity * price
+        order.update(Status="FILLED", FilledQuantity=quantity, FilledAverPrice=price,
+                     FinishTimestamp=int(time.time() * 1000))
+        self.pending.pop(order["OrderID"], None)
+
+    def _match_limit_orders(self):
+        for order in list(self.pending.values()):
+            price = self.replay.price(order["Pair"])
+            if (order["Side"] == "BUY" and price <= order["Price"]) or (order["Side"] == "SELL" and price >= order["Price"]):
+                self._fill(order, order["Price"])
+
+    @staticmethod
+    def _public(order):
+        return {key: value for key, value in order.items() if not key.startswith("_")}
+
+    def server_time(self, params):
+        return {"ServerTime": int(time.time() * 1000)}
+
+    def exchange_info(self, params):
+        return {"IsRunning": True, "ServerTime": int(time.time() * 1000),
+                "TradePairs": {pair: {"Coin": pair.split('/')[0], "Unit": pair.split('/')[1], "CanTrade": True,
+                                      "PricePrecision": 2, "AmountPrecision": 6, "MiniOrder": 1.0}
+                               for pair in self.replay.closes}}
+
+    def ticker(self, params):
+        pair = params.get("pair")
+        if pair is not None and pair not in self.replay.closes:
+            return {"Success": False, "ErrMsg": f"unknown pair {pair}"}
+        bar = self.replay.index()
+        data = {}
+        for name in ([pair] if pair else self.replay.closes):
+            price = self.replay.price(name, bar)
+            previous = self.replay.price(name, bar - 1) if bar > 0 else price
+            data[name] = {"MaxBid": price * (1 - self.spread / 2), "MinAsk": price * (1 + self.spread / 2),
+                          "LastPrice": price, "Change": price / previous - 1,
+                          "CoinTradeValue": self.replay.volume(name),
+                          "UnitTradeValue": self.replay.volume(name) * price}
+        return {"Success": True, "ErrMsg": "", "ServerTime": int(time.time() * 1000), "Data": data}
+
+    def balance(self, params):
+        return {"Success": True, "ErrMsg": "",
+                "Wallet": {currency: dict(amounts) for currency, amounts in self.wallet.items()}}
+
+    def place_order(self, params):
+        pair = params.get("pair", "")
+        side = params.get("side", "").upper()
+        order_type = params.get("type", "MARKET").upper()
+        if pair not in self.replay.closes:
+            return {"Success": False, "ErrMsg": f"unknown pair {pair}"}
+        if side not in ("BUY", "SELL"):
+            return {"Success": False, "ErrMsg": f"invalid side {side}"}
+        try:
+            quantity = float(params.get("quantity", 0))
+            limit_price = float(params["price"]) if order_type == "LIMIT" else None
+        except (KeyError, ValueError):
+            return {"Success": False, "ErrMsg": "invalid quantity or price"}
+        if quantity <= 0:
+            return {"Success": False, "ErrMsg": "quantity must be positive"}
+
+        market_price = self.replay.price(pair)
+        price = limit_price if limit_price is not None else market_price
+        coin, unit = self._currencies(pair)
+        if side == "BUY":
+            locked = quantity * price
+            if unit["Free"] < locked:
+                return {"Success": False, "ErrMsg": "insufficient balance"}
+            unit["Free"] -= locked
+            unit["Lock"] += locked
+        else:
+            locked = quantity
+            if coin["Free"] < quantity:
+                return {"Success": False, "ErrMsg": "insufficient balance"}
+            coin["Free"] -= quantity
+            coin["Lock"] += quantity
+
+        now = int(time.time() * 1000)
+        order = {"Pair": pair, "OrderID": self.next_order_id, "Status": "PENDING", "Role": "MAKER",
+                 "ServerTimeUsage": 0.0, "CreateTimestamp": now, "FinishTimestamp": 0, "Side": side,
+                 "Type": order_type, "StopType": "GTC", "Price": price, "Quantity": quantity,
+                 "FilledQuantity": 0.0, "FilledAverPrice": 0.0, "CommissionCoin": "", "CommissionChargeValue": 0.0,
+                 "CommissionPercent": 0.0, "_locked": locked}
+        self.orders[self.next_order_id] = order
+        self.pending[self.next_order_id] = order
+        self.next_order_id += 1
+        if limit_price is None:
+            order["Role"] = "TAKER"
+            self._fill(order, market_price)
+        elif (side == "BUY" and market_price <= limit_price) or (side == "SELL" and market_price >= limit_price):
+            self._fill(order, limit_price)
+        return {"Success": True, "ErrMsg": "", "OrderDetail": self._public(order)}
+
+    def query_order(self, params):
+        if "order_id" in params:
+            order = self.orders.get(int(params["order_id"]))
+            orders = [order] if order is not None else []
+        else:
+            pair = params.get("pair")
+            pending_only = params.get("pending_only", "").upper() == "TRUE"
+            orders = [order for order in reversed(self.orders.values())
+                      if (pair is None or order["Pair"] == pair) and (not pending_only or order["Status"] == "PENDING")]
+            offset = int(params.get("offset", 0))
+            orders = orders[offset:offset + int(params.get("limit", DEFAULT_QUERY_LIMIT))]
+        if not orders:
+            return {"Success": False, "ErrMsg": "no order matched"}
+        return {"Success": True, "ErrMsg": "", "OrderMatched": [self._public(order) for order in orders]}
+
+    def cancel_order(self, params):
+        pair = params.get("pair")
+        order_id = int(params["order_id"]) if "order_id" in params else None
+        canceled = []
+        for order in list(self.pending.values()):
+            if (pair and order["Pair"] != pair) or (order_id and order["OrderID"] != order_id):
+                continue
+            coin, unit = self._currencies(order["Pair"])
+            funds = unit if order["Side"] == "BUY" else coin
+            funds["Lock"] -= order["_locked"]
+            funds["Free"] += order["_locked"]
+            order.update(Status="CANCELED", FinishTimestamp=int(time.time() * 1000))
+            del self.pending[order["OrderID"]]
+            canceled.append(order["OrderID"])
+        if not canceled:
+            return {"Success": False, "ErrMsg": "no order to cancel"}
+        return {"Success": True, "ErrMsg": "", "CanceledList": canceled}
+
+    def pending_count(self, params):
+        pairs = Counter(order["Pair"] for order in self.pending.values())
+        return {"Success": True, "ErrMsg": "", "TotalPending": sum(pairs.values()), "OrderPairs": dict(pairs)}
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        parts = urllib.parse.urlsplit(self.path)
+        query = parts.query
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        if length:
+            query = self.rfile.read(length).decode("utf-8")
+        params = dict(urllib.parse.parse_qsl(query, keep_blank_values=True))
+        simulator = self.server.simulator
+
+        delay, fail = simulator.draw_fault()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            simulator.errors["injected"] += 1
+            status, response = 503, {"Success": False, "ErrMsg": "simulated outage"}
+        else:
+            error = simulator.authenticate(self.headers, params) if parts.path in SIGNED_PATHS else None
+            if error is not None:
+                simulator.errors["unauthorized"] += 1
+                status, response = 401, {"Success": False, "ErrMsg": error}
+            else:
+                status, response = simulator.handle(parts.path, params)
+
+        body = json.dumps(response).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_simulator(simulator, port=0):
+    """Serve ``simulator`` over HTTP from a daemon thread
+
+    Args:
+        simulator (ExchangeSimulator): State to serve
+        port (int, optional): Port to bind (0 picks a free one). Defaults to 0.
+
+    Returns:
+        ThreadingHTTPServer: Running server; its base URL is http://127.0.0.1:<server_port>
+            and ``simulator`` is the served state.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), SimulatorHandler)
+    server.simulator = simulator
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the offline Roostoo exchange simulator")
+    parser.add_argument("--port", type=int, default=8901, help="Port to listen on (default: 8901)")
+    parser.add_argument("--pairs", nargs="+", default=["BTC/USD"], help="Traded pairs (default: BTC/USD)")
+    parser.add_argument("--interval", default="1m", help="Cached OHLCV interval to replay (default: 1m)")
+    parser.add_argument("--seconds-per-bar", type=float, default=1.0, help="Wall-clock seconds per bar (default: 1)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay per response in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Mean extra exponential delay in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failed with HTTP 503")
+    parser.add_argument("--api-key", default="key", help="Accepted API key (default: key)")
+    parser.add_argument("--secret-key", default="secret", help="Signing secret (default: secret)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for prices, latency and errors")
+    args = parser.parse_args()
+    replay = PriceReplay(load_bars(args.pairs, args.interval, seed=args.seed), args.seconds_per_bar)
+    simulator = ExchangeSimulator(replay, args.api_key, args.secret_key, latency=args.latency, jitter=args.jitter,
+                                  error_rate=args.error_rate, seed=args.seed)
+    server = start_simulator(simulator, args.port)
+    print(f"Simulated Roostoo API listening on http://127.0.0.1:{server.server_port}")
+    threading.Event().wait()
@@ -0,0 +1,92 @@
+"""Minimal local stand-in for the Roostoo /v3 API
+
+Serves canned JSON over HTTP/1.1 keep-alive so the API client can be
+benchmarked without network access. Run standalone with
+``python -m benchmarks.stub_server [--port 8900]``.
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPONSES = {
+    "/v3/serverTime": lambda: {"ServerTime": int(time.time() * 1000)},
+    "/v3/exchangeInfo": lambda: {"IsRunning": True, "TradePairs": {"BTC/USD": {"Coin": "BTC", "Unit": "USD"}}},
+    "/v3/ticker": lambda: {"Success": True, "ErrMsg": "", "ServerTime": int(time.time() * 1000),
+                           "Data": {"BTC/USD": {"MaxBid": 67999.0, "MinAsk": 68001.0, "LastPrice": 68000.0,
+                                                "Change": 0.01, "CoinTradeValue": 1.0, "UnitTradeValue": 68000.0}}},
+    "/v3/balance": lambda: {"Success": True, "ErrMsg": "",
+                            "Wallet": {"BTC": {"Free": 0.5, "Lock": 0}, "USD": {"Free": 50000, "Lock": 0}}},
+    "/v3/pending_count": lambda: {"Success": True, "ErrMsg": "", "TotalPending": 0, "OrderPairs": {}},
+    "/v3/place_order": lambda: {"Success": True, "ErrMsg": "",
+                                "OrderDetail": {"Pair": "BTC/USD", "OrderID": 1, "Status": "FILLED",
+                                                "Side": "BUY", "Type": "MARKET", "Price": 68000.0,
+                                                "Quantity": 0.01, "FilledQuantity": 0.01,
+                                                "FilledAverPrice": 68000.0}},
+    "/v3/query_order": lambda: {"Success": True, "ErrMsg": "", "OrderMatched": []},
+    "/v3/cancel_order": lambda: {"Success": True, "ErrMsg": "", "CanceledList": []},
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.0
+    responses = RESPONSES
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        if length:
+            self.rfile.read(length)
+        path = self.path.split("?", 1)[0]
+        factory = self.responses.get(path)
+        with self.server.counts_lock:
+            self.server.request_counts[path] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        body = json.dumps(factory() if factory else {"Success": False, "ErrMsg": "not found"}).encode("utf-8")
+        self.send_response(200 if factory else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, latency=0.0, responses=None):
+    """Start the stub server in a daemon thread
+
+    Args:
+        port (int, optional): Port to bind (0 picks a free one). Defaults to 0.
+        latency (float, optional): Artificial server-side delay per request in seconds. Defaults to 0.
+        responses (dict, optional): Path -> response factory replacing the canned ones. Defaults to None.
+
+    Returns:
+        ThreadingHTTPServer: Running server; its base URL is http://127.0.0.1:<server_port>.
+            ``request_counts`` counts the requests served per path.
+    """
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"latency": latency,
+                                                             "responses": dict(RESPONSES, **(responses or {}))})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.request_counts = Counter()
+    server.counts_lock = threading.Lock()
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Roostoo API stub server")
+    parser.add_argument("--port", type=int, default=8900, help="Port to listen on (default: 8900)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Server-side delay per request in seconds")
+    args = parser.parse_args()
+    server = start_stub_server(args.port, args.latency)
+    print(f"Stub Roostoo API listening on http://127.0.0.1:{server.server_port}")
+    threading.Event().wait()
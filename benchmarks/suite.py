@@ -0,0 +1,297 @@
+"""Benchmark suite: the hot paths in one run, written as JSON and compared with a baseline
+
+Cases (each sized so the whole suite finishes in well under a minute):
+
+  env_step       TradingEnv.step throughput on the precomputed feature store
+  preprocess     preprocess_data time vs rows, and update_live_data per live bar
+                 (full recompute and with the streaming IndicatorEngine), and
+                 LiveFrame.append on plain and on DatetimeIndex (yfinance-style) history
+  observation    TradingBot._prepare_observation latency on a full bar history
+  api_client     pooled RoostooClient request latency against the local stub
+  dashboard_api  Flask /api/* throughput and latency with concurrent clients, the app
+                 running in a subprocess against the local stub
+
+Metric names carry their unit: ``*_per_sec`` is better when higher, ``*_ms`` when
+lower. Every case runs ``--repeat`` times and each metric keeps its best value,
+which filters out most scheduling noise. With a baseline file, every metric that moved the wrong way by more than
+``--tolerance`` is reported as a regression and the exit code is 1. Baselines are
+machine-specific; refresh them on the machine that compares with ``--save-baseline``,
+which stores each metric's median over ``--baseline-runs`` runs of the suite, so a
+single lucky run does not set a bar the next ones miss.
+
+Usage: python -m benchmarks.suite [--cases env_step api_client ...] [--repeat N] [--output FILE]
+       [--baseline FILE] [--save-baseline] [--baseline-runs N] [--tolerance 0.25]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+import threading
+import urllib.request
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import synthetic_ohlcv, timed
+from benchmarks.stub_server import start_stub_server
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(HERE, 'results.json')
+
+# Dashboard endpoints hit in rotation by the load test
+DASHBOARD_PATHS = ('/api/market-data', '/api/wallet-balance', '/api/trading-status', '/api/trade-history',
+                   '/api/cache-stats')
+
+
+def percentiles_ms(latencies):
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return float(p50), float(p99)
+
+
+def bench_env_step():
+    from trading_env import TradingEnv
+    from benchmarks.bench_trading_env import run_episode
+
+    rows = 20000
+    env = TradingEnv(data=synthetic_ohlcv(rows), window_size=30)
+    actions = np.random.default_rng(2).integers(0, 3, rows)
+    steps, elapsed = timed(run_episode, env, actions, repeat=3)
+    return {"steps_per_sec": steps / elapsed}
+
+
+def bench_preprocess():
+    from data_processor import preprocess_data, update_live_data, LiveFrame
+    from streaming_indicators import IndicatorEngine
+
+    results = {}
+    for rows in (1000, 10000, 100000):
+        raw = synthetic_ohlcv(rows)
+        _, elapsed = timed(preprocess_data, raw, repeat=3)
+        results[f"preprocess_{rows}_rows_ms"] = elapsed * 1000
+
+    raw = synthetic_ohlcv(1001)
+    history = preprocess_data(raw.iloc[:-1])
+    tick = raw.iloc[-1].to_dict()
+    _, recompute = timed(update_live_data, history, tick, repeat=3)
+    engine = IndicatorEngine.from_frame(history)
+    _, incremental = timed(update_live_data, history, tick, engine=engine)
+    results["update_live_data_recompute_ms"] = recompute * 1000
+    results["update_live_data_streaming_ms"] = incremental * 1000
+    live = LiveFrame(history)
+    appends = 1000
+    _, elapsed = timed(lambda: [live.append(tick) for _ in range(appends)])
+    results["live_frame_append_ms"] = elapsed / appends * 1000
+    # yfinance history has a DatetimeIndex, which preprocess_data turns into a datetime 'date' column
+    dated = raw.set_index(pd.date_range('2024-01-01', periods=len(raw), freq='h', tz='UTC'))
+    live = LiveFrame(preprocess_data(dated.iloc[:-1]))
+    tick = dict(dated.iloc[-1].to_dict(), date=dated.index[-1])
+    _, elapsed = timed(lambda: [live.append(tick) for _ in range(appends)])
+    results["live_frame_append_dated_ms"] = elapsed / appends * 1000
+    return results
+
+
+def bench_observation():
+    from trading_bot import TradingBot
+
+    # A placeholder model skips model loading and training
+    bot = TradingBot(None, model=object())
+    closes = synthetic_ohlcv(200)['close'].to_numpy()
+    interval = bot.price_history.interval
+    start = time.time() - len(closes) * interval
+    for i, price in enumerate(closes):
+        bot.price_history.add_tick(float(price), 1.0, start + i * interval)
+    ticker = {"LastPrice": float(closes[-1])}
+    balance = {"Success": True, "Wallet": {"USD": {"Free": 10000.0}, "BTC": {"Free": 0.1}}}
+
+    latencies = []
+    for _ in range(200):
+        begin = time.perf_counter()
+        bot._prepare_observation(ticker, balance)
+        latencies.append(time.perf_counter() - begin)
+    p50, p99 = percentiles_ms(latencies)
+    return {"prepare_observation_p50_ms": p50, "prepare_observation_p99_ms": p99}
+
+
+def bench_api_client():
+    from api_client import RoostooClient
+
+    server = start_stub_server()
+    client = RoostooClient("key", "secret", f"http://127.0.0.1:{server.server_port}")
+    try:
+        results = {}
+        for name, call in (("ticker", lambda: client.get_ticker("BTC/USD")),
+                           ("balance", client.get_balance),
+                           ("snapshot", lambda: client.get_snapshot("BTC/USD", include_pending=True))):
+            call()  # Open the pooled connection first
+            latencies = []
+            # Enough requests that p99 is not just the third slowest of them
+            for _ in range(1000):
+                begin = time.perf_counter()
+                call()
+                latencies.append(time.perf_counter() - begin)
+            results[f"{name}_p50_ms"], results[f"{name}_p99_ms"] = percentiles_ms(latencies)
+        return results
+    finally:
+        client.close()
+        server.shutdown()
+
+
+def bench_dashboard_api(clients=8, duration=3.0):
+    from benchmarks.bench_event_stream import start_app, free_port
+
+    stub = start_stub_server()
+    directory = tempfile.mkdtemp(prefix='suite_')
+    env = dict(os.environ, BASE_URL=f'http://127.0.0.1:{stub.server_port}',
+               TRADER_STATE_PATH=os.path.join(directory, 'trader_state.db'),
+               DATABASE_URL=f"sqlite:///{os.path.join(directory, 'trading.db')}")
+    port = free_port()
+    process = start_app(port, env)
+    latencies, failures = [], []
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        i = offset
+        while time.monotonic() < deadline:
+            path = DASHBOARD_PATHS[i % len(DASHBOARD_PATHS)]
+            i += 1
+            begin = time.perf_counter()
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=10) as response:
+                    response.read()
+            except OSError:
+                failures.append(path)
+                continue
+            latencies.append(time.perf_counter() - begin)
+
+    try:
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+    finally:
+        process.terminate()
+        process.wait()
+        stub.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
+    p50, p99 = percentiles_ms(latencies)
+    return {"requests_per_sec": len(latencies) / elapsed, "request_p50_ms": p50, "request_p99_ms": p99,
+            "failed": len(failures)}
+
+
+CASES = {
+    "env_step": bench_env_step,
+    "preprocess": bench_preprocess,
+    "observation": bench_observation,
+    "api_client": bench_api_client,
+    "dashboard_api": bench_dashboard_api
+}
+
+
+def best_of(runs):
+    """Merge repeated runs of a case, keeping the best value of every metric"""
+    merged = dict(runs[0])
+    for run in runs[1:]:
+        for metric, value in run.items():
+            if metric.endswith("_per_sec"):
+                merged[metric] = max(merged[metric], value)
+            elif metric.endswith("_ms"):
+                merged[metric] = min(merged[metric], value)
+            else:
+                merged[metric] = max(merged[metric], value)
+    return merged
+
+
+def median_of(runs):
+    """Merge runs of a case, keeping the median value of every metric"""
+    return {metric: float(np.median([run[metric] for run in runs])) for metric in runs[0]}
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with a baseline
+
+    Args:
+        results (dict): Case -> metric -> value
+        baseline (dict): Same layout, from an earlier run
+        tolerance (float): Relative change in the wrong direction that counts as a regression
+
+    Returns:
+        list: (case, metric, baseline value, current value, relative change, regressed) per shared metric
+    """
+    rows = []
+    for case, metrics in results.items():
+        for metric, value in metrics.items():
+            previous = baseline.get(case, {}).get(metric)
+            if previous is None or not metric.endswith(("_per_sec", "_ms")):
+                continue
+            change = (value - previous) / previous if previous else 0.0
+            worse = -change if metric.endswith("_per_sec") else change
+            rows.append((case, metric, previous, value, change, worse > tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the benchmark suite')
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=list(CASES),
+                        help='Cases to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case, best value kept (default: 3)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f'Results file (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help=f'Baseline file (default: {DEFAULT_BASELINE})')
+    parser.add_argument('--save-baseline', action='store_true', help='Also write the results as the new baseline')
+    parser.add_argument('--baseline-runs', type=int, default=5,
+                        help='Suite runs whose median is saved with --save-baseline (default: 5)')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Relative slowdown reported as a regression (default: 0.25)')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = {}
+    runs = args.baseline_runs if args.save_baseline else 1
+    for name in args.cases:
+        start = time.perf_counter()
+        results[name] = median_of([best_of([CASES[name]() for _ in range(args.repeat)]) for _ in range(runs)])
+        print(f"{name}: done in {time.perf_counter() - start:.1f}s")
+        for metric, value in results[name].items():
+            print(f"  {metric:<36} {value:>12.3f}")
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "results": results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\ncompared with {args.baseline} ({baseline.get('timestamp')}, {baseline.get('machine')}):")
+        print(f"{'metric':<44} {'baseline':>12} {'current':>12} {'change':>8}")
+        for case, metric, previous, value, change, regressed in compare(results, baseline["results"], args.tolerance):
+            print(f"{case + '.' + metric:<44} {previous:>12.3f} {value:>12.3f} {change:>+8.1%}"
+                  f"{'  REGRESSION' if regressed else ''}")
+            if regressed:
+                regressions.append(f"{case}.{metric}")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
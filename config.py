@@ -4,10 +4,81 @@ import os
 API_KEY = os.getenv('API_KEY', 'e9WneuGa4mnfivi96myjEeCF34R9DZZ7W1e3hGX7Dd5tfqXotyMpmV3ICoZ7V1KF')
 SECRET_KEY = os.getenv('SECRET_KEY', 'VfIywmdqBDCNa1XSY3qdqrWDrcFhvHVIdvo2vmi8fY3JPUjEbrIn9gtDX2WOk7d5')
 BASE_URL = os.getenv('BASE_URL', 'https://mock-api.roostoo.com')
+API_TIMEOUT = float(os.getenv('API_TIMEOUT', '10'))  # Connect/read timeout in seconds
+API_POOL_SIZE = int(os.getenv('API_POOL_SIZE', '4'))  # Keep-alive connections per host
+API_MAX_IDLE = float(os.getenv('API_MAX_IDLE', '4'))  # Seconds an idle connection is reused (keep below the server's keep-alive timeout)
+
+# Client-side request budgets per process: (requests per second, burst) for public and signed endpoints
+RATE_LIMITS = {
+    "public": (float(os.getenv('RATE_LIMIT_PUBLIC', '10')), 20),
+    "signed": (float(os.getenv('RATE_LIMIT_SIGNED', '5')), 10)
+}
+RATE_LIMIT_MAX_WAIT = 2.0  # Longest expected queue wait (seconds) before a read is shed
+RATE_LIMIT_MAX_QUEUE = 50  # Reads queued per budget before more are shed
+RATE_LIMIT_ORDER_RESERVE = 2  # Tokens per budget that reads leave for order placement
+
+# Seconds to reuse exchange responses across dashboards and the trading loop
+CACHE_TTLS = {
+    "ticker": 2.0,
+    "balance": 5.0,
+    "pending_count": 5.0,
+    "query_order": 10.0,
+    "exchange_info": 3600.0
+}
+
+# Dashboard push stream: seconds between upstream refreshes per event (one producer per web worker)
+STREAM_INTERVALS = {
+    "ticker": 5.0,
+    "balance": 15.0,
+    "status": 2.0,
+    "trades": 5.0
+}
+STREAM_KEEPALIVE = 15.0  # Seconds between keep-alive comments on an idle stream
+STREAM_QUEUE_SIZE = 64  # Events buffered per subscriber before it is dropped as too slow
+
+# Local cache of downloaded OHLCV history
+DATA_CACHE_DIR = os.getenv('DATA_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_cache'))
+DATA_REFRESH_TIMEOUT = 3.0  # Seconds for the single attempt to extend a stale cache (it falls back to the cached bars)
+
+# State shared by the web workers and the trader process (see trader.py)
+TRADER_STATE_PATH = os.getenv('TRADER_STATE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'trader_state.db'))
+TRADER_LOOP_INTERVAL = float(os.getenv('TRADER_LOOP_INTERVAL', '10'))  # Seconds between trading steps
+TRADER_HEARTBEAT_TIMEOUT = 30.0  # Seconds without a heartbeat before the trader counts as down
+
+# Trade and performance history (models.py); Postgres when DATABASE_URL is provisioned
+DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///' + os.path.join(os.path.dirname(os.path.abspath(__file__)), 'trading.db'))
+DB_WRITE_BATCH_SIZE = 200  # Buffered rows that trigger a flush before the interval
+DB_FLUSH_INTERVAL = 5.0  # Seconds between background flushes of buffered rows
+DB_MAX_PENDING = 10000  # Buffered rows kept while the database is unavailable
+METRICS_INTERVAL = 60.0  # Seconds between PerformanceMetric snapshots while trading
+TRADE_HISTORY_PAGE_SIZE = 50  # Default and maximum /api/trade-history page sizes
+TRADE_HISTORY_MAX_PAGE_SIZE = 500
+ORDER_SYNC_INTERVAL = 10.0  # Minimum seconds between syncs of exchange orders into the history
+ORDER_SYNC_PAGE_SIZE = 100  # Orders per query_order call while syncing
+ORDER_POLL_INTERVAL = 5.0  # Seconds between pending_count checks of open orders
+ORDER_SWEEP_MAX_AGE = 60.0  # Longest time open orders go without a status sweep
 
 # Trading parameters
 INITIAL_BALANCE = 10000.0  # Initial balance for backtest
 WINDOW_SIZE = 12  # Number of time periods to consider for state
+REWARD_SCALING = 1e-4  # Scale portfolio value changes into rewards
+BAR_INTERVAL = int(os.getenv('BAR_INTERVAL', '60'))  # Seconds of ticks aggregated into one live bar
+PRICE_HISTORY_SIZE = 1024  # Live bars kept in memory
+TRADE_INTERVAL = int(os.getenv('TRADE_INTERVAL', '60'))  # Minimum seconds between live trades
+RISK_PERCENTAGE = 2.0  # Percent of the quote balance risked per trade
+MAX_POSITION_SIZE = 0.1  # Largest order size in base currency units
+TRADING_PAIRS = os.getenv('TRADING_PAIRS', 'BTC/USD').split(',')  # Pairs traded by the portfolio engine
+MIN_ORDER_VALUE = 1.0  # Smallest order the portfolio engine places, in quote currency
+
+# Indicator parameters
+SMA_PERIODS = [5, 20, 50]
+RSI_PERIOD = 14
 
 # Model parameters
-MODEL_PATH = "ppo_trading_bot"
\ No newline at end of file
+MODEL_PATH = "ppo_trading_bot"
+
+# Logging (see structured_logging.py)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()  # Root log level
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # "json" (one object per line) or "text"
+LOG_QUEUE_SIZE = 10000  # Records waiting for the background writer before new ones are dropped
+LOG_SAMPLE_EVERY = 100  # Sampled payload logs keep 1 record in this many per message
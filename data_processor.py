@@ -1,21 +1,52 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import logging
 import time
 from datetime import datetime, timedelta
-import ta
+from config import DATA_REFRESH_TIMEOUT
+from ohlcv_cache import get_default_cache
 
 logger = logging.getLogger(__name__)
 
-def fetch_historical_data(symbol, period="1y", interval="1d"):
+def _download_history(symbol, interval, period=None, start=None, max_retries=3, timeout=10):
+    """Download bars from yfinance with retries (imported lazily so cache hits skip it)"""
+    import yfinance as yf
+    
+    # Retry mechanism for robustness
+    for attempt in range(max_retries):
+        try:
+            if start is not None:
+                data = yf.download(symbol, start=start, interval=interval, timeout=timeout)
+            else:
+                data = yf.download(symbol, period=period, interval=interval, timeout=timeout)
+            
+            if data is not None and len(data) > 0:
+                logger.info(f"Successfully fetched {len(data)} data points")
+                return data
+            
+            logger.warning(f"No data returned (attempt {attempt+1}/{max_retries})")
+            
+        except Exception as e:
+            logger.error(f"Error in attempt {attempt+1}/{max_retries}: {str(e)}")
+        
+        if attempt + 1 < max_retries:
+            time.sleep(2)  # Wait before retrying
+    
+    logger.error(f"Failed to fetch data after {max_retries} attempts")
+    return None
+
+def fetch_historical_data(symbol, period="1y", interval="1d", use_cache=True):
     """
     Fetch historical price data using yfinance.
     
+    Bars are kept in the local OHLCV cache, so repeated calls only download
+    the bars that arrived since the last call.
+    
     Args:
         symbol (str): Symbol to fetch data for (e.g., "BTC-USD")
         period (str): Time period to fetch (e.g., "1y" for 1 year)
         interval (str): Data interval (e.g., "1d" for daily)
+        use_cache (bool): Read and update the local cache. Defaults to True.
     
     Returns:
         pd.DataFrame: DataFrame with historical price data
@@ -23,25 +54,16 @@ def fetch_historical_data(symbol, period="1y", interval="1d"):
     try:
         logger.info(f"Fetching historical data for {symbol} ({period}, {interval})")
         
-        # Retry mechanism for robustness
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                data = yf.download(symbol, period=period, interval=interval)
-                
-                if data is not None and len(data) > 0:
-                    logger.info(f"Successfully fetched {len(data)} data points")
-                    return data
-                
-                logger.warning(f"No data returned (attempt {attempt+1}/{max_retries})")
-                time.sleep(2)  # Wait before retrying
-                
-            except Exception as e:
-                logger.error(f"Error in attempt {attempt+1}/{max_retries}: {str(e)}")
-                time.sleep(2)  # Wait before retrying
-        
-        logger.error(f"Failed to fetch data after {max_retries} attempts")
-        return None
+        def download(period=None, start=None):
+            if start is not None:
+                # Extending a stale cache: one quick attempt, the cached bars are the fallback
+                return _download_history(symbol, interval, start=start, max_retries=1, timeout=DATA_REFRESH_TIMEOUT)
+            return _download_history(symbol, interval, period=period)
+        
+        cache = get_default_cache()
+        if use_cache and cache.available:
+            return cache.fetch(symbol, period, interval, download)
+        return download(period=period)
         
     except Exception as e:
         logger.error(f"Error fetching historical data: {str(e)}")
@@ -57,6 +79,8 @@ def preprocess_data(data):
     Returns:
         pd.DataFrame: Preprocessed data ready for the trading environment
     """
+    import ta
+    
     try:
         if data is None or len(data) == 0:
             logger.error("No data to preprocess")
@@ -107,7 +131,7 @@ def preprocess_data(data):
         df['bollinger_low'] = bollinger.bollinger_lband()
         
         # Volume
-        df['volume_sma'] = ta.volume.sma_volume(df['volume'], window=20)
+        df['volume_sma'] = ta.trend.sma_indicator(df['volume'], window=20)
         
         # Fill NaN values
         df.fillna(0, inplace=True)
@@ -122,18 +146,40 @@ def preprocess_data(data):
         logger.error(f"Error preprocessing data: {str(e)}")
         return None
 
-def update_live_data(df, new_data_point):
+def _normalize_bar(new_data_point):
+    """Lowercase a live bar's keys, using 'adj close' as the close like preprocess_data"""
+    row = {key.lower(): value for key, value in new_data_point.items()}
+    if 'adj close' in row:
+        row['close'] = row.pop('adj close')
+    return row
+
+def _live_row(new_data_point, engine):
+    """Normalize a live bar's keys and add its indicator values from the engine"""
+    row = _normalize_bar(new_data_point)
+    for name, value in engine.update(row).items():
+        row[name] = 0 if value != value else value
+    return row
+
+def update_live_data(df, new_data_point, engine=None):
     """
     Update the dataset with a new data point for live trading.
     
     Args:
         df (pd.DataFrame): Existing dataset
         new_data_point (dict): New data point to add
+        engine (IndicatorEngine, optional): Streaming indicator state for ``df``. When
+            given, only the new row's indicators are computed instead of reprocessing
+            the whole dataset. Returning a new DataFrame still copies every row; use
+            ``LiveFrame`` for appends that don't grow with the history.
     
     Returns:
         pd.DataFrame: Updated dataset
     """
     try:
+        if engine is not None:
+            # O(1) indicator update, same values as preprocess_data, then an O(n) copy into the new frame
+            return pd.concat([df, pd.DataFrame([_live_row(new_data_point, engine)])], ignore_index=True)
+
         # Create a new row
         new_row = pd.DataFrame([new_data_point])
         
@@ -146,3 +192,118 @@ def update_live_data(df, new_data_point):
     except Exception as e:
         logger.error(f"Error updating live data: {str(e)}")
         return df  # Return original on error
+
+
+class LiveFrame:
+    """Preprocessed bars in preallocated column arrays for constant-time live appends
+
+    Holds the columns of ``preprocess_data`` output. Capacity doubles when full, so
+    ``append`` costs O(1) amortized however long the history is; ``frame`` builds a
+    DataFrame only when one is needed. Numeric columns are kept as float64, so live
+    values such as a fractional volume are not truncated to an integer column's type.
+    Datetime columns (the 'date' of a DatetimeIndex history) keep their timezone.
+    """
+
+    def __init__(self, data, engine=None, capacity=None):
+        """
+        Copy preprocessed bars into the buffer
+
+        Args:
+            data (pd.DataFrame): Output of ``preprocess_data``
+            engine (IndicatorEngine, optional): Indicator state after ``data``. Defaults to one built from ``data``.
+            capacity (int, optional): Initial rows allocated. Defaults to twice the data length.
+        """
+        from streaming_indicators import IndicatorEngine
+
+        self.columns = list(data.columns)
+        self.length = len(data)
+        capacity = max(capacity or 2 * self.length, self.length, 16)
+        self._arrays = {}
+        self._timezones = {}  # Datetime column -> its timezone (None if naive), stored as naive UTC
+        for column in self.columns:
+            series = data[column]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                tz = series.dt.tz
+                self._timezones[column] = tz
+                values = (series.dt.tz_convert(None) if tz is not None else series).to_numpy()
+            elif pd.api.types.is_numeric_dtype(series):
+                values = series.to_numpy(dtype=np.float64)
+            else:
+                values = series.to_numpy(dtype=object)
+            array = np.empty(capacity, dtype=values.dtype)
+            array[:self.length] = values
+            self._arrays[column] = array
+        self.engine = engine or IndicatorEngine.from_frame(data)
+        # How each column that doesn't come from the engine is read from a live bar
+        self._bar_columns = [(column, column.lower(), self._arrays[column].dtype == np.float64)
+                             for column in self.columns if column not in IndicatorEngine.COLUMNS]
+
+    def __len__(self):
+        return self.length
+
+    def _grow(self):
+        for column, array in self._arrays.items():
+            grown = np.empty(2 * len(array), dtype=array.dtype)
+            grown[:self.length] = array[:self.length]
+            self._arrays[column] = grown
+
+    def _timestamp(self, value, tz):
+        """A bar time as stored in a datetime column (naive UTC when the column has a timezone)"""
+        timestamp = pd.Timestamp.now(tz=tz) if value is None else pd.Timestamp(value)
+        if tz is not None:
+            timestamp = (timestamp.tz_localize(tz) if timestamp.tz is None else timestamp).tz_convert(None)
+        elif timestamp.tz is not None:
+            timestamp = timestamp.tz_localize(None)
+        return timestamp.to_datetime64()
+
+    def append(self, new_data_point):
+        """
+        Add one live bar with its indicators
+
+        Every column is converted before the indicator engine consumes the bar, so a
+        bar that can't be stored leaves both the buffer and the engine unchanged.
+
+        Args:
+            new_data_point (dict): Raw bar (open/high/low/close/volume, any case). Datetime
+                columns take the bar's value for them if present, otherwise the current time.
+
+        Returns:
+            dict: The stored row (other columns missing from the bar are NaN, or None if not numeric)
+        """
+        bar = _normalize_bar(new_data_point)
+        values = {}
+        for column, key, numeric in self._bar_columns:
+            value = bar.get(key)
+            if numeric:
+                values[column] = np.nan if value is None else float(value)
+            elif column in self._timezones:
+                values[column] = self._timestamp(value, self._timezones[column])
+            else:
+                values[column] = value
+
+        for name, value in self.engine.update(bar).items():
+            values[name] = 0 if value != value else value
+        if self.length == len(self._arrays[self.columns[0]]):
+            self._grow()
+        stored = {}
+        for column, array in self._arrays.items():
+            stored[column] = array[self.length] = values.get(column, np.nan)
+        self.length += 1
+        for column, tz in self._timezones.items():
+            stored[column] = pd.Timestamp(stored[column]) if tz is None else pd.Timestamp(stored[column], tz='UTC').tz_convert(tz)
+        return stored
+
+    def column(self, name):
+        """Return a view of one column's filled rows (datetime columns with a timezone hold naive UTC)"""
+        return self._arrays[name][:self.length]
+
+    def _dates(self, name):
+        """A datetime column's filled rows in its own timezone"""
+        dates = pd.DatetimeIndex(self.column(name))
+        tz = self._timezones[name]
+        return dates if tz is None else dates.tz_localize('UTC').tz_convert(tz)
+
+    def frame(self):
+        """Return the bars as a DataFrame (copies the rows)"""
+        return pd.DataFrame({column: self._dates(column) if column in self._timezones else self.column(column)
+                             for column in self.columns})
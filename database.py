@@ -0,0 +1,46 @@
+import sqlite3
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import DeclarativeBase
+from config import DATABASE_URL
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+# Models (models.py) are declared on this object; app.py binds it to the Flask app,
+# while the trader process uses the same tables through a plain engine
+db = SQLAlchemy(model_class=Base)
+
+ENGINE_OPTIONS = {"pool_pre_ping": True}
+
+
+@event.listens_for(Engine, "connect")
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    """Let the web workers and the trader write one SQLite file concurrently"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
+def make_engine(url=DATABASE_URL):
+    """
+    Create an engine for processes without a Flask app
+
+    Args:
+        url (str, optional): Database URL. Defaults to DATABASE_URL.
+
+    Returns:
+        Engine: SQLAlchemy engine
+    """
+    return create_engine(url, **ENGINE_OPTIONS)
+
+
+def create_tables(engine):
+    """Create the model tables (and their indexes) that do not exist yet"""
+    import models  # Registers the tables on db.metadata
+    db.metadata.create_all(engine)
@@ -0,0 +1,156 @@
+import json
+import queue
+import logging
+import threading
+from scheduler import DeadlineScheduler
+from config import STREAM_KEEPALIVE, STREAM_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(name, data):
+    """Encode one Server-Sent Event"""
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode("utf-8")
+
+
+class Subscription:
+    """One connected dashboard's queue of encoded events"""
+
+    def __init__(self, maxsize=STREAM_QUEUE_SIZE):
+        self.queue = queue.Queue(maxsize)
+        self.closed = False
+
+    def events(self, keepalive=STREAM_KEEPALIVE):
+        """
+        Yield encoded events until the subscription is closed
+
+        A comment line is sent after ``keepalive`` idle seconds so proxies keep the
+        connection open and a vanished client is detected by the failing write.
+        """
+        while not self.closed:
+            try:
+                chunk = self.queue.get(timeout=keepalive)
+            except queue.Empty:
+                yield b": keepalive\n\n"
+                continue
+            if chunk is None:
+                return
+            yield chunk
+
+    def close(self):
+        self.closed = True
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+
+class EventBroadcaster:
+    """Single upstream producer fanning events out to every connected dashboard
+
+    Sources are polled on a DeadlineScheduler in one background thread, and only
+    while somebody is subscribed, so exchange calls depend on the refresh intervals
+    rather than on the number of open dashboards. Each event is encoded once and the
+    same bytes are queued for every subscriber; a subscriber whose queue fills up is
+    dropped (EventSource reconnects and gets the latest snapshot again).
+    """
+
+    def __init__(self, queue_size=STREAM_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._latest = {}
+        self._lock = threading.Lock()
+        self._scheduler = DeadlineScheduler()
+        self._thread = None
+        self._published = 0
+        self._dropped = 0
+
+    def add_source(self, name, interval, fetch, replay=True, only_changes=False):
+        """
+        Publish the result of ``fetch`` as event ``name`` every ``interval`` seconds
+
+        Args:
+            name (str): Event name
+            interval (float): Seconds between polls
+            fetch (callable): Returns the event payload, or None to publish nothing
+            replay (bool, optional): Send the latest payload to new subscribers. Defaults to True.
+            only_changes (bool, optional): Skip payloads equal to the previous one. Defaults to False.
+        """
+        last = {}
+
+        def poll():
+            if not self._subscribers:
+                return
+            data = fetch()
+            if data is None:
+                return
+            if only_changes:
+                if last.get("data") == data:
+                    return
+                last["data"] = data
+            self.publish(name, data, replay=replay)
+
+        self._scheduler.add(name, interval, poll)
+
+    def publish(self, name, data, replay=True):
+        """Queue an event for every subscriber"""
+        chunk = format_event(name, data)
+        with self._lock:
+            if replay:
+                self._latest[name] = chunk
+            subscribers = list(self._subscribers)
+            self._published += 1
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(chunk)
+            except queue.Full:
+                logger.warning("Dropping slow event stream subscriber")
+                self.unsubscribe(subscription)
+                with self._lock:
+                    self._dropped += 1
+
+    def subscribe(self):
+        """
+        Register a new dashboard connection
+
+        Returns:
+            Subscription: Starts with the latest payload of every replayed source
+        """
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            for chunk in self._latest.values():
+                subscription.queue.put_nowait(chunk)
+            self._subscribers.add(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._scheduler.run, name="event-stream", daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+        subscription.close()
+
+    def stats(self):
+        """
+        Return fan-out counters
+
+        Returns:
+            dict: subscribers, published events, dropped subscribers and per-source schedule stats
+        """
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self._published,
+                "dropped": self._dropped,
+                "sources": self._scheduler.stats()
+            }
+
+    def close(self):
+        """Stop the producer and disconnect everyone"""
+        self._scheduler.stop()
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscription in subscribers:
+            subscription.close()
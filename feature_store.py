@@ -0,0 +1,223 @@
+import os
+import numpy as np
+import logging
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+# Number of features appended after the price window in an observation:
+# balance, crypto owned, sma5, sma20, rsi, macd, volume sma, position flag
+NUM_EXTRA_FEATURES = 8
+
+# Column offsets of the portfolio-dependent features (relative to window_size)
+BALANCE_COL = 0
+CRYPTO_COL = 1
+POSITION_COL = 7
+
+
+def _ewm_weights(alpha, length):
+    """Weights that reproduce an ``ewm(adjust=False)`` mean over a fixed window
+
+    The recursion ``y_t = (1 - alpha) * y_{t-1} + alpha * x_t`` seeded with
+    ``y_0 = x_0`` is a finite linear filter once the window length is fixed,
+    so the value at the end of every window is a dot product with these weights.
+
+    Args:
+        alpha (float): Smoothing factor
+        length (int): Window length
+
+    Returns:
+        np.ndarray: Weights ordered oldest to newest
+    """
+    decay = (1.0 - alpha) ** np.arange(length - 1, -1, -1, dtype=np.float64)
+    weights = alpha * decay
+    weights[0] = decay[0]
+    return weights
+
+
+def build_feature_table(close, volume, window_size):
+    """Compute the static part of every observation in one vectorized pass
+
+    Args:
+        close (np.ndarray): Close prices, at least ``window_size`` of them
+        volume (np.ndarray): Volumes aligned with ``close``, or None
+        window_size (int): Number of past bars in each observation
+
+    Returns:
+        np.ndarray: float32 table of shape (len(close) - window_size + 1, window_size + 8)
+    """
+    # Row r holds the window close[r:r + w], i.e. the observation at step r + w
+    windows = sliding_window_view(close, window_size)
+    volume_windows = sliding_window_view(volume, window_size) if volume is not None else None
+    # Consecutive windows share all but one price change, so difference the series once
+    diff_windows = sliding_window_view(np.diff(close), window_size - 1) if window_size >= 14 else None
+    return window_features(windows, volume_windows, diff_windows)
+
+
+def window_features(windows, volume_windows=None, diff_windows=None):
+    """Compute the static observation features of a batch of price windows
+
+    Each row is handled independently, so the rows may be overlapping windows of one
+    series (``build_feature_table``) or the latest windows of different pairs.
+
+    Args:
+        windows (np.ndarray): Close prices, shape (N, window_size), oldest first
+        volume_windows (np.ndarray, optional): Volumes aligned with ``windows``. Defaults to None.
+        diff_windows (np.ndarray, optional): Price changes within each window, shape (N, window_size - 1).
+            Computed from ``windows`` when None. Defaults to None.
+
+    Returns:
+        np.ndarray: float32 table of shape (N, window_size + 8)
+    """
+    w = windows.shape[1]
+    window_max = windows.max(axis=1)
+    has_scale = window_max > 0
+    scale = np.where(has_scale, window_max, 1.0)
+
+    table = np.zeros((windows.shape[0], w + NUM_EXTRA_FEATURES), dtype=np.float32)
+    table[:, :w] = windows / scale[:, None]
+
+    # Simple moving averages of the window tail, normalized by the window max
+    if w >= 5:
+        table[:, w + 2] = np.where(has_scale, windows[:, -5:].mean(axis=1) / scale, 0)
+    if w >= 20:
+        table[:, w + 3] = np.where(has_scale, windows[:, -20:].mean(axis=1) / scale, 0)
+
+    # RSI(14) with Wilder smoothing restarted at the beginning of each window
+    if w >= 14:
+        diff = np.diff(windows, axis=1) if diff_windows is None else diff_windows
+        up = np.where(diff > 0, diff, 0.0)
+        down = np.where(diff < 0, -diff, 0.0)
+        weights = _ewm_weights(1 / 14, w)[1:]
+        ema_up = up @ weights
+        ema_down = down @ weights
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(ema_down == 0, 100.0, 100.0 - 100.0 / (1.0 + ema_up / ema_down))
+        table[:, w + 4] = rsi / 100.0
+
+    # MACD line (EMA12 - EMA26) restarted at the beginning of each window
+    if w >= 26:
+        ema_fast = windows @ _ewm_weights(2 / 13, w)
+        ema_slow = windows @ _ewm_weights(2 / 27, w)
+        table[:, w + 5] = np.where(has_scale, (ema_fast - ema_slow) / scale, 0)
+
+    # Raw 5-bar volume average
+    if volume_windows is not None and w >= 5:
+        table[:, w + 6] = volume_windows[:, -5:].mean(axis=1)
+
+    return table
+
+
+class FeatureStore:
+    """Array-backed observation features for a historical price series
+
+    Every indicator the environment needs is computed once for the whole series
+    with the same trailing-window semantics as the per-step ``ta`` calculation,
+    and stored in a contiguous float32 table indexed by environment step.
+    """
+
+    def __init__(self, data, window_size):
+        """
+        Build the feature table
+
+        Args:
+            data (pd.DataFrame): Price data with a 'close' column and optional 'volume'
+            window_size (int): Number of past bars in each observation
+        """
+        self.window_size = window_size
+        self.prices = np.ascontiguousarray(data['close'].to_numpy(dtype=np.float64))
+
+        if len(self.prices) < window_size:
+            raise ValueError(f"Need at least {window_size} rows of data, got {len(self.prices)}")
+
+        if 'volume' in data.columns:
+            volume = data['volume'].to_numpy(dtype=np.float64)
+        else:
+            volume = None
+
+        self.table = build_feature_table(self.prices, volume, window_size)
+        logger.info(f"Built feature store with {self.table.shape[0]} steps x {self.table.shape[1]} features")
+
+    def save(self, directory):
+        """Write the arrays to ``directory`` so other processes can memory-map them
+
+        Args:
+            directory (str): Target directory (ideally on tmpfs, e.g. /dev/shm)
+
+        Returns:
+            str: The directory the arrays were written to
+        """
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'prices.npy'), self.prices)
+        np.save(os.path.join(directory, 'table.npy'), self.table)
+        return directory
+
+    @classmethod
+    def load(cls, directory, window_size, mmap_mode='r'):
+        """Attach to arrays written by ``save`` without recomputing anything
+
+        With the default read-only memory map every process shares the same
+        physical pages instead of holding its own copy.
+
+        Args:
+            directory (str): Directory passed to ``save``
+            window_size (int): Window size the store was built with
+            mmap_mode (str, optional): Memory-map mode for np.load. Defaults to 'r'.
+
+        Returns:
+            FeatureStore: Store backed by the mapped arrays
+        """
+        store = cls.__new__(cls)
+        store.window_size = window_size
+        store.prices = np.asarray(np.load(os.path.join(directory, 'prices.npy'), mmap_mode=mmap_mode))
+        store.table = np.asarray(np.load(os.path.join(directory, 'table.npy'), mmap_mode=mmap_mode))
+        if store.table.shape[1] != window_size + NUM_EXTRA_FEATURES:
+            raise ValueError(f"Feature table in {directory} was not built for window size {window_size}")
+        return store
+
+    def __len__(self):
+        return self.table.shape[0]
+
+    def row_index(self, step):
+        """Map an environment step to its row in the feature table"""
+        return step - self.window_size
+
+    def price_window(self, step):
+        """Return a view of the raw close prices preceding ``step``"""
+        return self.prices[max(0, step - self.window_size):step]
+
+    def observation(self, step, balance_norm, crypto_owned):
+        """Gather the observation vector for a single step
+
+        Args:
+            step (int): Current environment step
+            balance_norm (float): Cash balance relative to the initial balance
+            crypto_owned (float): Amount of crypto currently held
+
+        Returns:
+            np.ndarray: float32 observation of length window_size + 8
+        """
+        obs = self.table[step - self.window_size].copy()
+        w = self.window_size
+        obs[w + BALANCE_COL] = balance_norm
+        obs[w + CRYPTO_COL] = crypto_owned
+        obs[w + POSITION_COL] = 1 if crypto_owned > 0 else 0
+        return obs
+
+    def observations(self, steps, balance_norm, crypto_owned):
+        """Gather observation vectors for a batch of steps
+
+        Args:
+            steps (np.ndarray): Environment steps, shape (N,)
+            balance_norm (np.ndarray): Normalized cash balances, shape (N,)
+            crypto_owned (np.ndarray): Crypto holdings, shape (N,)
+
+        Returns:
+            np.ndarray: float32 observations of shape (N, window_size + 8)
+        """
+        obs = self.table[np.asarray(steps) - self.window_size]
+        w = self.window_size
+        obs[:, w + BALANCE_COL] = balance_norm
+        obs[:, w + CRYPTO_COL] = crypto_owned
+        obs[:, w + POSITION_COL] = crypto_owned > 0
+        return obs
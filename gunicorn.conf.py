@@ -0,0 +1,8 @@
+import os
+
+# Picked up automatically by `gunicorn main:app` (see .replit).
+# Every open dashboard holds a request thread for its /api/stream connection,
+# so workers are threaded instead of gunicorn's default single-request sync workers.
+worker_class = "gthread"
+workers = int(os.getenv("GUNICORN_WORKERS", "1"))
+threads = int(os.getenv("GUNICORN_THREADS", "256"))
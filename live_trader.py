@@ -1,7 +1,7 @@
 import logging
 import time
 import numpy as np
-from stable_baselines3 import PPO
+from policy_export import load_policy
 from utils import log_trade
 from config import TRADE_INTERVAL, MAX_POSITION_SIZE, RISK_PERCENTAGE
 
@@ -14,13 +14,14 @@ class LiveTrader:
         self.api_client = api_client
         self.trading_env = trading_env
         self.model_path = model_path
-        self.last_trade_time = 0
+        self.last_trade_time = None  # time.monotonic() of the last executed trade
+        self.min_trade_interval = TRADE_INTERVAL
         self.risk_percentage = RISK_PERCENTAGE
         self.max_position_size = MAX_POSITION_SIZE
         
         # Load the model
         try:
-            self.model = PPO.load(model_path)
+            self.model = load_policy(model_path)
             logger.info(f"Loaded model from {model_path}")
         except Exception as e:
             logger.error(f"Error loading model: {str(e)}")
@@ -30,11 +31,30 @@ class LiveTrader:
         self.obs = self.trading_env.reset()
         logger.info("Initialized live trader")
     
-    def _calculate_position_size(self, price):
+    def schedule(self, scheduler, name="BTC/USD", interval=TRADE_INTERVAL):
+        """
+        Run ``execute_trading_step`` on a DeadlineScheduler, aligned to ``interval`` boundaries
+        
+        The schedule spaces the steps, so the time-since-last-trade guard is turned off;
+        with it, tick jitter of a few milliseconds would skip every other trade.
+        
+        Args:
+            scheduler (DeadlineScheduler): Event loop shared with other pairs
+            name (str, optional): Schedule name. Defaults to "BTC/USD".
+            interval (float, optional): Seconds between steps. Defaults to TRADE_INTERVAL.
+        
+        Returns:
+            Schedule: The registered job
+        """
+        self.min_trade_interval = 0.0
+        return scheduler.add(name, interval, self.execute_trading_step, align=True)
+    
+    def _calculate_position_size(self, price, balance_data=None):
         """Calculate appropriate position size based on portfolio and risk management"""
         try:
-            # Fetch current balance
-            balance_data = self.api_client.get_balance()
+            # Fetch current balance unless the caller already has it
+            if balance_data is None:
+                balance_data = self.api_client.get_balance()
             
             # Get USD and BTC balances
             if "Wallet" in balance_data:
@@ -44,10 +64,10 @@ class LiveTrader:
                 usd_balance = balance_data["SpotWallet"].get("USD", {}).get("Free", 0)
                 btc_balance = balance_data["SpotWallet"].get("BTC", {}).get("Free", 0)
             else:
-                logger.error(f"Unexpected balance data format: {balance_data}")
+                logger.error("Unexpected balance data format: %s", balance_data)
                 return 0.01  # Default to minimum
             
-            logger.info(f"Current balance - USD: {usd_balance}, BTC: {btc_balance}")
+            logger.info("Current balance - USD: %s, BTC: %s", usd_balance, btc_balance)
             
             # Calculate risk amount (e.g., 2% of USD balance)
             risk_amount = (self.risk_percentage / 100) * usd_balance
@@ -59,7 +79,8 @@ class LiveTrader:
             position_size = min(position_size, self.max_position_size)
             position_size = max(position_size, 0.01)  # Minimum of 0.01 BTC
             
-            logger.info(f"Calculated position size: {position_size:.8f} BTC (value: ${position_size * price:.2f}, {(position_size * price / usd_balance * 100):.2f}% of portfolio)")
+            logger.info("Calculated position size: %.8f BTC (value: $%.2f, %.2f%% of portfolio)",
+                        position_size, position_size * price, position_size * price / usd_balance * 100)
             
             return position_size
         except Exception as e:
@@ -72,25 +93,27 @@ class LiveTrader:
             logger.error("Model not loaded, cannot execute trading step")
             return False
         
-        current_time = time.time()
+        current_time = time.monotonic()
         
-        # Check if enough time has passed since last trade
-        if current_time - self.last_trade_time < TRADE_INTERVAL:
+        # Check if enough time has passed since last trade (monotonic, so clock adjustments don't matter)
+        if self.last_trade_time is not None and current_time - self.last_trade_time < self.min_trade_interval:
             # Not enough time has passed, skip this step
             return False
         
         try:
-            # Get market data
-            ticker_data = self.api_client.get_ticker("BTC/USD")
+            # Get market data and balance concurrently
+            snapshot = self.api_client.get_snapshot("BTC/USD")
+            ticker_data = snapshot["ticker"]
+            balance_data = snapshot["balance"]
             if "error" in ticker_data:
-                logger.error(f"Error fetching ticker data: {ticker_data['error']}")
+                logger.error("Error fetching ticker data: %s", ticker_data["error"])
                 return False
             
             # Extract current price
             current_price = ticker_data["Data"]["BTC/USD"]["LastPrice"]
             
-            # Update the environment with the current price
-            self.trading_env.current_price = current_price
+            # Update the environment with the current price and its live bar history
+            self.trading_env.update_price(current_price)
             
             # Get current observation from the environment
             self.obs = self.trading_env._get_observation()
@@ -101,10 +124,9 @@ class LiveTrader:
             # Execute the action in the environment to update internal state
             self.obs, reward, done, info = self.trading_env.step(action)
             
-            # Get balance info
-            balance_data = self.api_client.get_balance()
+            # Check balance info
             if "error" in balance_data:
-                logger.error(f"Error fetching balance: {balance_data['error']}")
+                logger.error("Error fetching balance: %s", balance_data["error"])
                 return False
             
             # Get current wallet balances
@@ -115,14 +137,14 @@ class LiveTrader:
                 usd_balance = balance_data["SpotWallet"].get("USD", {}).get("Free", 0)
                 btc_balance = balance_data["SpotWallet"].get("BTC", {}).get("Free", 0)
             else:
-                logger.error(f"Unexpected balance data format: {balance_data}")
+                logger.error("Unexpected balance data format: %s", balance_data)
                 return False
             
             # Convert action to trading decision
             if action == 1:  # BUY
                 if usd_balance >= current_price * 0.01:  # Ensure enough balance for min order
                     # Calculate position size based on risk management
-                    position_size = self._calculate_position_size(current_price)
+                    position_size = self._calculate_position_size(current_price, balance_data)
                     
                     # Execute the trade on the exchange
                     trade_result = self.api_client.place_order("BTC/USD", "BUY", position_size)
@@ -131,9 +153,9 @@ class LiveTrader:
                         log_trade("BUY", current_price, position_size, usd_balance, btc_balance)
                         self.last_trade_time = current_time
                     else:
-                        logger.error(f"Error executing BUY trade: {trade_result.get('ErrMsg', 'Unknown error')}")
+                        logger.error("Error executing BUY trade: %s", trade_result.get("ErrMsg", "Unknown error"))
                 else:
-                    logger.warning(f"Insufficient USD balance ({usd_balance}) for BUY at {current_price}")
+                    logger.warning("Insufficient USD balance (%s) for BUY at %s", usd_balance, current_price)
             
             elif action == 2:  # SELL
                 if btc_balance >= 0.01:  # Ensure we have BTC to sell
@@ -144,12 +166,12 @@ class LiveTrader:
                         log_trade("SELL", current_price, btc_balance, usd_balance, btc_balance)
                         self.last_trade_time = current_time
                     else:
-                        logger.error(f"Error executing SELL trade: {trade_result.get('ErrMsg', 'Unknown error')}")
+                        logger.error("Error executing SELL trade: %s", trade_result.get("ErrMsg", "Unknown error"))
                 else:
-                    logger.warning(f"Insufficient BTC balance ({btc_balance}) for SELL")
+                    logger.warning("Insufficient BTC balance (%s) for SELL", btc_balance)
             
             else:  # HOLD
-                logger.info(f"HOLD position at price {current_price}")
+                logger.info("HOLD position at price %s", current_price)
             
             return True
         
@@ -0,0 +1,127 @@
+import time
+import asyncio
+import logging
+from config import CACHE_TTLS
+
+logger = logging.getLogger(__name__)
+
+
+class MarketDataCache:
+    """Process-wide TTL cache with single-flight loading for exchange reads
+
+    Must be used from a single event loop (the client's background loop), which
+    serializes all access so no locking is needed. Concurrent requests for a key
+    that is being fetched wait for the in-flight request instead of issuing
+    their own.
+
+    ``invalidate`` bumps a generation counter per endpoint. A load that started before
+    the invalidation (e.g. a balance read racing an order) still answers its own
+    caller, but is neither cached nor shared with callers that arrive afterwards.
+    """
+
+    def __init__(self, ttls=None):
+        """
+        Initialize the cache
+
+        Args:
+            ttls (dict, optional): Seconds to keep each endpoint's responses. Defaults to CACHE_TTLS.
+        """
+        self.ttls = dict(CACHE_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self._entries = {}
+        self._inflight = {}
+        self._stats = {}
+        self._generations = {}
+        self._generation = 0  # Bumped by invalidate() without endpoints
+
+    def _count(self, endpoint, field):
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0}
+        stats[field] += 1
+
+    def _current_generation(self, endpoint):
+        return self._generation, self._generations.get(endpoint, 0)
+
+    async def get(self, endpoint, key, loader):
+        """Return a cached response, or load it once for all concurrent callers
+
+        Args:
+            endpoint (str): Endpoint name used for the TTL and counters
+            key (hashable): Cache key within the endpoint (e.g. the trading pair)
+            loader (callable): Coroutine function that fetches the response
+
+        Returns:
+            dict: Exchange response
+        """
+        full_key = (endpoint, key)
+        entry = self._entries.get(full_key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._count(endpoint, "hits")
+            return entry[1]
+
+        generation = self._current_generation(endpoint)
+        inflight = self._inflight.get(full_key)
+        if inflight is not None and inflight[0] == generation:
+            self._count(endpoint, "coalesced")
+            future = inflight[1]
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            # The caller that was loading got cancelled, this one was not: load it here
+            return await self.get(endpoint, key, loader)
+
+        self._count(endpoint, "misses")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = (generation, future)
+        try:
+            value = await loader()
+        except BaseException as e:
+            # Resolve the shared future on every exit, cancellation included, so waiters never hang
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark the exception as retrieved when no other caller was waiting
+                future.exception()
+            raise
+        finally:
+            if self._inflight.get(full_key, (None, None))[1] is future:
+                del self._inflight[full_key]
+
+        # Only successful responses are cached so errors are retried promptly, and only
+        # when no invalidation happened while loading
+        ttl = self.ttls.get(endpoint, 0)
+        if (ttl > 0 and isinstance(value, dict) and value.get("Success", True)
+                and self._current_generation(endpoint) == generation):
+            self._entries[full_key] = (time.monotonic() + ttl, value)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, *endpoints):
+        """Drop cached responses for the given endpoints (all if none given)"""
+        for full_key in list(self._entries):
+            if not endpoints or full_key[0] in endpoints:
+                del self._entries[full_key]
+        if endpoints:
+            for endpoint in endpoints:
+                self._generations[endpoint] = self._generations.get(endpoint, 0) + 1
+        else:
+            self._generation += 1
+        for endpoint in endpoints or list(self._stats):
+            self._count(endpoint, "invalidations")
+
+    def stats(self):
+        """Return hit/miss counters per endpoint
+
+        Returns:
+            dict: {endpoint: {"hits", "misses", "coalesced", "invalidations", "hit_rate"}}
+        """
+        result = {}
+        for endpoint, stats in list(self._stats.items()):
+            served = stats["hits"] + stats["misses"] + stats["coalesced"]
+            result[endpoint] = dict(stats, hit_rate=(stats["hits"] + stats["coalesced"]) / served if served else 0.0)
+        return result
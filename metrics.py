@@ -0,0 +1,289 @@
+import time
+import bisect
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from sub-millisecond compute stages to slow exchange calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Registry:
+    """Metrics of one process plus collectors that read component stats at scrape time"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add a Counter or Histogram"""
+        with self._lock:
+            self._metrics.append(metric)
+
+    def add_collector(self, collector):
+        """Add a callable that returns a list of families (see ``family``) on every collect"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self):
+        """
+        Return every metric family of this registry
+
+        Returns:
+            list: JSON-serializable families, safe to publish to another process
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+        families = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {str(e)}")
+        return families
+
+
+REGISTRY = Registry()
+
+
+def family(name, kind, documentation, samples):
+    """
+    Build a metric family
+
+    Args:
+        name (str): Metric name
+        kind (str): "counter", "gauge" or "histogram"
+        documentation (str): Help text
+        samples (list): (sample name, labels dict, value) triples
+
+    Returns:
+        dict: The family
+    """
+    return {"name": name, "type": kind, "help": documentation,
+            "samples": [[sample, labels, value] for sample, labels, value in samples]}
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def inc(self, *labels, amount=1):
+        """Add ``amount`` to the series with these label values"""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self):
+        """Return the counter as a family"""
+        with self._lock:
+            values = list(self._values.items())
+        return family(self.name, "counter", self.documentation,
+                      [(f"{self.name}_total", dict(zip(self.labelnames, labels)), value) for labels, value in values])
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets and optional labels"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def observe(self, value, *labels):
+        """Record one value in the series with these label values"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Bucket counts (the last one is +Inf), then sum
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, *labels):
+        """Context manager that observes the seconds spent in its block"""
+        return _Timer(self, labels)
+
+    def collect(self):
+        """Return the histogram as a family with cumulative buckets"""
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        samples = []
+        for labels, counts, total in series:
+            base = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", dict(base, le=_format_value(bound)), cumulative))
+            samples.append((f"{self.name}_sum", base, total))
+            samples.append((f"{self.name}_count", base, cumulative))
+        return family(self.name, "histogram", self.documentation, samples)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render(sources):
+    """
+    Render families in the Prometheus text format
+
+    Families with the same name from different sources are merged under one header.
+    Counter headers use the ``<name>_total`` name of their samples, as the reference
+    client does in this format, so the samples belong to the declared counter.
+
+    Args:
+        sources (list): (families, extra labels) pairs, e.g. this process's ``REGISTRY.collect()``
+            and the families published by another process, each with a ``process`` label
+
+    Returns:
+        str: The exposition text
+    """
+    merged = {}
+    for families, extra in sources:
+        for fam in families:
+            entry = merged.get(fam["name"])
+            if entry is None:
+                entry = merged[fam["name"]] = {"type": fam["type"], "help": fam["help"], "samples": []}
+            for sample, labels, value in fam["samples"]:
+                entry["samples"].append((sample, dict(extra, **labels), value))
+
+    lines = []
+    for name, entry in merged.items():
+        if entry["type"] == "counter" and not name.endswith("_total"):
+            name = f"{name}_total"
+        lines.append(f"# HELP {name} {_escape(entry['help'])}")
+        lines.append(f"# TYPE {name} {entry['type']}")
+        for sample, labels, value in entry["samples"]:
+            if labels:
+                text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{sample}{{{text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{sample} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def stats_families(prefix, stats, counters=(), gauges=(), labels=None):
+    """
+    Turn a component ``stats()`` dict into families
+
+    Args:
+        prefix (str): Metric name prefix, e.g. "trade_writer"
+        stats (dict): The component's stats
+        counters (tuple): Keys exported as ``<prefix>_<key>_total`` counters
+        gauges (tuple): Keys exported as ``<prefix>_<key>`` gauges
+        labels (dict, optional): Labels added to every sample
+
+    Returns:
+        list: One family per key present in ``stats``
+    """
+    labels = labels or {}
+    families = []
+    for kind, keys in (("counter", counters), ("gauge", gauges)):
+        for key in keys:
+            if key not in stats:
+                continue
+            name = f"{prefix}_{key}"
+            sample = f"{name}_total" if kind == "counter" else name
+            families.append(family(name, kind, f"{prefix} {key}".replace("_", " ").capitalize(), [(sample, labels, stats[key])]))
+    return families
+
+
+# Hot-path metrics shared by the trading loops, the transport and the scheduler
+STAGE_SECONDS = Histogram("trading_stage_seconds", "Time spent in each stage of a trading cycle", ["stage"])
+CYCLE_SECONDS = Histogram("trading_cycle_seconds", "Duration of a whole trading cycle")
+EXCHANGE_REQUESTS = Counter("exchange_requests", "Exchange API requests by endpoint and HTTP status (error: no response)",
+                            ["endpoint", "status"])
+EXCHANGE_SECONDS = Histogram("exchange_request_seconds", "Exchange API request latency", ["endpoint"])
+SCHEDULE_LAG_SECONDS = Histogram("scheduler_lag_seconds", "Delay between a job's deadline and the start of its tick",
+                                 ["job"])
+
+
+def component_families(cache=None, rate_limits=None, storage=None, orders=None, order_sync=None, stream=None,
+                       portfolio=None):
+    """
+    Turn the stats of the trading components into families
+
+    Takes the dicts returned by the components' ``stats()`` (as served by /api/cache-stats
+    and published in the trader status); missing components are skipped.
+
+    Returns:
+        list: Families for cache hit rates, request budgets, queues and trackers
+    """
+    families = []
+    if cache:
+        samples = [("market_cache_requests_total", {"endpoint": endpoint, "result": result}, stats[key])
+                   for endpoint, stats in cache.items()
+                   for result, key in (("hit", "hits"), ("miss", "misses"), ("coalesced", "coalesced"))]
+        families.append(family("market_cache_requests", "counter", "Market data cache lookups by result", samples))
+        families.append(family("market_cache_invalidations", "counter", "Market data cache invalidations",
+                               [("market_cache_invalidations_total", {"endpoint": endpoint}, stats["invalidations"])
+                                for endpoint, stats in cache.items()]))
+    if rate_limits:
+        families.append(family("rate_limiter_tokens", "gauge", "Tokens left in each request budget",
+                               [("rate_limiter_tokens", {"budget": name}, budget["tokens"])
+                                for name, budget in rate_limits.items()]))
+        families.append(family("rate_limiter_waiting", "gauge", "Requests waiting for a token",
+                               [("rate_limiter_waiting", {"budget": name}, budget["waiting"])
+                                for name, budget in rate_limits.items()]))
+        samples = [("rate_limiter_requests_total", {"budget": name, "priority": cls, "result": result}, stats[result])
+                   for name, budget in rate_limits.items()
+                   for cls, stats in budget.items() if isinstance(stats, dict)
+                   for result in ("granted", "queued", "dropped")]
+        families.append(family("rate_limiter_requests", "counter", "Rate-limited requests by outcome", samples))
+    if storage:
+        families += stats_families("trade_writer", storage, counters=("written", "flushes", "errors", "dropped"),
+                                   gauges=("pending",))
+    if orders:
+        families += stats_families("order_manager", orders, counters=("sweeps", "skipped", "queries", "fills", "errors"),
+                                   gauges=("open",))
+    if order_sync:
+        families += stats_families("order_sync", order_sync, counters=("syncs", "errors"), gauges=("indexed",))
+    if stream:
+        families += stats_families("event_stream", stream, counters=("published", "dropped"), gauges=("subscribers",))
+    if portfolio:
+        families += stats_families("portfolio", portfolio, counters=("cycles", "failed", "orders", "order_errors"))
+    return families
@@ -1,8 +1,5 @@
-import os
-from app import db
-from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from database import db
 
 class Trade(db.Model):
     """Model to store trade history"""
@@ -14,9 +11,11 @@ class Trade(db.Model):
     quantity = db.Column(db.Float, nullable=False)
     price = db.Column(db.Float, nullable=True)  # Null for market orders
     status = db.Column(db.String(20), nullable=False)  # PENDING, FILLED, CANCELLED
-    order_id = db.Column(db.Integer, nullable=True)
+    order_id = db.Column(db.Integer, nullable=True, unique=True)  # Exchange order; a repeat only fills in profit_loss
     profit_loss = db.Column(db.Float, nullable=True)  # Calculated P&L for completed trades
     
+    __table_args__ = (db.Index('ix_trade_pair_timestamp', 'pair', 'timestamp'),)
+    
     def __repr__(self):
         return f'<Trade {self.id} {self.side} {self.quantity} {self.pair} at {self.timestamp}>'
 
@@ -38,7 +37,7 @@ class BotConfig(db.Model):
 class PerformanceMetric(db.Model):
     """Model to store bot performance metrics"""
     id = db.Column(db.Integer, primary_key=True)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     portfolio_value = db.Column(db.Float, nullable=False)
     btc_balance = db.Column(db.Float, nullable=False)
     usd_balance = db.Column(db.Float, nullable=False)
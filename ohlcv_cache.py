@@ -0,0 +1,216 @@
+import os
+import re
+import logging
+import pandas as pd
+from config import DATA_CACHE_DIR
+
+try:
+    import pyarrow as pa
+except ImportError:  # Caching is skipped without pyarrow
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Approximate lengths of yfinance period/interval units
+UNIT_DURATIONS = {
+    'm': pd.Timedelta(minutes=1),
+    'h': pd.Timedelta(hours=1),
+    'd': pd.Timedelta(days=1),
+    'wk': pd.Timedelta(weeks=1),
+    'mo': pd.Timedelta(days=30),
+    'y': pd.Timedelta(days=365)
+}
+
+
+def parse_duration(text):
+    """Convert a yfinance period/interval string such as '5m', '1mo' or '2y' to a Timedelta
+
+    Returns:
+        pd.Timedelta: Duration, or None for 'max'/'ytd' and unknown formats
+    """
+    match = re.fullmatch(r'(\d+)(m|h|d|wk|mo|y)', text)
+    if match is None:
+        return None
+    return int(match.group(1)) * UNIT_DURATIONS[match.group(2)]
+
+
+class OHLCVCache:
+    """On-disk Arrow cache of yfinance bars keyed by (symbol, interval)
+
+    Each series is one uncompressed Arrow IPC file that is memory-mapped on load.
+    A fetch only downloads the bars after the last cached one, and a fully
+    cached request never touches the network or imports yfinance.
+    """
+
+    def __init__(self, directory=DATA_CACHE_DIR):
+        """
+        Initialize the cache
+
+        Args:
+            directory (str, optional): Directory holding the Arrow files. Defaults to DATA_CACHE_DIR.
+        """
+        self.directory = directory
+
+    @property
+    def available(self):
+        """Whether pyarrow is installed"""
+        return pa is not None
+
+    def path(self, symbol, interval):
+        """Return the file used for a (symbol, interval) series"""
+        name = re.sub(r'[^A-Za-z0-9_.-]', '_', f"{symbol}_{interval}")
+        return os.path.join(self.directory, f"{name}.arrow")
+
+    def load(self, symbol, interval):
+        """Memory-map a cached series
+
+        Returns:
+            pd.DataFrame: Bars indexed by time, or None if nothing is cached
+        """
+        return self._read(symbol, interval)[0]
+
+    def _read(self, symbol, interval):
+        """Load a series together with the time the cache is known to be complete from"""
+        path = self.path(symbol, interval)
+        if not self.available or not os.path.exists(path):
+            return None, None
+        try:
+            with pa.memory_map(path) as source:
+                table = pa.ipc.open_file(source).read_all()
+            # split_blocks keeps null-free numeric columns as views of the mapped file
+            data = table.to_pandas(split_blocks=True)
+        except Exception as e:
+            logger.error(f"Error reading OHLCV cache {path}: {str(e)}")
+            return None, None
+        if len(data) == 0:
+            return None, None
+        covered_from = (table.schema.metadata or {}).get(b'covered_from', b'').decode()
+        if covered_from != 'max':
+            covered_from = pd.Timestamp(covered_from) if covered_from else data.index[0]
+        return data, covered_from
+
+    def save(self, symbol, interval, data, covered_from):
+        """Atomically replace the cached series with ``data``
+
+        Args:
+            symbol (str): Symbol of the series
+            interval (str): Interval of the series
+            data (pd.DataFrame): Bars indexed by time
+            covered_from (pd.Timestamp or str): Start of the range that was requested
+                (bars before the first row don't exist), or 'max'
+        """
+        if not self.available:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(symbol, interval)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        table = pa.Table.from_pandas(data, preserve_index=True)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b'covered_from'] = str(covered_from if covered_from == 'max' else covered_from.isoformat()).encode()
+        table = table.replace_schema_metadata(metadata)
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    def fetch(self, symbol, period, interval, download):
+        """Return ``period`` of bars, downloading only what the cache is missing
+
+        Args:
+            symbol (str): Symbol to fetch (e.g. "BTC-USD")
+            period (str): yfinance period (e.g. "1y")
+            interval (str): yfinance interval (e.g. "1d")
+            download (callable): ``download(period=None, start=None)`` returning a
+                yfinance-style frame or None. Calls with ``start`` only extend a stale cache,
+                which is returned as is when they fail, so they should make a single short attempt.
+
+        Returns:
+            pd.DataFrame: Bars covering the period, or None if nothing could be fetched
+        """
+        cached, cached_from = self._read(symbol, interval)
+
+        tz = cached.index.tz if cached is not None else 'UTC'
+        now = pd.Timestamp.now(tz=tz)
+        start = _period_start(period, now)
+
+        if cached is not None and _covers(cached_from, start):
+            last_bar = cached.index[-1]
+            if now < last_bar + (parse_duration(interval) or pd.Timedelta(days=1)):
+                logger.info(f"Loaded {len(cached)} cached bars for {symbol} ({interval})")
+                return self._window(cached, start)
+
+            # Re-download the last (possibly partial) bar and everything after it
+            tail = _flatten_columns(download(start=last_bar))
+            if tail is not None and len(tail) > 0:
+                merged = pd.concat([cached[cached.index < tail.index[0]], tail])
+                merged = merged[~merged.index.duplicated(keep='last')]
+                self.save(symbol, interval, merged, cached_from)
+                logger.info(f"Appended {len(tail)} bars to the {symbol} ({interval}) cache")
+                return self._window(merged, start)
+
+            logger.warning(f"Could not refresh {symbol} ({interval}), using cached bars up to {last_bar}")
+            return self._window(cached, start)
+
+        data = _flatten_columns(download(period=period))
+        if data is None or len(data) == 0:
+            if cached is not None:
+                logger.warning(f"Download failed, using {len(cached)} cached bars for {symbol} ({interval})")
+                return self._window(cached, start)
+            return None
+
+        covered_from = 'max' if start is None else _align_tz(start, data.index.tz)
+        if cached is not None and cached.index[0] < data.index[0]:
+            # Keep older cached history that the new download doesn't cover
+            data = pd.concat([cached[cached.index < data.index[0]], data])
+            if cached_from == 'max' or (start is not None and cached_from < start):
+                covered_from = cached_from
+        self.save(symbol, interval, data, covered_from)
+        return data
+
+    @staticmethod
+    def _window(data, start):
+        return data if start is None else data[data.index >= start]
+
+
+def _period_start(period, now):
+    """Earliest bar time a yfinance period asks for (None for 'max')"""
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return now.normalize().replace(month=1, day=1)
+    length = parse_duration(period)
+    return now - length if length is not None else None
+
+
+def _align_tz(timestamp, tz):
+    """Express ``timestamp`` in the (possibly naive) timezone of a bar index"""
+    if tz is None:
+        return timestamp.tz_convert('UTC').tz_localize(None) if timestamp.tz is not None else timestamp
+    return timestamp.tz_localize(tz) if timestamp.tz is None else timestamp.tz_convert(tz)
+
+
+def _covers(covered_from, start):
+    """Whether a cache complete from ``covered_from`` satisfies a request starting at ``start``"""
+    if covered_from == 'max':
+        return True
+    return start is not None and covered_from <= start
+
+
+def _flatten_columns(data):
+    """Drop the ticker level that newer yfinance versions add to single-symbol downloads"""
+    if data is not None and isinstance(data.columns, pd.MultiIndex):
+        data = data.copy()
+        data.columns = data.columns.get_level_values(0)
+        data.columns.name = None
+    return data
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Return the process-wide cache rooted at DATA_CACHE_DIR"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = OHLCVCache()
+    return _default_cache
@@ -0,0 +1,194 @@
+import time
+import logging
+import threading
+from config import ORDER_POLL_INTERVAL, ORDER_SWEEP_MAX_AGE
+
+logger = logging.getLogger(__name__)
+
+FILLED = "FILLED"
+CANCELED_STATUSES = ("CANCELED", "CANCELLED", "REJECTED", "EXPIRED")
+
+# Events passed to listeners together with the latest exchange view of the order
+FILL = "fill"
+PARTIAL_FILL = "partial_fill"
+CANCEL = "cancel"
+
+
+def is_final_execution(event, order):
+    """Whether an event closes an order that executed some quantity (a fill, or a partly filled cancel)"""
+    return event == FILL or (event == CANCEL and order.get("FilledQuantity", 0) > 0)
+
+
+class OrderManager:
+    """Tracks open orders in memory and reconciles them with the exchange
+
+    Orders placed through ``place_order`` (and, with ``adopt``, any other order found
+    open on the account) are kept until they are filled or canceled. ``poll`` first asks
+    the cheap ``pending_count`` endpoint: with nothing open on either side, or the same
+    count as at the last sweep while that sweep is recent, no order is queried at all.
+    Otherwise one ``query_order(pending_only=True)`` sweep returns every open order at
+    once, and orders that dropped out of it are resolved from one page of recent orders
+    (falling back to a per-order query only for orders older than that page).
+
+    Listeners added with ``add_listener`` are called with ``(event, order)`` for
+    FILL, PARTIAL_FILL and CANCEL.
+    """
+
+    def __init__(self, api_client, pair=None, interval=ORDER_POLL_INTERVAL, max_sweep_age=ORDER_SWEEP_MAX_AGE,
+                 adopt=False):
+        """
+        Initialize the manager
+
+        Args:
+            api_client (RoostooClient): Exchange client
+            pair (str, optional): Only track this pair. Defaults to None (all pairs).
+            interval (float, optional): Minimum seconds between polls. Defaults to ORDER_POLL_INTERVAL.
+            max_sweep_age (float, optional): Sweep at least this often while orders are open,
+                even if the pending count is unchanged. Defaults to ORDER_SWEEP_MAX_AGE.
+            adopt (bool, optional): Also track open orders placed elsewhere (another process,
+                or before a restart). Defaults to False.
+        """
+        self.api_client = api_client
+        self.pair = pair
+        self.interval = interval
+        self.max_sweep_age = max_sweep_age
+        self.adopt = adopt
+        self.open_orders = {}  # OrderID -> latest order details
+        self._listeners = []
+        self._last_poll = None
+        self._last_sweep = None
+        self._last_pending = None
+        self._lock = threading.Lock()
+        self._stats = {"polls": 0, "sweeps": 0, "skipped": 0, "queries": 0,
+                       "fills": 0, "partial_fills": 0, "cancels": 0, "errors": 0}
+
+    def add_listener(self, callback):
+        """Call ``callback(event, order)`` for every fill and cancel"""
+        self._listeners.append(callback)
+
+    def _emit(self, event, order):
+        self._stats[{FILL: "fills", PARTIAL_FILL: "partial_fills", CANCEL: "cancels"}[event]] += 1
+        for callback in self._listeners:
+            try:
+                callback(event, order)
+            except Exception as e:
+                logger.error(f"Error in order {event} listener: {str(e)}")
+
+    def _update(self, order):
+        """Apply the exchange's view of a tracked order, emitting events on changes"""
+        order_id = order.get("OrderID")
+        status = order.get("Status")
+        previous = self.open_orders.get(order_id, {})
+        if status == FILLED:
+            self.open_orders.pop(order_id, None)
+            self._emit(FILL, order)
+        elif status in CANCELED_STATUSES:
+            self.open_orders.pop(order_id, None)
+            self._emit(CANCEL, order)
+        else:
+            self.open_orders[order_id] = order
+            if order.get("FilledQuantity", 0) > previous.get("FilledQuantity", 0):
+                self._emit(PARTIAL_FILL, order)
+
+    def place_order(self, pair="BTC/USD", side="BUY", quantity=0.01, price=None):
+        """
+        Place an order and track it until it is filled or canceled
+
+        Orders the exchange reports as filled right away (market orders) emit FILL
+        before this returns.
+
+        Returns:
+            dict: The exchange's place_order response
+        """
+        result = self.api_client.place_order(pair, side, quantity, price)
+        detail = result.get("OrderDetail")
+        if result.get("Success", False) and detail and detail.get("OrderID") is not None:
+            with self._lock:
+                self._update(detail)
+        return result
+
+    def _query(self, **params):
+        self._stats["queries"] += 1
+        # Cached order lists would report fills and cancels up to a TTL late
+        response = self.api_client.query_order(pair=self.pair, fresh=True, **params)
+        orders = response.get("OrderMatched") or []
+        if not response.get("Success", False) and not orders:
+            error = response.get("ErrMsg", "Unknown error")
+            # The exchange reports an empty order list as an error
+            if "no order" not in error.lower():
+                raise RuntimeError(error)
+        return orders
+
+    def _sweep(self):
+        """Batched status check of every open order"""
+        self._stats["sweeps"] += 1
+        pending = {order.get("OrderID"): order for order in self._query(pending_only=True)}
+        finished = [order_id for order_id in self.open_orders if order_id not in pending]
+
+        for order_id, order in pending.items():
+            if order_id in self.open_orders or self.adopt:
+                self._update(order)
+
+        if finished:
+            # Orders that left the pending list finished recently; one page of recent orders covers them
+            recent = {order.get("OrderID"): order for order in self._query(limit=max(100, 2 * len(finished)))}
+            for order_id in finished:
+                order = recent.get(order_id)
+                if order is None:
+                    matched = self._query(order_id=order_id)
+                    order = matched[0] if matched else None
+                if order is not None and order.get("Status") in (FILLED,) + CANCELED_STATUSES:
+                    self._update(order)
+        self._last_sweep = time.monotonic()
+
+    def poll(self, force=False):
+        """
+        Reconcile open orders with the exchange
+
+        Args:
+            force (bool, optional): Sweep even if the interval has not passed or nothing changed. Defaults to False.
+
+        Returns:
+            bool: True when a sweep ran
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            now = time.monotonic()
+            if not force and self._last_poll is not None and now - self._last_poll < self.interval:
+                return False
+            self._last_poll = now
+            self._stats["polls"] += 1
+
+            total = None
+            if not force:
+                response = self.api_client.pending_count(fresh=True)
+                if response.get("Success", False):
+                    total = response.get("TotalPending", 0)
+                    if self.pair is not None:
+                        total = response.get("OrderPairs", {}).get(self.pair, 0)
+                    recent = self._last_sweep is not None and now - self._last_sweep < self.max_sweep_age
+                    if (total == 0 and not self.open_orders) or (total == self._last_pending and recent):
+                        self._stats["skipped"] += 1
+                        return False
+
+            self._sweep()
+            self._last_pending = total
+            return True
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Error polling open orders: {str(e)}")
+            return False
+        finally:
+            self._lock.release()
+
+    def stats(self):
+        """
+        Return tracker counters
+
+        Returns:
+            dict: polls, sweeps, skipped sweeps, order queries, emitted events, errors and open orders
+        """
+        stats = dict(self._stats)
+        stats["open"] = len(self.open_orders)
+        return stats
@@ -0,0 +1,179 @@
+import time
+import logging
+import threading
+from datetime import datetime
+from sqlalchemy import select
+from config import ORDER_SYNC_INTERVAL, ORDER_SYNC_PAGE_SIZE
+from models import Trade
+
+logger = logging.getLogger(__name__)
+
+# Order states that have executed quantity worth recording as a trade
+TRADED_STATUSES = ("FILLED", "PARTIALLY_FILLED")
+
+
+def order_record(order):
+    """
+    Convert an exchange order into a trade record
+
+    Args:
+        order (dict): Entry of query_order's ``OrderMatched`` list
+
+    Returns:
+        dict: Trade record as stored by the TradeWriter
+    """
+    quantity = order.get("FilledQuantity", 0)
+    price = order.get("FilledAverPrice") or order.get("Price", 0)
+    created = order.get("CreateTimestamp")
+    timestamp = datetime.fromtimestamp(created / 1000) if created else datetime.now()
+    return {
+        "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+        "pair": order.get("Pair", "BTC/USD"),
+        "side": order.get("Side", "BUY"),
+        "type": order.get("Type", "MARKET"),
+        "price": price,
+        "quantity": quantity,
+        "total": quantity * price,
+        "status": order.get("Status", "FILLED"),
+        "order_id": order.get("OrderID")
+    }
+
+
+class OrderSync:
+    """Incremental copy of the exchange's executed orders into the trade history
+
+    query_order pages through the account's orders newest first. Every order seen is
+    indexed by OrderID and the newest CreateTimestamp is kept as a high-water mark, so a
+    sync stops at the first order that is indexed or older than the mark -- normally
+    after one page -- however long the history is. Orders created in the same
+    millisecond as the mark are told apart by the index (and the unique order_id of
+    stored trades). Filled and partially filled orders go to the TradeWriter. Syncs run
+    at most every ``interval`` seconds, and a caller that finds another sync in
+    progress returns at once instead of waiting.
+
+    Orders are recorded in the state they had when first seen; later fills of
+    pending orders are not picked up here.
+    """
+
+    def __init__(self, api_client, writer, pair=None, interval=ORDER_SYNC_INTERVAL, page_size=ORDER_SYNC_PAGE_SIZE):
+        """
+        Initialize the sync
+
+        Args:
+            api_client (RoostooClient): Exchange client
+            writer (TradeWriter): Writer that stores the trades (its engine seeds the index)
+            pair (str, optional): Only sync this pair. Defaults to None (all pairs).
+            interval (float, optional): Minimum seconds between syncs. Defaults to ORDER_SYNC_INTERVAL.
+            page_size (int, optional): Orders requested per query_order call. Defaults to ORDER_SYNC_PAGE_SIZE.
+        """
+        self.api_client = api_client
+        self.writer = writer
+        self.pair = pair
+        self.interval = interval
+        self.page_size = page_size
+        self.orders = {}  # OrderID -> status when seen
+        self.high_water_mark = None  # Newest CreateTimestamp seen (ms)
+        self._seeded = False
+        self._last_sync = None
+        self._lock = threading.Lock()
+        self._stats = {"syncs": 0, "pages": 0, "new_orders": 0, "stored": 0, "errors": 0, "last_sync_ms": 0.0}
+
+    def _seed(self):
+        """Index the orders already stored so a restart does not page through the whole account"""
+        with self.writer.engine.connect() as conn:
+            rows = conn.execute(select(Trade.order_id, Trade.status).where(Trade.order_id.isnot(None))).all()
+        self.orders.update((order_id, status) for order_id, status in rows)
+        self._seeded = True
+        logger.info(f"Order index seeded with {len(self.orders)} stored orders")
+
+    def _is_known(self, order):
+        if order.get("OrderID") in self.orders:
+            return True
+        # An order created in the mark's millisecond may not have been listed yet
+        return self.high_water_mark is not None and order.get("CreateTimestamp", 0) < self.high_water_mark
+
+    def _new_pages(self):
+        """Page through query_order until reaching known orders, yielding each page's new orders"""
+        offset = 0
+        while True:
+            response = self.api_client.query_order(pair=self.pair, offset=offset, limit=self.page_size)
+            self._stats["pages"] += 1
+            orders = response.get("OrderMatched") or []
+            if not response.get("Success", False) and not orders:
+                error = response.get("ErrMsg", "Unknown error")
+                # The exchange reports an empty order list as an error
+                if "no order" in error.lower():
+                    return
+                raise RuntimeError(error)
+
+            fresh = [order for order in orders if not self._is_known(order)]
+            if fresh:
+                yield fresh
+            if len(fresh) < len(orders) or len(orders) < self.page_size:
+                return
+            offset += len(orders)
+
+    def sync(self, force=False):
+        """
+        Fetch orders newer than the high-water mark and store the executed ones
+
+        Args:
+            force (bool, optional): Sync even if the last sync was less than ``interval`` ago. Defaults to False.
+
+        Returns:
+            int: Trades stored by this call
+        """
+        if not self._lock.acquire(blocking=False):
+            return 0
+        try:
+            now = time.monotonic()
+            if not force and self._last_sync is not None and now - self._last_sync < self.interval:
+                return 0
+            self._last_sync = now
+            if not self._seeded:
+                self._seed()
+
+            # The index and mark only change once every new page is in, so a failed sync starts over
+            # (pages it already stored are skipped by their unique order_id)
+            seen = {}
+            newest = self.high_water_mark
+            stored = 0
+            for orders in self._new_pages():
+                for order in orders:
+                    seen[order.get("OrderID")] = order.get("Status")
+                    created = order.get("CreateTimestamp", 0)
+                    if newest is None or created > newest:
+                        newest = created
+                trades = [order_record(order) for order in orders if order.get("Status") in TRADED_STATUSES]
+                if trades:
+                    self.writer.add_trades(trades)
+                    self.writer.flush()  # Page by page, and visible to the response being served
+                stored += len(trades)
+            self.orders.update(seen)
+            self.high_water_mark = newest
+            if stored:
+                logger.info("Synced %d new trades from the exchange", stored)
+
+            self._stats["syncs"] += 1
+            self._stats["new_orders"] += len(seen)
+            self._stats["stored"] += stored
+            self._stats["last_sync_ms"] = (time.monotonic() - now) * 1000
+            return stored
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Error syncing orders: {str(e)}")
+            return 0
+        finally:
+            self._lock.release()
+
+    def stats(self):
+        """
+        Return sync counters
+
+        Returns:
+            dict: syncs, pages fetched, new orders, stored trades, errors, indexed orders and the high-water mark
+        """
+        stats = dict(self._stats)
+        stats["indexed"] = len(self.orders)
+        stats["high_water_mark"] = self.high_water_mark
+        return stats
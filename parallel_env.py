@@ -0,0 +1,118 @@
+import os
+import time
+import shutil
+import tempfile
+import logging
+import numpy as np
+import gymnasium
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.vec_env import SubprocVecEnv
+
+from feature_store import FeatureStore
+from trading_env import TradingEnv
+from config import WINDOW_SIZE, INITIAL_BALANCE
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerMonitor(gymnasium.Env):
+    """Adapter run inside each worker that counts env steps and sets the episode start
+
+    TradingEnv follows the old gym API (``reset`` returns the observation, ``step``
+    returns four values). Stable-Baselines3 2.x workers expect gymnasium's, so the
+    adapter converts between them instead of requiring the shimmy compatibility package.
+    """
+
+    def __init__(self, env, rank, start_step):
+        self.env = env
+        self.rank = rank
+        self.start_step = start_step
+        self.observation_space = gymnasium.spaces.Box(low=-np.inf, high=np.inf, shape=env.observation_space.shape,
+                                                      dtype=np.float32)
+        self.action_space = gymnasium.spaces.Discrete(env.action_space.n)
+        self._steps = 0
+        self._since = time.perf_counter()
+
+    def reset(self, seed=None, options=None):
+        super(WorkerMonitor, self).reset(seed=seed)
+        self.env.reset()
+        # Spread workers over the series so they don't replay identical episodes
+        self.env.current_step = self.start_step
+        return self.env._get_observation(), {}
+
+    def step(self, action):
+        self._steps += 1
+        obs, reward, done, info = self.env.step(action)
+        return obs, reward, done, False, info
+
+    def throughput(self):
+        """Return (steps, steps/sec) since the previous call and restart the window"""
+        now = time.perf_counter()
+        steps = self._steps
+        rate = steps / (now - self._since) if now > self._since else 0.0
+        self._steps = 0
+        self._since = now
+        return steps, rate
+
+
+def make_shared_env(directory, rank, start_step, window_size=WINDOW_SIZE, initial_balance=INITIAL_BALANCE):
+    """Create an env factory that attaches to memory-mapped features in the worker
+
+    Only the directory name is pickled to the worker; the arrays themselves are
+    mapped from the files written by ``FeatureStore.save``.
+    """
+    def _init():
+        features = FeatureStore.load(directory, window_size)
+        env = TradingEnv(features=features, initial_balance=initial_balance, window_size=window_size)
+        return WorkerMonitor(env, rank, start_step)
+    return _init
+
+
+def shared_feature_dir():
+    """Create a scratch directory for shared features, on tmpfs when available"""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else None
+    return tempfile.mkdtemp(prefix='roostoo_features_', dir=base)
+
+
+class SharedSubprocVecEnv(SubprocVecEnv):
+    """SubprocVecEnv whose workers share one memory-mapped copy of the features"""
+
+    def __init__(self, data, num_envs, window_size=WINDOW_SIZE, initial_balance=INITIAL_BALANCE, start_method=None):
+        features = FeatureStore(data.reset_index(drop=True), window_size)
+        self.feature_dir = features.save(shared_feature_dir())
+
+        # Evenly spaced episode starts, all leaving room for at least one step
+        span = max(1, len(features.prices) - 1 - window_size)
+        env_fns = [
+            make_shared_env(self.feature_dir, rank, window_size + rank * span // num_envs,
+                            window_size, initial_balance)
+            for rank in range(num_envs)
+        ]
+        try:
+            super(SharedSubprocVecEnv, self).__init__(env_fns, start_method=start_method)
+        except BaseException:
+            # close() is never reached when the workers fail to start; don't leave the copy in tmpfs
+            shutil.rmtree(self.feature_dir, ignore_errors=True)
+            raise
+
+    def close(self):
+        super(SharedSubprocVecEnv, self).close()
+        shutil.rmtree(self.feature_dir, ignore_errors=True)
+
+
+class ThroughputCallback(BaseCallback):
+    """Log env steps/sec of every worker at the end of each rollout"""
+
+    def _on_step(self):
+        return True
+
+    def _on_rollout_end(self):
+        stats = self.training_env.env_method('throughput')
+        total = 0.0
+        for rank, (steps, rate) in enumerate(stats):
+            total += rate
+            self.logger.record(f"throughput/worker_{rank}", rate)
+        self.logger.record("throughput/total", total)
+        logger.info("Worker throughput (steps/sec): " +
+                    ", ".join(f"#{rank}={rate:,.0f}" for rank, (_, rate) in enumerate(stats)) +
+                    f" | total={total:,.0f}")
@@ -0,0 +1,176 @@
+import os
+import json
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Exported policies live next to the SB3 checkpoint: <model_path>.npz
+EXPORT_SUFFIX = ".npz"
+
+ACTIVATIONS = {
+    "Tanh": np.tanh,
+    "ReLU": lambda x: np.maximum(x, 0),
+    "ELU": lambda x: np.where(x > 0, x, np.expm1(x)),
+    "LeakyReLU": lambda x: np.where(x > 0, x, 0.01 * x),
+    "Sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+    "Identity": lambda x: x
+}
+
+
+def export_policy(model, path):
+    """Write the actor of a PPO MlpPolicy (discrete actions) to a compact .npz file
+
+    Args:
+        model: Trained stable_baselines3 PPO model
+        path (str): Target file; ``.npz`` is appended when missing
+
+    Returns:
+        str: Path of the written file
+    """
+    import torch.nn as nn
+
+    policy = model.policy
+    modules = []
+    shared_net = getattr(policy.mlp_extractor, "shared_net", None)
+    if shared_net is not None:
+        modules.extend(shared_net)
+    modules.extend(policy.mlp_extractor.policy_net)
+    modules.append(policy.action_net)
+
+    arrays = {}
+    layers = []
+    for module in modules:
+        if isinstance(module, nn.Linear):
+            index = len(arrays) // 2
+            arrays[f"weight_{index}"] = module.weight.detach().cpu().numpy().T.astype(np.float32)
+            arrays[f"bias_{index}"] = module.bias.detach().cpu().numpy().astype(np.float32)
+            layers.append("Linear")
+        elif type(module).__name__ in ACTIVATIONS:
+            layers.append(type(module).__name__)
+        else:
+            raise ValueError(f"Cannot export policy layer {type(module).__name__}")
+
+    if not path.endswith(EXPORT_SUFFIX):
+        path += EXPORT_SUFFIX
+    spec = {"layers": layers, "observation_shape": list(model.observation_space.shape)}
+    np.savez(path, spec=np.array(json.dumps(spec)), **arrays)
+    logger.info(f"Exported policy ({len(layers)} layers) to {path}")
+    return path
+
+
+class NumpyPolicy:
+    """Pure-NumPy actor with the ``predict`` interface of an SB3 model
+
+    Needs neither torch nor stable_baselines3, so it loads in milliseconds.
+    """
+
+    def __init__(self, layers, weights, biases, observation_shape):
+        self.layers = layers
+        self.weights = weights
+        self.biases = biases
+        self.observation_shape = tuple(observation_shape)
+        self._rng = np.random.default_rng()
+
+    @classmethod
+    def load(cls, path):
+        """Load a policy written by ``export_policy``"""
+        with np.load(path) as archive:
+            spec = json.loads(str(archive["spec"]))
+            num_linear = spec["layers"].count("Linear")
+            weights = [archive[f"weight_{i}"] for i in range(num_linear)]
+            biases = [archive[f"bias_{i}"] for i in range(num_linear)]
+        return cls(spec["layers"], weights, biases, spec["observation_shape"])
+
+    def action_logits(self, observations):
+        """Run the actor network on a batch of observations"""
+        x = observations
+        linear = 0
+        for layer in self.layers:
+            if layer == "Linear":
+                x = x @ self.weights[linear] + self.biases[linear]
+                linear += 1
+            else:
+                x = ACTIVATIONS[layer](x)
+        return x
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=True):
+        """Return the action for one observation or a batch, like ``PPO.predict``
+
+        Returns:
+            tuple: (action(s), None)
+        """
+        observation = np.asarray(observation, dtype=np.float32)
+        single = observation.shape == self.observation_shape
+        batch = observation.reshape((-1,) + self.observation_shape)
+        logits = self.action_logits(batch)
+        if deterministic:
+            actions = np.argmax(logits, axis=1)
+        else:
+            probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            cumulative = probabilities.cumsum(axis=1)
+            draws = self._rng.random((len(batch), 1))
+            actions = np.minimum((cumulative < draws).sum(axis=1), logits.shape[1] - 1)
+        return (actions[0] if single else actions), None
+
+
+class StackedPolicy(NumpyPolicy):
+    """Several NumpyPolicy actors with the same architecture evaluated as one
+
+    Observation row i goes through policy i: the weights are stacked into
+    (N, inputs, outputs) arrays, so one batched matmul per layer replaces N
+    separate forward passes.
+    """
+
+    def __init__(self, policies):
+        """
+        Stack the policies' weights
+
+        Args:
+            policies (list): NumpyPolicy instances with identical layers and weight shapes
+
+        Raises:
+            ValueError: If the policies differ in architecture
+        """
+        first = policies[0]
+        if not all(self.compatible(first, policy) for policy in policies[1:]):
+            raise ValueError("Stacked policies must share the same architecture")
+        weights = [np.stack([policy.weights[i] for policy in policies]) for i in range(len(first.weights))]
+        biases = [np.stack([policy.biases[i] for policy in policies])[:, None, :] for i in range(len(first.biases))]
+        super(StackedPolicy, self).__init__(first.layers, weights, biases, first.observation_shape)
+
+    @staticmethod
+    def compatible(policy, other):
+        """Whether two NumpyPolicy actors can be stacked together"""
+        return (policy.layers == other.layers and policy.observation_shape == other.observation_shape
+                and [w.shape for w in policy.weights] == [w.shape for w in other.weights])
+
+    def action_logits(self, observations):
+        """Run policy i on observation row i; ``observations`` has one row per stacked policy"""
+        x = observations[:, None, :]
+        linear = 0
+        for layer in self.layers:
+            if layer == "Linear":
+                x = x @ self.weights[linear] + self.biases[linear]
+                linear += 1
+            else:
+                x = ACTIVATIONS[layer](x)
+        return x[:, 0, :]
+
+
+def load_policy(model_path):
+    """Load ``<model_path>.npz`` if it was exported, otherwise the full SB3 model
+
+    Args:
+        model_path (str): Model path as passed to ``PPO.save`` (without extension)
+
+    Returns:
+        NumpyPolicy or PPO: Object with a ``predict(obs, deterministic=True)`` method
+    """
+    export_path = model_path + EXPORT_SUFFIX
+    if os.path.exists(export_path):
+        logger.info(f"Loading exported policy from {export_path}")
+        return NumpyPolicy.load(export_path)
+    from stable_baselines3 import PPO
+    return PPO.load(model_path)
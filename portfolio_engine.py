@@ -0,0 +1,361 @@
+import os
+import time
+import logging
+import numpy as np
+from config import (TRADING_PAIRS, WINDOW_SIZE, INITIAL_BALANCE, BAR_INTERVAL, PRICE_HISTORY_SIZE,
+                    RISK_PERCENTAGE, MIN_ORDER_VALUE)
+from feature_store import window_features, NUM_EXTRA_FEATURES, BALANCE_COL, CRYPTO_COL, POSITION_COL
+from policy_export import NumpyPolicy, StackedPolicy, load_policy, EXPORT_SUFFIX
+from metrics import STAGE_SECONDS, CYCLE_SECONDS
+from order_manager import FILL, CANCEL, FILLED, CANCELED_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# Model actions, as in TradingEnv
+HOLD, BUY, SELL = 0, 1, 2
+ACTION_NAMES = ("HOLD", "BUY", "SELL")
+
+# Order quantity decimals used until the exchange reports a pair's AmountPrecision
+DEFAULT_AMOUNT_PRECISION = 6
+
+
+def model_path(pair):
+    """Checkpoint path of a pair's model, named like TradingBot's (``ppo_trading_btc`` for BTC/USD)"""
+    return f"ppo_trading_{pair.split('/')[0].lower()}"
+
+
+def load_pair_models(pairs):
+    """
+    Load the exported (or SB3) policy of every pair that has one
+
+    Args:
+        pairs (list): Trading pairs
+
+    Returns:
+        dict: Pair -> policy, without the pairs that have no model
+    """
+    models = {}
+    for pair in pairs:
+        path = model_path(pair)
+        if not (os.path.exists(path + EXPORT_SUFFIX) or os.path.exists(path + ".zip")):
+            continue
+        try:
+            models[pair] = load_policy(path)
+            logger.info(f"Loaded {pair} model from {path}")
+        except Exception as e:
+            logger.error(f"Error loading {pair} model: {str(e)}")
+    return models
+
+
+class PortfolioEngine:
+    """One trading cycle across every configured pair
+
+    A cycle makes one bulk ticker request (every pair) and one balance request,
+    concurrently, so it costs a single network round trip however many pairs are
+    traded. Prices, holdings and the bar history live in arrays with one slot per
+    pair; the observation features of all pairs are computed in one vectorized
+    pass, and the pairs' NumpyPolicy models are stacked into batched forward passes
+    (one per distinct architecture). Only the orders themselves are placed one by one.
+
+    Pairs without a model hold. Sells are capped at the position the engine opened
+    itself (its filled buys minus its filled sells since it started), so coins that were
+    already in the wallet or bought elsewhere are never sold. All pairs must share one
+    quote currency, whose free balance is the cash every buy draws on.
+    """
+
+    def __init__(self, api_client, order_manager, pairs=None, models=None, window_size=WINDOW_SIZE,
+                 capacity=PRICE_HISTORY_SIZE, bar_interval=BAR_INTERVAL, risk_percentage=RISK_PERCENTAGE,
+                 initial_balance=INITIAL_BALANCE, min_order_value=MIN_ORDER_VALUE):
+        """
+        Initialize the engine
+
+        Args:
+            api_client (RoostooClient): Exchange client
+            order_manager (OrderManager): Places the orders and reports their fills
+            pairs (list, optional): Pairs to trade. Defaults to TRADING_PAIRS.
+            models (dict, optional): Pair -> policy with ``predict``. Defaults to the
+                ``ppo_trading_<coin>`` checkpoints found on disk.
+            window_size (int, optional): Bars per observation window. Defaults to WINDOW_SIZE.
+            capacity (int, optional): Bars kept per pair. Defaults to PRICE_HISTORY_SIZE.
+            bar_interval (float, optional): Seconds per bar. Defaults to BAR_INTERVAL.
+            risk_percentage (float, optional): Percent of the cash spent per buy. Defaults to RISK_PERCENTAGE.
+            initial_balance (float, optional): Cash the models' balance feature is normalized by.
+                Defaults to INITIAL_BALANCE.
+            min_order_value (float, optional): Smallest order value, unless the exchange reports
+                a pair's MiniOrder. Defaults to MIN_ORDER_VALUE.
+
+        Raises:
+            ValueError: If the pairs are quoted in different currencies
+        """
+        pairs = list(pairs or TRADING_PAIRS)
+        quotes = {pair.split('/')[1] for pair in pairs}
+        if len(quotes) != 1:
+            raise ValueError(f"All pairs must share one quote currency, got {sorted(quotes)}")
+        self.api_client = api_client
+        self.order_manager = order_manager
+        self.pairs = pairs
+        self.coins = [pair.split('/')[0] for pair in pairs]
+        self.quote = quotes.pop()
+        self.window_size = window_size
+        self.capacity = capacity
+        self.bar_interval = bar_interval
+        self.risk_percentage = risk_percentage
+        self.initial_balance = initial_balance
+
+        # Per-pair state, slot i belongs to pairs[i]
+        count = len(pairs)
+        self.prices = np.full(count, np.nan)
+        self.holdings = np.zeros(count)
+        self.positions = np.zeros(count)  # Base quantity bought by this engine and not sold yet
+        self.actions = np.full(count, HOLD)
+        self.amount_precision = np.full(count, DEFAULT_AMOUNT_PRECISION)
+        self.min_order_value = np.full(count, float(min_order_value))
+        self.cash = 0.0
+
+        # Bar closes of every pair, each bar written at slot i and i + capacity (like PriceHistory)
+        # so the latest window of all pairs is one slice
+        self._closes = np.full((count, 2 * capacity), np.nan)
+        self._head = 0
+        self._bars = 0
+        self._bar_start = None
+        self._exchange_info_loaded = False
+        self._slots = {pair: i for i, pair in enumerate(pairs)}
+        self._open = {}  # OrderID of an unfinished engine order -> filled quantity counted so far
+        order_manager.add_listener(self._on_order_event)
+
+        models = load_pair_models(pairs) if models is None else models
+        self._model_groups, self._unmodeled = self._group_models(models)
+        self._stats = {"cycles": 0, "failed": 0, "orders": 0, "order_errors": 0,
+                       "last_fetch_ms": 0.0, "last_compute_ms": 0.0}
+
+    def _group_models(self, models):
+        """Stack compatible NumpyPolicy models; returns ([(predictor, pair indices, stacked)], unmodeled indices)"""
+        shape = (self.window_size + NUM_EXTRA_FEATURES,)
+        stacks = []  # [(first policy, [indices], [policies])]
+        others = {}  # id(model) -> (model, [indices])
+        unmodeled = []
+        for i, pair in enumerate(self.pairs):
+            model = models.get(pair)
+            if model is None:
+                unmodeled.append(i)
+            elif isinstance(model, NumpyPolicy):
+                if model.observation_shape != shape:
+                    logger.error(f"{pair} model expects observations of shape {model.observation_shape}, not {shape}")
+                    unmodeled.append(i)
+                    continue
+                for first, indices, policies in stacks:
+                    if StackedPolicy.compatible(first, model):
+                        indices.append(i)
+                        policies.append(model)
+                        break
+                else:
+                    stacks.append((model, [i], [model]))
+            else:
+                others.setdefault(id(model), (model, []))[1].append(i)
+        groups = [(StackedPolicy(policies), np.array(indices), True) for _, indices, policies in stacks]
+        groups += [(model, np.array(indices), False) for model, indices in others.values()]
+        return groups, np.array(unmodeled, dtype=np.int64)
+
+    def _apply_fill(self, order, counted=0.0):
+        """Move the pair's position by the quantity ``order`` filled beyond ``counted``; returns the filled quantity"""
+        filled = float(order.get("FilledQuantity", 0) or 0)
+        slot = self._slots.get(order.get("Pair"))
+        if slot is not None and filled > counted:
+            change = filled - counted
+            if order.get("Side") == "SELL":
+                self.positions[slot] = max(self.positions[slot] - change, 0.0)
+            else:
+                self.positions[slot] += change
+        return filled
+
+    def _on_order_event(self, event, order):
+        """Follow the fills of the engine's resting orders (other orders are ignored)"""
+        order_id = order.get("OrderID")
+        if order_id not in self._open:
+            return
+        counted = self._apply_fill(order, self._open[order_id])
+        if event in (FILL, CANCEL):
+            del self._open[order_id]
+        else:
+            self._open[order_id] = counted
+
+    def _load_exchange_info(self):
+        """Take each pair's quantity precision and minimum order value from the exchange, once"""
+        self._exchange_info_loaded = True
+        info = self.api_client.get_exchange_info()
+        trade_pairs = info.get("TradePairs") if isinstance(info, dict) else None
+        if not trade_pairs:
+            logger.warning("Exchange info unavailable, using default order precision and minimum")
+            return
+        for i, pair in enumerate(self.pairs):
+            details = trade_pairs.get(pair, {})
+            if "AmountPrecision" in details:
+                self.amount_precision[i] = details["AmountPrecision"]
+            if "MiniOrder" in details:
+                self.min_order_value[i] = details["MiniOrder"]
+
+    def _add_prices(self, prices, timestamp):
+        """Fold this cycle's prices into the current bar of every pair, starting new bars on interval boundaries"""
+        bar_start = timestamp - timestamp % self.bar_interval
+        if self._bar_start is None or bar_start > self._bar_start:
+            if self._bar_start is not None:
+                previous = self._closes[:, self._head]
+                self._head = (self._head + 1) % self.capacity
+                # A pair missing from this ticker keeps its last close
+                prices = np.where(np.isnan(prices), previous, prices)
+            self._bar_start = bar_start
+            self._bars = min(self._bars + 1, self.capacity)
+        else:
+            prices = np.where(np.isnan(prices), self._closes[:, self._head], prices)
+        self._closes[:, self._head] = prices
+        self._closes[:, self._head + self.capacity] = prices
+
+    def _observations(self):
+        """Observations of all pairs, one row per pair, and a mask of the pairs with a full window"""
+        w = self.window_size
+        end = self._head + self.capacity + 1
+        windows = self._closes[:, end - w:end]
+        ready = ~np.isnan(windows).any(axis=1) & (self._bars >= w)
+        obs = window_features(np.nan_to_num(windows))
+        obs[:, w + BALANCE_COL] = self.cash / self.initial_balance if self.initial_balance > 0 else 0
+        obs[:, w + CRYPTO_COL] = self.holdings
+        obs[:, w + POSITION_COL] = self.holdings > 0
+        return obs, ready
+
+    def _decide(self, obs, ready):
+        """Fill ``self.actions`` from each pair's model, holding until its window is full"""
+        actions = np.full(len(self.pairs), HOLD)
+        for predictor, indices, stacked in self._model_groups:
+            if stacked:
+                actions[indices] = predictor.predict(obs[indices], deterministic=True)[0]
+            else:
+                for i in indices:
+                    actions[i] = predictor.predict(obs[i], deterministic=True)[0]
+        self.actions = np.where(ready, actions, HOLD)
+
+    def _order_sizes(self):
+        """Quantities to buy and sell per pair (0 where no order should be placed)"""
+        prices = np.nan_to_num(self.prices)
+        buys = (self.actions == BUY) & (prices > 0)
+        # Only what the engine bought itself, and never more than the wallet holds
+        sellable = np.minimum(self.positions, self.holdings)
+        sells = (self.actions == SELL) & (sellable > 0)
+
+        # Every buy spends risk_percentage of the cash, split evenly if that would overdraw it
+        spend = self.cash * self.risk_percentage / 100
+        if buys.sum() * spend > self.cash:
+            spend = self.cash / buys.sum()
+        scale = 10.0 ** self.amount_precision
+        with np.errstate(divide='ignore', invalid='ignore'):
+            buy_quantity = np.where(buys, np.floor(spend / prices * scale) / scale, 0.0)
+        sell_quantity = np.where(sells, np.floor(sellable * scale) / scale, 0.0)
+        buy_quantity[buy_quantity * prices < self.min_order_value] = 0.0
+        sell_quantity[sell_quantity * prices < self.min_order_value] = 0.0
+        return buy_quantity, sell_quantity
+
+    def _place_orders(self, buy_quantity, sell_quantity):
+        for i in np.flatnonzero((buy_quantity > 0) | (sell_quantity > 0)):
+            pair = self.pairs[i]
+            side, quantity = ("BUY", buy_quantity[i]) if buy_quantity[i] > 0 else ("SELL", sell_quantity[i])
+            result = self.order_manager.place_order(pair, side, float(quantity))
+            if result.get("Success", False):
+                # The trade is recorded from the order manager's fill event
+                self._stats["orders"] += 1
+                detail = result.get("OrderDetail", {})
+                status = detail.get("Status")
+                # Immediate fills were emitted before the order was known here, so count them now
+                filled = self._apply_fill(dict(detail, Pair=pair, Side=side))
+                if status != FILLED and status not in CANCELED_STATUSES and detail.get("OrderID") is not None:
+                    self._open[detail["OrderID"]] = filled
+                logger.info("Placed %s: %s %s at $%.2f (%s)", side, quantity, self.coins[i], self.prices[i], status,
+                            extra={"pair": pair, "side": side, "quantity": float(quantity),
+                                   "price": float(self.prices[i]), "status": status})
+            else:
+                self._stats["order_errors"] += 1
+                logger.error("Failed to place %s %s: %s", side, pair, result.get("ErrMsg", "Unknown error"),
+                             extra={"pair": pair, "side": side})
+
+    def market_state(self):
+        """
+        Return the prices, balances and decisions of the last cycle
+
+        Returns:
+            dict: prices per pair, cash (free quote balance), holdings and the engine's
+                own positions per coin, portfolio_value and the last action per pair
+        """
+        return {
+            "prices": {pair: float(price) for pair, price in zip(self.pairs, self.prices) if not np.isnan(price)},
+            "cash": self.cash,
+            "holdings": dict(zip(self.coins, self.holdings.tolist())),
+            "positions": dict(zip(self.coins, self.positions.tolist())),
+            "portfolio_value": self.cash + float(np.nansum(self.holdings * self.prices)),
+            "actions": {pair: ACTION_NAMES[action] for pair, action in zip(self.pairs, self.actions)}
+        }
+
+    def run_cycle(self):
+        """
+        Fetch every pair's price and the wallet once, decide for all pairs and place the orders
+
+        Returns:
+            dict: ``market_state()`` after the cycle, or None when the market data was unavailable
+        """
+        try:
+            start = time.monotonic()
+            if not self._exchange_info_loaded:
+                self._load_exchange_info()
+            snapshot = self.api_client.get_snapshot(None)
+            market_data = snapshot["ticker"]
+            balance_data = snapshot["balance"]
+            fetched = time.monotonic()
+            self._stats["last_fetch_ms"] = (fetched - start) * 1000
+            STAGE_SECONDS.observe(fetched - start, "fetch")
+
+            if not market_data.get("Success", False):
+                logger.error(f"Failed to get market data: {market_data.get('ErrMsg', 'Unknown error')}")
+                self._stats["failed"] += 1
+                return None
+            if not balance_data.get("Success", False):
+                logger.error(f"Failed to get wallet balance: {balance_data.get('ErrMsg', 'Unknown error')}")
+                self._stats["failed"] += 1
+                return None
+
+            tickers = market_data.get("Data", {})
+            prices = np.array([tickers.get(pair, {}).get("LastPrice", np.nan) for pair in self.pairs], dtype=np.float64)
+            # Wallet data could be in different formats depending on API version
+            wallet = balance_data.get("Wallet", balance_data.get("SpotWallet", {}))
+            self.holdings = np.array([wallet.get(coin, {}).get("Free", 0) for coin in self.coins], dtype=np.float64)
+            self.cash = float(wallet.get(self.quote, {}).get("Free", 0))
+            self.prices = np.where(np.isnan(prices), self.prices, prices)
+
+            timestamp = time.time()
+            with STAGE_SECONDS.time("observation"):
+                self._add_prices(prices, timestamp)
+                obs, ready = self._observations()
+            with STAGE_SECONDS.time("predict"):
+                self._decide(obs, ready)
+            buy_quantity, sell_quantity = self._order_sizes()
+            self._stats["last_compute_ms"] = (time.monotonic() - fetched) * 1000
+
+            with STAGE_SECONDS.time("orders"):
+                self._place_orders(buy_quantity, sell_quantity)
+            self._stats["cycles"] += 1
+            CYCLE_SECONDS.observe(time.monotonic() - start)
+            return self.market_state()
+
+        except Exception as e:
+            self._stats["failed"] += 1
+            logger.error(f"Error in portfolio cycle: {str(e)}")
+            return None
+
+    def stats(self):
+        """
+        Return engine counters
+
+        Returns:
+            dict: pairs, pairs with a model, cycles, failed cycles, orders placed and rejected,
+                and the fetch and compute time of the last cycle in ms
+        """
+        stats = dict(self._stats)
+        stats["pairs"] = len(self.pairs)
+        stats["modeled"] = len(self.pairs) - len(self._unmodeled)
+        return stats
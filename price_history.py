@@ -0,0 +1,125 @@
+import time
+import logging
+import numpy as np
+from config import BAR_INTERVAL, PRICE_HISTORY_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Column order of every bar
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(5)
+
+
+class PriceHistory:
+    """Fixed-capacity ring buffer of OHLCV bars built from live ticks
+
+    Ticks are aggregated into bars of ``interval`` seconds. Every bar is written
+    twice, at slot ``i`` and ``i + capacity`` of a preallocated array, so the most
+    recent ``n`` bars are always one contiguous slice: windows are returned as
+    views without copying, and ticks never allocate. The bar currently being
+    built is always the last row of a window.
+    """
+
+    def __init__(self, capacity=PRICE_HISTORY_SIZE, interval=BAR_INTERVAL):
+        """
+        Initialize the buffer
+
+        Args:
+            capacity (int, optional): Maximum number of bars kept. Defaults to PRICE_HISTORY_SIZE.
+            interval (float, optional): Bar length in seconds. Defaults to BAR_INTERVAL.
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.interval = interval
+        self._bars = np.zeros((2 * capacity, 5), dtype=np.float64)
+        self._head = 0  # Slot of the bar being built
+        self._count = 0
+        self._bar_start = None
+
+    def __len__(self):
+        return self._count
+
+    def _write(self, slot, column, value):
+        self._bars[slot, column] = value
+        self._bars[slot + self.capacity, column] = value
+
+    def add_tick(self, price, volume=0.0, timestamp=None):
+        """Fold a ticker update into the current bar, starting a new bar when its interval has passed
+
+        Args:
+            price (float): Last traded price
+            volume (float, optional): Volume traded since the previous tick. Defaults to 0.0.
+            timestamp (float, optional): Tick time in seconds. Defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        bar_start = timestamp - timestamp % self.interval
+
+        if self._bar_start is None or bar_start > self._bar_start:
+            if self._bar_start is not None:
+                self._head = (self._head + 1) % self.capacity
+            self._bar_start = bar_start
+            self._count = min(self._count + 1, self.capacity)
+            slot = self._head
+            self._write(slot, OPEN, price)
+            self._write(slot, HIGH, price)
+            self._write(slot, LOW, price)
+            self._write(slot, CLOSE, price)
+            self._write(slot, VOLUME, volume)
+            return
+
+        slot = self._head
+        bars = self._bars
+        if price > bars[slot, HIGH]:
+            self._write(slot, HIGH, price)
+        if price < bars[slot, LOW]:
+            self._write(slot, LOW, price)
+        self._write(slot, CLOSE, price)
+        if volume:
+            self._write(slot, VOLUME, bars[slot, VOLUME] + volume)
+
+    def extend(self, bars, timestamps=None):
+        """Backfill completed bars (e.g. from historical data), oldest first
+
+        Args:
+            bars (np.ndarray): Array of shape (N, 5) with open, high, low, close, volume
+            timestamps (np.ndarray, optional): Bar start times. Defaults to consecutive
+                intervals ending at the current one.
+        """
+        bars = np.asarray(bars, dtype=np.float64)[-self.capacity:]
+        if timestamps is None:
+            now = time.time()
+            timestamps = now - now % self.interval - self.interval * np.arange(len(bars) - 1, -1, -1)
+        else:
+            timestamps = np.asarray(timestamps, dtype=np.float64)[-len(bars):]
+
+        for bar, bar_start in zip(bars, timestamps):
+            if self._bar_start is not None:
+                self._head = (self._head + 1) % self.capacity
+            self._bar_start = bar_start
+            self._count = min(self._count + 1, self.capacity)
+            self._bars[self._head] = bar
+            self._bars[self._head + self.capacity] = bar
+
+    def window(self, n):
+        """Return a read-only (n, 5) view of the last ``n`` bars, oldest first
+
+        Args:
+            n (int): Number of bars; fewer are returned while the buffer is filling
+
+        Returns:
+            np.ndarray: View into the buffer, valid until the next tick
+        """
+        n = min(n, self._count)
+        end = self._head + self.capacity + 1
+        view = self._bars[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def closes(self, n):
+        """Return a view of the last ``n`` close prices, oldest first"""
+        return self.window(n)[:, CLOSE]
+
+    def volumes(self, n):
+        """Return a view of the last ``n`` bar volumes, oldest first"""
+        return self.window(n)[:, VOLUME]
@@ -0,0 +1,173 @@
+import time
+import heapq
+import asyncio
+import itertools
+from config import RATE_LIMITS, RATE_LIMIT_MAX_WAIT, RATE_LIMIT_MAX_QUEUE, RATE_LIMIT_ORDER_RESERVE
+
+# Request priorities; lower goes first
+ORDER = 0
+READ = 1
+
+_CLASSES = {ORDER: "orders", READ: "reads"}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a read is shed because its request budget is exhausted"""
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``burst``"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, tokens):
+        """Seconds until the bucket holds ``tokens``"""
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+
+class RequestLimiter:
+    """Token-bucket request budgets with priority queueing for exchange calls
+
+    Each budget ("public" and "signed" endpoints) is a token bucket. A request that
+    finds a token and nobody of equal or higher priority queued goes straight through;
+    otherwise it waits in a priority queue, so orders are served before reads queued
+    earlier. Reads also leave ``order_reserve`` tokens of a budget untouched, which
+    keeps a burst available for orders while dashboards drain the rest. A read is shed
+    with RateLimitExceeded instead of queued when ``max_queue`` reads are already
+    waiting or its expected wait exceeds ``max_wait``; orders always wait.
+
+    Must be used from a single event loop (the client's background loop), which
+    serializes all access so no locking is needed.
+    """
+
+    def __init__(self, budgets=None, max_wait=RATE_LIMIT_MAX_WAIT, max_queue=RATE_LIMIT_MAX_QUEUE,
+                 order_reserve=RATE_LIMIT_ORDER_RESERVE):
+        """
+        Initialize the limiter
+
+        Args:
+            budgets (dict, optional): Budget name -> (requests per second, burst). Defaults to RATE_LIMITS.
+            max_wait (float, optional): Longest expected queue wait before a read is shed. Defaults to RATE_LIMIT_MAX_WAIT.
+            max_queue (int, optional): Queued reads per budget before more are shed. Defaults to RATE_LIMIT_MAX_QUEUE.
+            order_reserve (int, optional): Tokens per budget only orders may use. Defaults to RATE_LIMIT_ORDER_RESERVE.
+        """
+        budgets = budgets or RATE_LIMITS
+        self.buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in budgets.items()}
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.order_reserve = order_reserve
+        self._waiters = {name: [] for name in budgets}  # Heaps of (priority, sequence, future)
+        self._timers = {}
+        self._sequence = itertools.count()
+        self._stats = {name: {cls: {"granted": 0, "queued": 0, "dropped": 0, "wait_total": 0.0, "wait_max": 0.0}
+                              for cls in _CLASSES.values()}
+                       for name in budgets}
+
+    def _needed(self, priority):
+        return 1 + (self.order_reserve if priority == READ else 0)
+
+    def _record(self, budget, priority, waited):
+        stats = self._stats[budget][_CLASSES[priority]]
+        stats["granted"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+
+    async def acquire(self, budget, priority=READ):
+        """
+        Take one request token from ``budget``, waiting for it if needed
+
+        Args:
+            budget (str): Budget name, e.g. "public" or "signed"
+            priority (int, optional): ORDER or READ. Defaults to READ.
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: If the request is a read and the budget is exhausted
+        """
+        bucket = self.buckets[budget]
+        waiters = self._waiters[budget]
+        start = time.monotonic()
+        bucket.refill(start)
+
+        ahead = sum(1 for waiter in waiters if waiter[0] <= priority)
+        if not ahead and bucket.tokens >= self._needed(priority):
+            bucket.tokens -= 1
+            self._record(budget, priority, 0.0)
+            return 0.0
+
+        stats = self._stats[budget][_CLASSES[priority]]
+        if priority == READ:
+            queued_reads = sum(1 for waiter in waiters if waiter[0] == READ)
+            expected = bucket.delay(len(waiters) + self._needed(priority))
+            if queued_reads >= self.max_queue or expected > self.max_wait:
+                stats["dropped"] += 1
+                raise RateLimitExceeded(f"Request budget '{budget}' exhausted")
+
+        stats["queued"] += 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(waiters, (priority, next(self._sequence), future))
+        self._schedule(budget)
+        await future
+        waited = time.monotonic() - start
+        self._record(budget, priority, waited)
+        return waited
+
+    def _schedule(self, budget):
+        """Arm a timer for when the head of the queue can have its token"""
+        waiters = self._waiters[budget]
+        if budget in self._timers or not waiters:
+            return
+        delay = self.buckets[budget].delay(self._needed(waiters[0][0]))
+        self._timers[budget] = asyncio.get_running_loop().call_later(delay, self._release, budget)
+
+    def _release(self, budget):
+        self._timers.pop(budget, None)
+        bucket = self.buckets[budget]
+        waiters = self._waiters[budget]
+        bucket.refill(time.monotonic())
+        while waiters:
+            priority, _, future = waiters[0]
+            if future.cancelled():
+                heapq.heappop(waiters)
+                continue
+            if bucket.tokens < self._needed(priority):
+                break
+            heapq.heappop(waiters)
+            bucket.tokens -= 1
+            future.set_result(None)
+        self._schedule(budget)
+
+    def stats(self):
+        """
+        Return per-budget counters
+
+        Returns:
+            dict: Per budget: rate, burst, tokens, queue length, and for orders and reads
+                granted, queued and dropped requests with average and maximum wait in ms
+        """
+        snapshot = {}
+        now = time.monotonic()
+        for name, bucket in self.buckets.items():
+            tokens = min(bucket.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            entry = {"rate": bucket.rate, "burst": bucket.burst, "tokens": round(tokens, 2),
+                     "waiting": len(self._waiters[name])}
+            for cls, stats in self._stats[name].items():
+                entry[cls] = {
+                    "granted": stats["granted"],
+                    "queued": stats["queued"],
+                    "dropped": stats["dropped"],
+                    "avg_wait_ms": stats["wait_total"] / stats["granted"] * 1000 if stats["granted"] else 0.0,
+                    "max_wait_ms": stats["wait_max"] * 1000
+                }
+            snapshot[name] = entry
+        return snapshot
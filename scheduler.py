@@ -0,0 +1,204 @@
+import time
+import heapq
+import logging
+import threading
+from collections import deque
+from metrics import SCHEDULE_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# What to do with deadlines that passed while a tick overran
+SKIP = "skip"  # Drop the missed ticks and wait for the next deadline on the grid
+CATCH_UP = "catch_up"  # Run the missed ticks back to back (bounded by max_catch_up)
+
+# Recent lags kept per schedule for the average
+LAG_WINDOW = 100
+
+
+class Schedule:
+    """One periodic job of a DeadlineScheduler
+
+    Deadlines lie on a fixed grid (``first_deadline + k * interval`` on the monotonic
+    clock), so the time a tick takes never shifts the following ones.
+    """
+
+    def __init__(self, name, interval, callback, policy=SKIP, max_catch_up=3):
+        if interval <= 0:
+            raise ValueError(f"Schedule interval must be positive, got {interval}")
+        if policy not in (SKIP, CATCH_UP):
+            raise ValueError(f"Unknown schedule policy: {policy}")
+        self.name = name
+        self.interval = interval
+        self.callback = callback
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.deadline = None
+        self.ticks = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.lags = deque(maxlen=LAG_WINDOW)
+        self.cancelled = False
+
+    def _record(self, lag):
+        self.ticks += 1
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.lags.append(lag)
+        SCHEDULE_LAG_SECONDS.observe(lag, self.name)
+
+    def _advance(self, now):
+        """Move to the next deadline after a tick that started at ``deadline`` and ended at ``now``"""
+        self.deadline += self.interval
+        missed = int((now - self.deadline) // self.interval) + 1 if now >= self.deadline else 0
+        if missed == 0:
+            return
+        if self.policy == CATCH_UP and missed <= self.max_catch_up:
+            return  # The next tick is already due and runs right away
+        # Jump to the first deadline on the grid that is still ahead
+        skip = missed if self.policy == SKIP else missed - self.max_catch_up
+        self.deadline += skip * self.interval
+        self.skipped += skip
+
+    def stats(self):
+        """
+        Return tick and lag counters
+
+        Returns:
+            dict: ticks, skipped, errors, interval and last/avg/max lag in milliseconds
+        """
+        return {
+            "interval": self.interval,
+            "ticks": self.ticks,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "last_lag_ms": self.last_lag * 1000,
+            "avg_lag_ms": sum(self.lags) / len(self.lags) * 1000 if self.lags else 0.0,
+            "max_lag_ms": self.max_lag * 1000
+        }
+
+
+class DeadlineScheduler:
+    """Single event loop firing periodic jobs on fixed monotonic deadlines
+
+    Each job (e.g. one per trading pair) has its own interval and missed-deadline
+    policy. Jobs run one at a time in the loop thread in deadline order, and the
+    lag between a deadline and the moment its tick actually starts is recorded.
+    """
+
+    def __init__(self, clock=time.monotonic, wall_clock=time.time):
+        """
+        Create an empty scheduler
+
+        Args:
+            clock (callable, optional): Monotonic clock for deadlines. Defaults to time.monotonic.
+            wall_clock (callable, optional): Clock that ``align`` refers to. Defaults to time.time.
+        """
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self._heap = []
+        self._schedules = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+    def add(self, name, interval, callback, policy=SKIP, align=False, offset=0.0, max_catch_up=3):
+        """
+        Register a periodic job
+
+        Args:
+            name (str): Unique job name (e.g. the trading pair)
+            interval (float): Seconds between deadlines
+            callback (callable): Called without arguments on every tick
+            policy (str, optional): SKIP or CATCH_UP for missed deadlines. Defaults to SKIP.
+            align (bool, optional): Put deadlines on wall-clock multiples of ``interval`` (bar
+                boundaries) instead of starting one interval from now. Defaults to False.
+            offset (float, optional): Seconds after each aligned boundary to fire. Defaults to 0.0.
+            max_catch_up (int, optional): Most missed ticks CATCH_UP replays. Defaults to 3.
+
+        Returns:
+            Schedule: The registered job
+        """
+        schedule = Schedule(name, interval, callback, policy=policy, max_catch_up=max_catch_up)
+        now = self.clock()
+        if align:
+            schedule.deadline = now + (offset - self.wall_clock()) % interval
+        else:
+            schedule.deadline = now + interval
+        with self._lock:
+            if name in self._schedules:
+                raise ValueError(f"Schedule {name} already exists")
+            self._schedules[name] = schedule
+            self._push(schedule)
+        self._wakeup.set()
+        return schedule
+
+    def remove(self, name):
+        """Cancel a job; a tick that is already running finishes"""
+        with self._lock:
+            schedule = self._schedules.pop(name, None)
+        if schedule is not None:
+            schedule.cancelled = True
+
+    def _push(self, schedule):
+        self._sequence += 1
+        heapq.heappush(self._heap, (schedule.deadline, self._sequence, schedule))
+
+    def _pop_due(self, now):
+        """Return the earliest due job, or the seconds until the next deadline"""
+        with self._lock:
+            while self._heap and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                return None, None
+            deadline, _, schedule = self._heap[0]
+            if deadline > now:
+                return None, deadline - now
+            heapq.heappop(self._heap)
+            return schedule, 0.0
+
+    def run_pending(self):
+        """
+        Run every job whose deadline has passed, in deadline order
+
+        Returns:
+            float: Seconds until the next deadline, or None when no jobs are left
+        """
+        while True:
+            now = self.clock()
+            schedule, wait = self._pop_due(now)
+            if schedule is None:
+                return wait
+            schedule._record(now - schedule.deadline)
+            try:
+                schedule.callback()
+            except Exception as e:
+                schedule.errors += 1
+                logger.error(f"Scheduled job {schedule.name} failed: {str(e)}")
+            schedule._advance(self.clock())
+            with self._lock:
+                if not schedule.cancelled:
+                    self._push(schedule)
+
+    def run(self):
+        """Run the loop in the calling thread until ``stop`` is called"""
+        self._stopped = False
+        while not self._stopped:
+            wait = self.run_pending()
+            if self._stopped:
+                break
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
+
+    def stop(self):
+        """Make ``run`` return after the current tick"""
+        self._stopped = True
+        self._wakeup.set()
+
+    def stats(self):
+        """Return per-job counters keyed by job name"""
+        with self._lock:
+            schedules = list(self._schedules.values())
+        return {schedule.name: schedule.stats() for schedule in schedules}
@@ -227,6 +227,52 @@ document.addEventListener('DOMContentLoaded', function() {
         }, 8000);
     }
     
+    // Render the trade history table from tradeHistory
+    function renderTradeHistory() {
+        const tableBody = document.getElementById('recent-trades-table');
+        if (!tableBody) return;
+        
+        let html = '';
+        tradeHistory.forEach(trade => {
+            const rowClass = trade.side === 'BUY' ? 'table-success' : 'table-danger';
+            const timestamp = trade.timestamp || trade.time || '';
+            const formattedTime = timestamp.includes(' ') ? 
+                timestamp.substring(timestamp.indexOf(' ') + 1) : timestamp; 
+            
+            // Format numbers with 2 decimal places, handling potential non-numbers
+            const formattedPrice = parseFloat(trade.price || 0).toFixed(2);
+            const formattedTotal = parseFloat(trade.total || 0).toFixed(2);
+            
+            html += `
+                <tr class="${rowClass}">
+                    <td>${formattedTime}</td>
+                    <td>${trade.pair || 'BTC/USD'}</td>
+                    <td>${trade.side || 'UNKNOWN'}</td>
+                    <td>$${formattedPrice}</td>
+                    <td>${trade.quantity || '0.01'}</td>
+                    <td>$${formattedTotal}</td>
+                    <td><span class="badge bg-success">${trade.status || 'FILLED'}</span></td>
+                </tr>
+            `;
+        });
+        
+        tableBody.innerHTML = html;
+        
+        // Update metrics
+        updatePerformanceMetrics();
+    }
+    
+    // Add trades pushed by the event stream, skipping ones already shown
+    function addTrades(trades) {
+        const known = new Set(tradeHistory.map(trade => trade.order_id).filter(id => id !== undefined && id !== null));
+        trades.forEach(trade => {
+            if (trade.order_id === undefined || trade.order_id === null || !known.has(trade.order_id)) {
+                tradeHistory.push(trade);
+            }
+        });
+        renderTradeHistory();
+    }
+    
     // Update trade history table with real data
     function updateTradeHistory() {
         try {
@@ -241,38 +287,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     if (data.success && data.data && data.data.length > 0) {
                         console.log('Received trade history data:', data.data);
                         tradeHistory = data.data;
-                        
-                        const tableBody = document.getElementById('recent-trades-table');
-                        if (!tableBody) return;
-                        
-                        let html = '';
-                        tradeHistory.forEach(trade => {
-                            const rowClass = trade.side === 'BUY' ? 'table-success' : 'table-danger';
-                            const timestamp = trade.timestamp || trade.time || '';
-                            const formattedTime = timestamp.includes(' ') ? 
-                                timestamp.substring(timestamp.indexOf(' ') + 1) : timestamp; 
-                            
-                            // Format numbers with 2 decimal places, handling potential non-numbers
-                            const formattedPrice = parseFloat(trade.price || 0).toFixed(2);
-                            const formattedTotal = parseFloat(trade.total || 0).toFixed(2);
-                            
-                            html += `
-                                <tr class="${rowClass}">
-                                    <td>${formattedTime}</td>
-                                    <td>${trade.pair || 'BTC/USD'}</td>
-                                    <td>${trade.side || 'UNKNOWN'}</td>
-                                    <td>$${formattedPrice}</td>
-                                    <td>${trade.quantity || '0.01'}</td>
-                                    <td>$${formattedTotal}</td>
-                                    <td><span class="badge bg-success">${trade.status || 'FILLED'}</span></td>
-                                </tr>
-                            `;
-                        });
-                        
-                        tableBody.innerHTML = html;
-                        
-                        // Update metrics
-                        updatePerformanceMetrics();
+                        renderTradeHistory();
                     } else {
                         console.warn('No trade history data available or request failed');
                         // Use sample data for demo purposes if needed
@@ -286,6 +301,24 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
+    // Show the wallet balance from a /v3/balance response
+    function renderWalletBalance(balanceData) {
+        const walletData = balanceData.Wallet || balanceData.SpotWallet || {};
+        
+        btcBalance = walletData.BTC?.Free || 0;
+        usdBalance = walletData.USD?.Free || 0;
+        
+        // Update wallet display
+        const btcEl = document.getElementById('btc-balance');
+        const usdEl = document.getElementById('usd-balance');
+        
+        if (btcEl) btcEl.textContent = btcBalance.toFixed(5);
+        if (usdEl) usdEl.textContent = usdBalance.toFixed(2);
+        
+        // Update portfolio value
+        updatePortfolioValue();
+    }
+    
     // Update wallet balance
     function updateWalletBalance() {
         try {
@@ -298,20 +331,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 })
                 .then(data => {
                     if (data.success && data.data) {
-                        const walletData = data.data.Wallet || data.data.SpotWallet || {};
-                        
-                        btcBalance = walletData.BTC?.Free || 0;
-                        usdBalance = walletData.USD?.Free || 0;
-                        
-                        // Update wallet display
-                        const btcEl = document.getElementById('btc-balance');
-                        const usdEl = document.getElementById('usd-balance');
-                        
-                        if (btcEl) btcEl.textContent = btcBalance.toFixed(5);
-                        if (usdEl) usdEl.textContent = usdBalance.toFixed(2);
-                        
-                        // Update portfolio value
-                        updatePortfolioValue();
+                        renderWalletBalance(data.data);
                     } else {
                         console.warn('No wallet data available or request failed');
                         // Use sample data for demo
@@ -346,6 +366,64 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
+    // Show price, change and a new chart point from a /v3/ticker response
+    function renderMarketData(tickerData) {
+        if (!(tickerData && tickerData.Data && tickerData.Data["BTC/USD"])) {
+            return false;
+        }
+        
+        const marketData = tickerData.Data["BTC/USD"];
+        const currentPrice = marketData.LastPrice;
+        const priceChange = marketData.Change;
+        const changePercent = (priceChange * 100).toFixed(2);
+        
+        // Update price display
+        const priceEl = document.getElementById('current-price');
+        if (priceEl) {
+            priceEl.textContent = '$' + currentPrice.toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2});
+        }
+        
+        // Update price change
+        const priceChangeElement = document.getElementById('price-change');
+        if (priceChangeElement) {
+            priceChangeElement.textContent = (priceChange >= 0 ? '+' : '') + changePercent + '%';
+            
+            if (priceChange >= 0) {
+                priceChangeElement.classList.remove('text-danger');
+                priceChangeElement.classList.add('text-success');
+            } else {
+                priceChangeElement.classList.remove('text-success');
+                priceChangeElement.classList.add('text-danger');
+            }
+        }
+        
+        // Update chart if it exists
+        if (priceChart) {
+            // Add new data point
+            const now = new Date();
+            const timeString = now.getHours() + ':' + now.getMinutes() + ':' + now.getSeconds();
+            
+            priceData.labels.push(timeString);
+            priceData.datasets[0].data.push(currentPrice);
+            
+            // Keep only the last 20 data points
+            if (priceData.labels.length > 20) {
+                priceData.labels.shift();
+                priceData.datasets[0].data.shift();
+            }
+            
+            try {
+                priceChart.update();
+            } catch (e) {
+                console.error('Error updating chart:', e);
+            }
+        }
+        
+        // Update portfolio value
+        updatePortfolioValue(currentPrice);
+        return true;
+    }
+    
     // Update market data and chart
     function updateMarketData() {
         try {
@@ -357,57 +435,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     return response.json();
                 })
                 .then(data => {
-                    if (data.success && data.data && data.data.Data && data.data.Data["BTC/USD"]) {
-                        const marketData = data.data.Data["BTC/USD"];
-                        const currentPrice = marketData.LastPrice;
-                        const priceChange = marketData.Change;
-                        const changePercent = (priceChange * 100).toFixed(2);
-                        
-                        // Update price display
-                        const priceEl = document.getElementById('current-price');
-                        if (priceEl) {
-                            priceEl.textContent = '$' + currentPrice.toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2});
-                        }
-                        
-                        // Update price change
-                        const priceChangeElement = document.getElementById('price-change');
-                        if (priceChangeElement) {
-                            priceChangeElement.textContent = (priceChange >= 0 ? '+' : '') + changePercent + '%';
-                            
-                            if (priceChange >= 0) {
-                                priceChangeElement.classList.remove('text-danger');
-                                priceChangeElement.classList.add('text-success');
-                            } else {
-                                priceChangeElement.classList.remove('text-success');
-                                priceChangeElement.classList.add('text-danger');
-                            }
-                        }
-                        
-                        // Update chart if it exists
-                        if (priceChart) {
-                            // Add new data point
-                            const now = new Date();
-                            const timeString = now.getHours() + ':' + now.getMinutes() + ':' + now.getSeconds();
-                            
-                            priceData.labels.push(timeString);
-                            priceData.datasets[0].data.push(currentPrice);
-                            
-                            // Keep only the last 20 data points
-                            if (priceData.labels.length > 20) {
-                                priceData.labels.shift();
-                                priceData.datasets[0].data.shift();
-                            }
-                            
-                            try {
-                                priceChart.update();
-                            } catch (e) {
-                                console.error('Error updating chart:', e);
-                            }
-                        }
-                        
-                        // Update portfolio value
-                        updatePortfolioValue(currentPrice);
-                    } else {
+                    if (!data.success || !renderMarketData(data.data)) {
                         console.warn('No market data available or request failed');
                         // Update with sample data if API fails
                         const priceEl = document.getElementById('current-price');
@@ -471,6 +499,34 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
+    // Show whether the trader is running
+    function renderTradingStatus(data) {
+        const isActive = data.is_active;
+        const statusElement = document.getElementById('trading-status');
+        
+        if (statusElement) {
+            statusElement.textContent = isActive ? 'Running' : 'Stopped';
+            
+            if (isActive) {
+                statusElement.classList.remove('text-danger');
+                statusElement.classList.add('text-success');
+                
+                if (startTradingBtn && stopTradingBtn) {
+                    startTradingBtn.classList.add('d-none');
+                    stopTradingBtn.classList.remove('d-none');
+                }
+            } else {
+                statusElement.classList.remove('text-success');
+                statusElement.classList.add('text-danger');
+                
+                if (startTradingBtn && stopTradingBtn) {
+                    stopTradingBtn.classList.add('d-none');
+                    startTradingBtn.classList.remove('d-none');
+                }
+            }
+        }
+    }
+    
     // Update trading status
     function updateTradingStatus() {
         try {
@@ -482,30 +538,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     return response.json();
                 })
                 .then(data => {
-                    const isActive = data.is_active;
-                    const statusElement = document.getElementById('trading-status');
-                    
-                    if (statusElement) {
-                        statusElement.textContent = isActive ? 'Running' : 'Stopped';
-                        
-                        if (isActive) {
-                            statusElement.classList.remove('text-danger');
-                            statusElement.classList.add('text-success');
-                            
-                            if (startTradingBtn && stopTradingBtn) {
-                                startTradingBtn.classList.add('d-none');
-                                stopTradingBtn.classList.remove('d-none');
-                            }
-                        } else {
-                            statusElement.classList.remove('text-success');
-                            statusElement.classList.add('text-danger');
-                            
-                            if (startTradingBtn && stopTradingBtn) {
-                                stopTradingBtn.classList.add('d-none');
-                                startTradingBtn.classList.remove('d-none');
-                            }
-                        }
-                    }
+                    renderTradingStatus(data);
                 })
                 .catch(error => {
                     console.error('Error fetching trading status:', error);
@@ -694,8 +727,32 @@ document.addEventListener('DOMContentLoaded', function() {
         }, interval);
     }
     
-    setupRefreshInterval(updateTradeHistory, 10000); // Every 10 seconds
-    setupRefreshInterval(updateWalletBalance, 15000); // Every 15 seconds
-    setupRefreshInterval(updateMarketData, 5000);     // Every 5 seconds
-    setupRefreshInterval(updateTradingStatus, 10000); // Every 10 seconds
+    // Handle one pushed event and re-dispatch it for other scripts on the page
+    function onStreamEvent(source, name, render) {
+        source.addEventListener(name, event => {
+            try {
+                const data = JSON.parse(event.data);
+                render(data);
+                document.dispatchEvent(new CustomEvent(`dashboard:${name}`, {detail: data}));
+            } catch (error) {
+                console.error(`Error handling ${name} event:`, error);
+            }
+        });
+    }
+    
+    // Live updates are pushed over one Server-Sent Events stream; the server polls the
+    // exchange once for all open dashboards. Browsers without EventSource fall back to polling.
+    if (window.EventSource) {
+        const stream = new EventSource('/api/stream');
+        onStreamEvent(stream, 'ticker', renderMarketData);
+        onStreamEvent(stream, 'balance', renderWalletBalance);
+        onStreamEvent(stream, 'status', renderTradingStatus);
+        onStreamEvent(stream, 'trades', addTrades);
+        stream.onerror = () => console.warn('Event stream interrupted, reconnecting...');
+    } else {
+        setupRefreshInterval(updateTradeHistory, 10000); // Every 10 seconds
+        setupRefreshInterval(updateWalletBalance, 15000); // Every 15 seconds
+        setupRefreshInterval(updateMarketData, 5000);     // Every 5 seconds
+        setupRefreshInterval(updateTradingStatus, 10000); // Every 10 seconds
+    }
 });
@@ -0,0 +1,253 @@
+import sys
+import math
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+
+
+class RollingMean:
+    """O(1) rolling mean matching ``Series.rolling(window).mean()`` bit for bit
+
+    Mirrors pandas' online algorithm: Kahan-compensated add/remove sums with
+    separate compensation terms, and the same clamping of sign artifacts.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.neg_ct = 0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = None
+
+    def update(self, val):
+        """Add a value and return the mean of the last ``window`` values (NaN until full)"""
+        if self.prev_value is None:
+            self.prev_value = val
+
+        self.values.append(val)
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if old == old:
+                self.nobs -= 1
+                y = -old - self.compensation_remove
+                t = self.sum_x + y
+                self.compensation_remove = t - self.sum_x - y
+                self.sum_x = t
+                if math.copysign(1.0, old) < 0:
+                    self.neg_ct -= 1
+
+        if val == val:
+            self.nobs += 1
+            y = val - self.compensation_add
+            t = self.sum_x + y
+            self.compensation_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct += 1
+            if val == self.prev_value:
+                self.num_consecutive_same_value += 1
+            else:
+                self.num_consecutive_same_value = 1
+            self.prev_value = val
+
+        if self.nobs >= self.window and self.nobs > 0:
+            result = self.sum_x / self.nobs
+            if self.num_consecutive_same_value >= self.nobs:
+                result = self.prev_value
+            elif self.neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self.neg_ct == self.nobs and result > 0:
+                result = 0.0
+            return result
+        return NAN
+
+
+class RollingStd:
+    """O(1) rolling standard deviation matching ``Series.rolling(window).std(ddof)``
+
+    Uses the same online Welford add/remove update as pandas, including its
+    recomputation of the window when a removal cancels out almost all of the
+    accumulated sum of squares.
+    """
+
+    # Relative loss of precision that triggers a recomputation (1000 * DBL_EPSILON)
+    CANCELLATION_TOLERANCE = 1000 * sys.float_info.epsilon
+
+    def __init__(self, window, ddof=1):
+        self.window = window
+        self.ddof = ddof
+        self.values = deque()
+        self.nobs = 0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+
+    def _add(self, val):
+        self.nobs += 1
+        prev_mean = self.mean_x
+        self.mean_x = self.mean_x + (val - self.mean_x) / self.nobs
+        self.ssqdm_x = self.ssqdm_x + (val - prev_mean) * (val - self.mean_x)
+
+    def _recompute(self):
+        self.nobs = 0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        for val in self.values:
+            if val == val:
+                self._add(val)
+
+    def update(self, val):
+        """Add a value and return the std of the last ``window`` values (NaN until full)"""
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if old == old:
+                self.nobs -= 1
+                if self.nobs:
+                    prev_mean = self.mean_x
+                    prev_ssqdm = self.ssqdm_x
+                    self.mean_x = self.mean_x - (old - self.mean_x) / self.nobs
+                    self.ssqdm_x = self.ssqdm_x - (old - prev_mean) * (old - self.mean_x)
+                    if self.ssqdm_x < self.CANCELLATION_TOLERANCE * prev_ssqdm:
+                        self._recompute()
+                else:
+                    self.mean_x = 0.0
+                    self.ssqdm_x = 0.0
+
+        self.values.append(val)
+        if val == val:
+            self._add(val)
+
+        if self.nobs >= self.window and self.nobs > self.ddof:
+            if self.nobs == 1:
+                return 0.0
+            variance = self.ssqdm_x / (self.nobs - self.ddof)
+            return math.sqrt(variance) if variance > 0 else 0.0
+        return NAN
+
+
+class EWMA:
+    """O(1) exponential moving average matching ``Series.ewm(..., adjust=False).mean()``"""
+
+    def __init__(self, span=None, alpha=None, min_periods=0):
+        # Convert to the center of mass and back exactly as pandas does
+        if span is not None:
+            com = (span - 1) / 2.0
+        else:
+            com = 1.0 / alpha - 1.0
+        self.alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - self.alpha
+        self.min_periods = max(min_periods, 1)
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, cur):
+        """Add a value and return the current average (NaN before ``min_periods`` values)"""
+        is_observation = cur == cur
+        if is_observation:
+            self.nobs += 1
+        if self.weighted == self.weighted:
+            # Missing values still decay the previous weight (ignore_na=False)
+            self.old_wt *= self.old_wt_factor
+            if is_observation:
+                # Constant series are left untouched to avoid rounding drift
+                if self.weighted != cur:
+                    self.weighted = (self.old_wt * self.weighted + self.alpha * cur) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        elif is_observation:
+            self.weighted = cur
+        return self.weighted if self.nobs >= self.min_periods else NAN
+
+
+class IndicatorEngine:
+    """Incremental version of the indicators added by ``data_processor.preprocess_data``
+
+    Each ``update`` consumes one bar and returns the new row's indicators in
+    O(1), producing the same values as recomputing the whole series with ``ta``.
+    """
+
+    COLUMNS = ['returns', 'rsi', 'sma', 'ema', 'macd', 'macd_signal', 'macd_diff',
+               'bollinger_high', 'bollinger_low', 'volume_sma']
+
+    def __init__(self):
+        self.prev_close = None
+        self.rsi_up = EWMA(alpha=1 / 14, min_periods=14)
+        self.rsi_down = EWMA(alpha=1 / 14, min_periods=14)
+        self.sma = RollingMean(20)
+        self.ema = EWMA(span=20, min_periods=20)
+        self.ema_fast = EWMA(span=12, min_periods=12)
+        self.ema_slow = EWMA(span=26, min_periods=26)
+        self.macd_signal = EWMA(span=9, min_periods=9)
+        self.bollinger_mavg = RollingMean(20)
+        self.bollinger_std = RollingStd(20, ddof=0)
+        self.volume_sma = RollingMean(20)
+
+    @classmethod
+    def from_frame(cls, data):
+        """Create an engine whose state reflects every bar in ``data``
+
+        Args:
+            data (pd.DataFrame): Bars with lowercase 'close' and 'volume' columns
+
+        Returns:
+            IndicatorEngine: Engine ready for the next live bar
+        """
+        engine = cls()
+        for close, volume in zip(data['close'].to_numpy(dtype=float), data['volume'].to_numpy(dtype=float)):
+            engine.update({'close': close, 'volume': volume})
+        return engine
+
+    def update(self, bar):
+        """Consume one bar and return its indicator values
+
+        Args:
+            bar (dict): Bar with at least 'close' and 'volume'
+
+        Returns:
+            dict: Indicator values keyed like the preprocess_data columns (NaN while warming up)
+        """
+        close = float(bar['close'])
+        volume = float(bar['volume'])
+
+        if self.prev_close is None:
+            returns = NAN
+            diff = NAN
+        else:
+            returns = close / self.prev_close - 1
+            diff = close - self.prev_close
+        self.prev_close = close
+
+        # RSI: NaN comparisons are False, so the first bar contributes 0.0 to both legs
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        ema_up = self.rsi_up.update(up)
+        ema_down = self.rsi_down.update(down)
+        if ema_down == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + ema_up / ema_down))
+
+        macd = self.ema_fast.update(close) - self.ema_slow.update(close)
+        macd_signal = self.macd_signal.update(macd)
+
+        mavg = self.bollinger_mavg.update(close)
+        mstd = self.bollinger_std.update(close)
+
+        return {
+            'returns': returns,
+            'rsi': rsi,
+            'sma': self.sma.update(close),
+            'ema': self.ema.update(close),
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_diff': macd - macd_signal,
+            'bollinger_high': mavg + 2 * mstd,
+            'bollinger_low': mavg - 2 * mstd,
+            'volume_sma': self.volume_sma.update(volume)
+        }
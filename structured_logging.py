@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from config import LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_SAMPLE_EVERY
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sample"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, ``extra`` fields and traceback"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep 1 in ``every`` records logged with ``extra={"sample": True}``
+
+    Sampling is per logger and message template, so each kind of payload log keeps
+    its own rate. Warnings and errors always pass. Kept records carry ``sampled``,
+    the number of records they stand for. Counts are updated without a lock; a
+    race only shifts which record of a run is kept.
+    """
+
+    def __init__(self, every=LOG_SAMPLE_EVERY):
+        super(SamplingFilter, self).__init__()
+        self.every = every
+        self._counts = {}
+
+    def filter(self, record):
+        if not getattr(record, "sample", False) or record.levelno >= logging.WARNING or self.every <= 1:
+            return True
+        key = (record.name, record.msg)
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        if count % self.every:
+            return False
+        record.sampled = self.every
+        return True
+
+
+class AsyncHandler(QueueHandler):
+    """Hands records to a background QueueListener without formatting them
+
+    The message is merged with its arguments on the writer thread, so a record that is
+    filtered out or never written costs no formatting at all. Arguments must not be
+    mutated after the call (exchange payloads are not). When the queue is full the
+    record is dropped and counted instead of blocking the caller.
+    """
+
+    def __init__(self, maxsize=LOG_QUEUE_SIZE):
+        super(AsyncHandler, self).__init__(queue.Queue(maxsize))
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_lock = threading.Lock()
+_handler = None
+_listener = None
+_saved_details = None
+
+# Module-level switches of the logging package that make every LogRecord look up these details
+_DETAIL_FLAGS = ("_srcfile", "logThreads", "logProcesses", "logMultiprocessing")
+
+
+def _start_listener(handler, target):
+    global _listener
+    _listener = QueueListener(handler.queue, target, respect_handler_level=True)
+    _listener.start()
+
+
+def _after_fork():
+    # The writer thread does not survive fork(); give the child its own queue and writer
+    if _handler is not None and _listener is not None:
+        target = _listener.handlers[0]
+        _handler.queue = queue.Queue(_handler.queue.maxsize)
+        _handler.dropped = 0
+        _start_listener(_handler, target)
+
+
+def skip_record_details():
+    """Stop filling LogRecord fields neither format uses (caller frame, thread, process)
+
+    Finding the caller walks the stack on every record and is the largest cost of
+    creating one (see "Optimization" in the logging HOWTO). The switches are global to
+    the logging package, so every logger and handler in the process is affected:
+    %(pathname)s, %(lineno)d, %(funcName)s, %(thread)d and %(process)d stop being filled in.
+
+    Returns:
+        dict: The previous settings, for ``restore_record_details``
+    """
+    previous = {flag: getattr(logging, flag) for flag in _DETAIL_FLAGS}
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    return previous
+
+
+def restore_record_details(previous):
+    """Undo ``skip_record_details`` with the settings it returned"""
+    for flag, value in previous.items():
+        setattr(logging, flag, value)
+
+
+def stop_logging():
+    """Write the queued records and stop the writer
+
+    Runs at exit; multiprocessing children leave through os._exit, so they call it themselves.
+    Also restores the record details that ``setup_logging`` switched off.
+    """
+    global _saved_details
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+    if _saved_details is not None:
+        restore_record_details(_saved_details)
+        _saved_details = None
+
+
+def setup_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, stream=None):
+    """
+    Route all logging through a queue to a background writer
+
+    Replaces the root handlers: callers only filter and enqueue, the writer thread
+    formats (JSON or text) and writes. Records skip the caller lookup and the thread
+    and process fields, which neither format prints. That is a process-wide change to
+    the logging package (see ``skip_record_details``), made here rather than on import
+    and undone by ``stop_logging``. Safe to call more than once; later calls only change
+    the level. Pending records are written at exit.
+
+    Args:
+        level (str, optional): Root level. Defaults to LOG_LEVEL.
+        fmt (str, optional): "json" or "text". Defaults to LOG_FORMAT.
+        stream (file, optional): Output stream. Defaults to stderr.
+
+    Returns:
+        AsyncHandler: The root handler (``dropped`` counts records lost to a full queue)
+    """
+    global _handler, _saved_details
+    root = logging.getLogger()
+    with _lock:
+        root.setLevel(level)
+        if _handler is not None:
+            return _handler
+        _saved_details = skip_record_details()
+        target = logging.StreamHandler(stream or sys.stderr)
+        target.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+        _handler = AsyncHandler()
+        _handler.addFilter(SamplingFilter())
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_handler)
+        _start_listener(_handler, target)
+        os.register_at_fork(after_in_child=_after_fork)
+        atexit.register(stop_logging)
+    return _handler
@@ -0,0 +1,285 @@
+import time
+import base64
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from sqlalchemy import insert, select, func, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from config import DB_WRITE_BATCH_SIZE, DB_FLUSH_INTERVAL, DB_MAX_PENDING
+from models import Trade, PerformanceMetric
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def trade_row(record):
+    """
+    Convert a trade record into Trade column values
+
+    Args:
+        record (dict): Trade as built by the trader and the API routes (string timestamp, total)
+
+    Returns:
+        dict: Column values for a bulk insert
+    """
+    timestamp = record.get("timestamp")
+    if isinstance(timestamp, str):
+        timestamp = datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+    order_id = record.get("order_id")
+    try:
+        order_id = None if order_id is None else int(order_id)
+    except (TypeError, ValueError):
+        order_id = None
+    return {
+        "timestamp": timestamp or datetime.now(),
+        "pair": record.get("pair", "BTC/USD"),
+        "side": record.get("side", "BUY"),
+        "type": record.get("type", "MARKET"),
+        "quantity": record.get("quantity", 0),
+        "price": record.get("price"),
+        "status": record.get("status", "FILLED"),
+        "order_id": order_id,
+        "profit_loss": record.get("profit_loss")
+    }
+
+
+def trade_record(trade):
+    """Convert a Trade row back into the record format served to the dashboard"""
+    price = trade.price or 0
+    return {
+        "id": trade.id,
+        "timestamp": trade.timestamp.strftime(TIMESTAMP_FORMAT),
+        "pair": trade.pair,
+        "side": trade.side,
+        "type": trade.type,
+        "price": price,
+        "quantity": trade.quantity,
+        "total": trade.quantity * price,
+        "status": trade.status,
+        "order_id": trade.order_id,
+        "profit_loss": trade.profit_loss
+    }
+
+
+def _insert_trades(dialect):
+    """INSERT that merges rows whose order_id is already stored
+
+    The trader and the OrderSync both record executed orders, in either order. The
+    first row wins, except that a realized profit_loss (known only to the trader)
+    fills in a stored row that has none.
+    """
+    if dialect == "postgresql":
+        statement = postgresql.insert(Trade)
+    elif dialect == "sqlite":
+        statement = sqlite.insert(Trade)
+    else:
+        return insert(Trade)
+    return statement.on_conflict_do_update(
+        index_elements=["order_id"],
+        set_={"profit_loss": func.coalesce(statement.excluded.profit_loss, Trade.profit_loss)})
+
+
+def _merge_trades(rows):
+    """Collapse rows of the same order_id in one batch (an upsert may touch each row once)"""
+    merged = {}
+    for row in rows:
+        key = row["order_id"] if row["order_id"] is not None else id(row)
+        first = merged.get(key)
+        if first is None:
+            merged[key] = row
+        elif first["profit_loss"] is None:
+            first["profit_loss"] = row["profit_loss"]
+    return list(merged.values())
+
+
+def trades_after(engine, trade_id, limit=500):
+    """Return records of up to ``limit`` trades stored after ``trade_id``, oldest first"""
+    with engine.connect() as conn:
+        rows = conn.execute(select(Trade).where(Trade.id > trade_id).order_by(Trade.id).limit(limit)).all()
+    return [trade_record(row) for row in rows]
+
+
+def encode_cursor(trade):
+    """Opaque cursor pointing just below ``trade`` in newest-first order"""
+    return base64.urlsafe_b64encode(f"{trade.timestamp.isoformat()}|{trade.id}".encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor from ``encode_cursor``
+
+    Returns:
+        tuple: (timestamp, trade id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        timestamp, trade_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(timestamp), int(trade_id)
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def trades_page(engine, pair, cursor=None, limit=50):
+    """
+    Return one page of a pair's trades, newest page first
+
+    Keyset pagination on (timestamp, id) through the (pair, timestamp) index, so every
+    page costs the same however deep into the history it is.
+
+    Args:
+        engine (Engine): Database the models live in
+        pair (str): Trading pair
+        cursor (str, optional): ``next_cursor`` of the previous page. Defaults to None (newest page).
+        limit (int, optional): Trades per page. Defaults to 50.
+
+    Returns:
+        tuple: (records of the page oldest first, cursor of the next older page or None)
+    """
+    query = select(Trade).where(Trade.pair == pair)
+    if cursor:
+        timestamp, trade_id = decode_cursor(cursor)
+        query = query.where(Trade.timestamp <= timestamp,
+                            or_(Trade.timestamp < timestamp, Trade.id < trade_id))
+    query = query.order_by(Trade.timestamp.desc(), Trade.id.desc()).limit(limit + 1)
+    with engine.connect() as conn:
+        rows = conn.execute(query).all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return [trade_record(row) for row in reversed(rows[:limit])], next_cursor
+
+
+def last_trade_id(engine):
+    """Id of the newest trade, 0 when there are none"""
+    with engine.connect() as conn:
+        return conn.execute(select(func.coalesce(func.max(Trade.id), 0))).scalar()
+
+
+class TradeWriter:
+    """Buffered, batched writer for Trade rows and PerformanceMetric snapshots
+
+    ``add_trade`` and ``add_metric`` only append to an in-memory buffer, so the trading
+    loop never waits on the database. A background thread writes the buffer with one
+    bulk INSERT per table every ``flush_interval`` seconds, or as soon as ``batch_size``
+    rows are waiting. Rows that fail to write stay buffered (up to ``max_pending``,
+    oldest dropped first) and are retried on the next flush.
+    """
+
+    def __init__(self, engine, batch_size=DB_WRITE_BATCH_SIZE, flush_interval=DB_FLUSH_INTERVAL,
+                 max_pending=DB_MAX_PENDING):
+        """
+        Initialize the writer
+
+        Args:
+            engine (Engine): Database the models live in
+            batch_size (int, optional): Buffered rows that trigger a flush. Defaults to DB_WRITE_BATCH_SIZE.
+            flush_interval (float, optional): Seconds between flushes. Defaults to DB_FLUSH_INTERVAL.
+            max_pending (int, optional): Rows kept while writes fail. Defaults to DB_MAX_PENDING.
+        """
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._trades = deque()
+        self._metrics = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._stats = {"written": 0, "flushes": 0, "errors": 0, "dropped": 0, "last_flush_ms": 0.0}
+
+    def _append(self, buffer, rows):
+        with self._lock:
+            buffer.extend(rows)
+            overflow = len(self._trades) + len(self._metrics) - self.max_pending
+            while overflow > 0 and buffer:
+                buffer.popleft()
+                self._stats["dropped"] += 1
+                overflow -= 1
+            full = len(self._trades) + len(self._metrics) >= self.batch_size
+            if self._thread is None and not self._stopping:
+                # Started on first use so a writer created before a fork gets its thread in the child
+                self._thread = threading.Thread(target=self._run, name="trade-writer", daemon=True)
+                self._thread.start()
+        if full:
+            self._wake.set()
+
+    def add_trade(self, record):
+        """Buffer one trade record (see ``trade_row``)"""
+        self._append(self._trades, [trade_row(record)])
+
+    def add_trades(self, records):
+        """Buffer several trade records"""
+        self._append(self._trades, [trade_row(record) for record in records])
+
+    def add_metric(self, **values):
+        """Buffer a PerformanceMetric snapshot (column values; timestamp defaults to now)"""
+        values.setdefault("timestamp", datetime.now())
+        self._append(self._metrics, [values])
+
+    def flush(self):
+        """
+        Write everything buffered now
+
+        Returns:
+            int: Rows written (0 when the write failed and the rows were kept)
+        """
+        with self._flush_lock:
+            with self._lock:
+                trades, metrics = list(self._trades), list(self._metrics)
+                self._trades.clear()
+                self._metrics.clear()
+            if not trades and not metrics:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                with self.engine.begin() as conn:
+                    if trades:
+                        conn.execute(_insert_trades(self.engine.dialect.name), _merge_trades(trades))
+                    if metrics:
+                        conn.execute(insert(PerformanceMetric), metrics)
+            except Exception as e:
+                logger.error(f"Error writing {len(trades) + len(metrics)} buffered rows, will retry: {str(e)}")
+                with self._lock:
+                    self._stats["errors"] += 1
+                    self._trades.extendleft(reversed(trades))
+                    self._metrics.extendleft(reversed(metrics))
+                self._append(self._trades, [])  # Enforce max_pending
+                return 0
+
+            written = len(trades) + len(metrics)
+            with self._lock:
+                self._stats["written"] += written
+                self._stats["flushes"] += 1
+                self._stats["last_flush_ms"] = (time.perf_counter() - start) * 1000
+            return written
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def stats(self):
+        """
+        Return writer counters
+
+        Returns:
+            dict: pending rows, rows written, flushes, failed flushes, dropped rows and last flush time
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._trades) + len(self._metrics)
+        return stats
+
+    def close(self):
+        """Stop the background thread and write what is left"""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
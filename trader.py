@@ -0,0 +1,260 @@
+import os
+import sys
+import time
+import fcntl
+import signal
+import logging
+import argparse
+import threading
+import multiprocessing
+import numpy as np
+from collections import deque
+from config import (API_KEY, SECRET_KEY, BASE_URL, API_TIMEOUT, API_POOL_SIZE, TRADER_LOOP_INTERVAL,
+                    METRICS_INTERVAL, ORDER_POLL_INTERVAL)
+from api_client import RoostooClient
+from rate_limiter import RequestLimiter
+from trader_state import TraderState
+from scheduler import DeadlineScheduler, SKIP
+from database import make_engine, create_tables
+from trade_store import TradeWriter
+from order_manager import OrderManager, is_final_execution
+from order_sync import order_record
+from metrics import REGISTRY
+from structured_logging import setup_logging, stop_logging
+from portfolio_engine import PortfolioEngine
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the start/stop request (and heartbeats)
+CONTROL_POLL_INTERVAL = 1.0
+
+# Longest delay before the supervisor restarts a crashed trader
+MAX_RESTART_DELAY = 60.0
+
+# Exit code of a trader that found another one holding the state lock (not restarted)
+LOCK_HELD_EXIT = 3
+
+# PerformanceMetric snapshots used for the rolling Sharpe ratio
+SHARPE_WINDOW = 1440
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+class Trader:
+    """Trading loop run by the dedicated trader process
+    
+    Web workers only flip the requested state in TraderState. A DeadlineScheduler
+    polls that request (and publishes the heartbeat) every CONTROL_POLL_INTERVAL and,
+    while trading is requested, runs a step on every ``interval`` boundary of the
+    wall clock. Deadlines are fixed, so slow exchange calls do not make the loop drift;
+    overrun steps are skipped rather than bunched up. Each step is one PortfolioEngine
+    cycle across every pair in ``pairs``. Orders go through an OrderManager
+    that reconciles open orders every ORDER_POLL_INTERVAL, trades are recorded from its
+    fill events, and they and a PerformanceMetric snapshot every ``metrics_interval``
+    go to the buffered TradeWriter.
+    """
+    
+    def __init__(self, api_client, state, writer, interval=TRADER_LOOP_INTERVAL, pairs=None,
+                 metrics_interval=METRICS_INTERVAL):
+        self.api_client = api_client
+        self.state = state
+        self.writer = writer
+        self.interval = interval
+        self.metrics_interval = metrics_interval
+        self.trading = False
+        self.cycles = 0
+        self.last_cycle = None
+        self.market_state = None
+        self.total_trades = 0
+        self.profitable_trades = 0
+        self.position = 0.0  # Base currency bought by this trader and not sold yet
+        self.position_cost = 0.0
+        self.portfolio_values = deque(maxlen=SHARPE_WINDOW)
+        self.scheduler = DeadlineScheduler()
+        # Adopts open orders left by a previous run or placed from the dashboard
+        self.orders = OrderManager(api_client, adopt=True)
+        self.orders.add_listener(self._on_order_event)
+        self.engine = PortfolioEngine(api_client, self.orders, pairs)
+    
+    def _publish(self, running=True):
+        self.state.publish_status(running=running, trading=self.trading, cycles=self.cycles,
+                                  last_cycle=self.last_cycle, interval=self.interval,
+                                  schedules=self.scheduler.stats(), storage=self.writer.stats(),
+                                  orders=self.orders.stats(), portfolio=self.engine.stats(),
+                                  rate_limits=self.api_client.get_rate_limit_stats())
+        self.state.publish_metrics(REGISTRY.collect())
+    
+    def _poll_control(self):
+        self.trading = self.state.trading_requested()
+        self._publish()
+    
+    def _record_trade(self, record):
+        """Attach the realized P&L of sells against the average buy price and buffer the trade"""
+        quantity, price = record["quantity"], record["price"]
+        if record["side"] == "BUY":
+            self.position += quantity
+            self.position_cost += quantity * price
+        elif self.position > 0:
+            sold = min(quantity, self.position)
+            average_price = self.position_cost / self.position
+            record["profit_loss"] = sold * (price - average_price)
+            self.position -= sold
+            self.position_cost -= sold * average_price
+            if record["profit_loss"] > 0:
+                self.profitable_trades += 1
+        self.total_trades += 1
+        self.writer.add_trade(record)
+    
+    def _on_order_event(self, event, order):
+        logger.info("Order %s %s: %s", order.get("OrderID"), event, order.get("Status"),
+                    extra={"order_id": order.get("OrderID"), "event": event, "status": order.get("Status")})
+        if is_final_execution(event, order):
+            self._record_trade(order_record(order))
+    
+    def _trading_step(self):
+        if not self.trading:
+            return
+        market_state = self.engine.run_cycle()
+        if market_state is not None:
+            self.market_state = market_state
+        self.cycles += 1
+        self.last_cycle = time.time()
+    
+    def _sharpe_ratio(self):
+        """Annualized Sharpe ratio of the returns between snapshots, None until there are enough"""
+        if len(self.portfolio_values) < 3:
+            return None
+        values = np.array(self.portfolio_values)
+        returns = np.diff(values) / values[:-1]
+        std = returns.std()
+        if std == 0:
+            return None
+        return float(returns.mean() / std * np.sqrt(SECONDS_PER_YEAR / self.metrics_interval))
+    
+    def _record_metrics(self):
+        if not self.trading or self.market_state is None:
+            return
+        btc_balance = self.market_state["holdings"].get("BTC", 0.0)
+        usd_balance = self.market_state["cash"]
+        portfolio_value = self.market_state["portfolio_value"]
+        if portfolio_value > 0:
+            self.portfolio_values.append(portfolio_value)
+        self.writer.add_metric(portfolio_value=portfolio_value, btc_balance=btc_balance,
+                               usd_balance=usd_balance, total_trades=self.total_trades,
+                               profitable_trades=self.profitable_trades, sharpe_ratio=self._sharpe_ratio())
+    
+    def run(self):
+        """Run until ``stop`` is called"""
+        logger.info(f"Trader started (pid {os.getpid()}, interval {self.interval}s)")
+        self.scheduler.add("control", CONTROL_POLL_INTERVAL, self._poll_control)
+        self.scheduler.add("trading", self.interval, self._trading_step, policy=SKIP, align=True)
+        self.scheduler.add("orders", ORDER_POLL_INTERVAL, self.orders.poll, policy=SKIP)
+        self.scheduler.add("metrics", self.metrics_interval, self._record_metrics, policy=SKIP)
+        self._poll_control()
+        self.scheduler.run()
+        self.trading = False
+        self._publish(running=False)
+        logger.info("Trader stopped")
+    
+    def stop(self):
+        """Ask the loop to exit after the current step"""
+        self.scheduler.stop()
+
+
+def run_worker(interval=TRADER_LOOP_INTERVAL):
+    """
+    Run the trading loop in this process
+    
+    Holds an exclusive lock next to the state database so only one trader runs per state file.
+    
+    Returns:
+        int: Exit code (LOCK_HELD_EXIT if another trader holds the lock)
+    """
+    state = TraderState()
+    lock_file = open(state.path + ".lock", "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        logger.error(f"Another trader already holds {state.path}.lock")
+        lock_file.close()
+        return LOCK_HELD_EXIT
+    
+    engine = make_engine()
+    create_tables(engine)
+    writer = TradeWriter(engine)
+    api_client = RoostooClient(API_KEY, SECRET_KEY, BASE_URL, timeout=API_TIMEOUT, max_connections=API_POOL_SIZE,
+                               limiter=RequestLimiter())
+    trader = Trader(api_client, state, writer, interval=interval)
+    signal.signal(signal.SIGTERM, lambda signum, frame: trader.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: trader.stop())
+    try:
+        trader.run()
+    finally:
+        api_client.close()
+        writer.close()  # Writes trades still buffered
+        engine.dispose()
+        state.close()
+        lock_file.close()
+    return 0
+
+
+def _worker_main(interval):
+    try:
+        sys.exit(run_worker(interval))
+    finally:
+        stop_logging()
+
+
+def supervise(interval=TRADER_LOOP_INTERVAL):
+    """
+    Run the trader in a child process and restart it with backoff when it dies
+    
+    A trader that exits because another one holds the state lock is not restarted.
+    
+    Returns:
+        int: Exit code
+    """
+    stopping = threading.Event()
+    process = None
+    
+    def shutdown(signum, frame):
+        stopping.set()
+        if process is not None and process.is_alive():
+            process.terminate()
+    
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    
+    delay = 1.0
+    while not stopping.is_set():
+        started = time.monotonic()
+        process = multiprocessing.Process(target=_worker_main, args=(interval,), name="trader")
+        process.start()
+        process.join()
+        if stopping.is_set() or process.exitcode == 0:
+            break
+        if process.exitcode == LOCK_HELD_EXIT:
+            logger.error("Another trader is already running, not restarting")
+            return LOCK_HELD_EXIT
+        if time.monotonic() - started > MAX_RESTART_DELAY:
+            delay = 1.0  # It ran for a while; restart quickly
+        logger.warning(f"Trader exited with code {process.exitcode}, restarting in {delay:.0f}s")
+        stopping.wait(delay)
+        delay = min(delay * 2, MAX_RESTART_DELAY)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the trading loop in a dedicated process')
+    parser.add_argument('--interval', type=float, default=TRADER_LOOP_INTERVAL,
+                        help=f'Seconds between trading steps (default: {TRADER_LOOP_INTERVAL})')
+    parser.add_argument('--no-supervise', action='store_true', help='Run without the restarting supervisor')
+    args = parser.parse_args()
+    
+    setup_logging()
+    if args.no_supervise:
+        sys.exit(run_worker(args.interval))
+    sys.exit(supervise(args.interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from config import TRADER_STATE_PATH, TRADER_HEARTBEAT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS control (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class TraderState:
+    """Trading state shared between the web workers and the trader process
+
+    A small SQLite database (WAL mode) is the IPC channel: web workers write the
+    requested run state and read the status; the trader process reads the request
+    and publishes a heartbeat with its status. Trades are stored with the models
+    (see trade_store.py). Every process and thread gets its own connection.
+    """
+
+    def __init__(self, path=TRADER_STATE_PATH):
+        """
+        Open (and create if needed) the state database
+
+        Args:
+            path (str, optional): SQLite file. Defaults to TRADER_STATE_PATH.
+        """
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _get(self, key, default=None):
+        row = self._connection().execute("SELECT value FROM control WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set(self, key, value):
+        self._connection().execute(
+            "INSERT INTO control (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value))
+        )
+
+    def request_trading(self, active):
+        """Ask the trader process to start or stop trading"""
+        self._set("trading_requested", bool(active))
+
+    def trading_requested(self):
+        """Whether trading has been requested from the web tier"""
+        return self._get("trading_requested", False)
+
+    def publish_status(self, **status):
+        """Record the trader's status together with a heartbeat (called by the trader process)"""
+        status.update(pid=os.getpid(), heartbeat=time.time())
+        self._set("trader_status", status)
+
+    def status(self):
+        """
+        Return the trader's last published status
+
+        Returns:
+            dict: Published fields plus ``requested``, ``trader_ready`` (running, with a
+                heartbeat newer than TRADER_HEARTBEAT_TIMEOUT) and ``is_active`` (ready and trading)
+        """
+        status = self._get("trader_status", {})
+        fresh = time.time() - status.get("heartbeat", 0) < TRADER_HEARTBEAT_TIMEOUT
+        ready = status.get("running", False) and fresh
+        status["requested"] = self.trading_requested()
+        status["trader_ready"] = ready
+        status["is_active"] = ready and status.get("trading", False)
+        return status
+
+    def publish_metrics(self, families):
+        """Record the trader's metric families (kept apart from the status, which is read far more often)"""
+        self._set("trader_metrics", families)
+
+    def metrics(self):
+        """Return the metric families last published by the trader"""
+        return self._get("trader_metrics", [])
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -1,16 +1,15 @@
 import os
 import numpy as np
 import pandas as pd
-import yfinance as yf
 import time
 from datetime import datetime, timedelta
 import logging
-from stable_baselines3 import PPO
-import ta
 
-from trading_env import TradingEnv
 from api_client import RoostooClient
 from data_processor import preprocess_data, fetch_historical_data
+from price_history import PriceHistory
+from policy_export import load_policy, export_policy, EXPORT_SUFFIX
+from metrics import STAGE_SECONDS, CYCLE_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +17,7 @@ class TradingBot:
     """
     Trading bot that uses a trained PPO model to make trading decisions.
     """
-    def __init__(self, api_client, trading_pair="BTC/USD", risk_level=0.02):
+    def __init__(self, api_client, trading_pair="BTC/USD", risk_level=0.02, model=None):
         self.api_client = api_client
         self.trading_pair = trading_pair
         self.risk_level = risk_level
@@ -26,7 +25,7 @@ class TradingBot:
         self.base = trading_pair.split('/')[1]
         
         # Model parameters
-        self.model = None
+        self.model = model
         self.env = None
         self.window_size = 20
         
@@ -35,18 +34,22 @@ class TradingBot:
         self.position = 0  # 0: no position, 1: long position
         self.last_observation = None
         
-        # Initialize by loading or training a model
-        self._initialize_model()
+        # Live OHLCV bars built from the ticker polled each cycle
+        self.price_history = PriceHistory()
+        
+        # Initialize by loading or training a model, unless one is given
+        if model is None:
+            self._initialize_model()
     
     def _initialize_model(self):
         """Initialize the trading model by loading or training a new one"""
         model_path = f"ppo_trading_{self.coin.lower()}"
         
-        # Try to load a pre-trained model
-        if os.path.exists(f"{model_path}.zip"):
-            logger.info(f"Loading pre-trained model from {model_path}.zip")
+        # Try to load a pre-trained model (the exported NumPy policy when available)
+        if os.path.exists(f"{model_path}{EXPORT_SUFFIX}") or os.path.exists(f"{model_path}.zip"):
+            logger.info(f"Loading pre-trained model from {model_path}")
             try:
-                self.model = PPO.load(model_path)
+                self.model = load_policy(model_path)
                 logger.info("Model loaded successfully")
             except Exception as e:
                 logger.error(f"Error loading model: {str(e)}")
@@ -57,6 +60,9 @@ class TradingBot:
     
     def _train_new_model(self, model_path):
         """Train a new PPO model on historical data"""
+        from stable_baselines3 import PPO
+        from trading_env import TradingEnv
+        
         logger.info("Fetching historical data for training...")
         
         try:
@@ -92,6 +98,7 @@ class TradingBot:
             
             # Save the trained model
             self.model.save(model_path)
+            export_policy(self.model, model_path)
             logger.info(f"Model trained and saved as {model_path}.zip")
             
         except Exception as e:
@@ -110,37 +117,28 @@ class TradingBot:
             )
             self.model = PPO("MlpPolicy", self.env, verbose=0)
     
-    def _prepare_observation(self, market_data):
-        """Prepare the observation vector from market data"""
+    def _prepare_observation(self, market_data, balance_data):
+        """Prepare the observation vector from market data and the wallet balance"""
         try:
             # Extract price data
             current_price = market_data.get("LastPrice", 0)
-            price_history = self._get_price_history()
+            bars = self.price_history.window(self.window_size)
             
-            if len(price_history) < self.window_size:
-                logger.warning(f"Not enough price history data. Needed: {self.window_size}, Got: {len(price_history)}")
-                # Pad with current price if we don't have enough history
-                padding = [current_price] * (self.window_size - len(price_history))
-                price_history = padding + price_history
+            if len(bars) < self.window_size:
+                logger.warning("Not enough price history data. Needed: %d, Got: %d", self.window_size, len(bars))
+                # Pad with the oldest bar (or the current price) if we don't have enough history
+                if len(bars) > 0:
+                    bars = np.pad(bars, ((self.window_size - len(bars), 0), (0, 0)), mode='edge')
+                else:
+                    bars = np.full((self.window_size, 5), float(current_price))
             
-            # Get wallet balance
-            balance_data = self.api_client.get_balance()
-            if not balance_data.get("Success", False):
-                logger.error(f"Failed to get balance: {balance_data.get('ErrMsg', 'Unknown error')}")
-                return None
-                
+            # Wallet balance fetched once per cycle by the caller
             wallet = balance_data.get("Wallet", {})
             base_balance = wallet.get(self.base, {}).get("Free", 0)
             coin_balance = wallet.get(self.coin, {}).get("Free", 0)
             
             # Create observation as expected by the model
-            df = pd.DataFrame({
-                'open': price_history,
-                'high': price_history,
-                'low': price_history,
-                'close': price_history,
-                'volume': [1.0] * len(price_history)  # Placeholder volume
-            })
+            df = pd.DataFrame(bars, columns=['open', 'high', 'low', 'close', 'volume'])
             
             # Process the data to add technical indicators
             df = self._add_indicators(df)
@@ -177,6 +175,8 @@ class TradingBot:
     
     def _add_indicators(self, frame):
         """Add technical indicators to the data frame"""
+        import ta
+        
         # Simple Moving Average
         frame['sma'] = ta.trend.sma_indicator(frame['close'], window=5)
         
@@ -199,38 +199,43 @@ class TradingBot:
     
     def _get_price_history(self):
         """Get price history for the window size period"""
-        # In a real implementation, you would fetch this from the API or a data provider
-        # For simplicity, we'll use a placeholder
-        return [100.0] * self.window_size
+        return self.price_history.closes(self.window_size)
     
     def execute_trading_cycle(self):
         """Execute one cycle of trading logic"""
+        start = time.perf_counter()
         try:
-            # 1. Fetch current market data
-            market_data = self.api_client.get_ticker(self.trading_pair)
+            # 1. Fetch market data and wallet balance concurrently
+            with STAGE_SECONDS.time("fetch"):
+                snapshot = self.api_client.get_snapshot(self.trading_pair)
+            market_data = snapshot["ticker"]
             if not market_data.get("Success", False):
-                logger.error(f"Failed to get ticker: {market_data.get('ErrMsg', 'Unknown error')}")
+                logger.error("Failed to get ticker: %s", market_data.get("ErrMsg", "Unknown error"))
                 return "HOLD", 0, 0, 0
             
             ticker_data = market_data.get("Data", {}).get(self.trading_pair, {})
             current_price = ticker_data.get("LastPrice", 0)
+            if current_price:
+                self.price_history.add_tick(current_price)
+            
+            balance_data = snapshot["balance"]
+            if not balance_data.get("Success", False):
+                logger.error("Failed to get balance: %s", balance_data.get("ErrMsg", "Unknown error"))
+                return "HOLD", current_price, 0, 0
             
             # 2. Prepare observation for the model
-            observation = self._prepare_observation(ticker_data)
+            with STAGE_SECONDS.time("observation"):
+                observation = self._prepare_observation(ticker_data, balance_data)
             if observation is None:
                 logger.error("Failed to prepare observation")
                 return "HOLD", current_price, 0, 0
             
             # 3. Get model prediction
             self.last_observation = observation
-            action, _states = self.model.predict(observation, deterministic=True)
+            with STAGE_SECONDS.time("predict"):
+                action, _states = self.model.predict(observation, deterministic=True)
             
-            # 4. Get current wallet balance
-            balance_data = self.api_client.get_balance()
-            if not balance_data.get("Success", False):
-                logger.error(f"Failed to get balance: {balance_data.get('ErrMsg', 'Unknown error')}")
-                return "HOLD", current_price, 0, 0
-                
+            # 4. Current wallet balance
             wallet = balance_data.get("Wallet", {})
             base_balance = wallet.get(self.base, {}).get("Free", 0)
             coin_balance = wallet.get(self.coin, {}).get("Free", 0)
@@ -249,40 +254,44 @@ class TradingBot:
                 quantity = min(position_size, max_buyable)
                 
                 if quantity * current_price >= 1.0:  # Minimum order value check
-                    logger.info(f"Placing BUY order for {quantity} {self.coin} at {current_price}")
-                    order_result = self.api_client.place_order(
-                        self.trading_pair, "BUY", quantity
-                    )
+                    logger.info("Placing BUY order for %s %s at %s", quantity, self.coin, current_price,
+                                extra={"pair": self.trading_pair, "side": "BUY", "quantity": quantity, "price": current_price})
+                    with STAGE_SECONDS.time("orders"):
+                        order_result = self.api_client.place_order(
+                            self.trading_pair, "BUY", quantity
+                        )
                     
                     if order_result.get("Success", False):
-                        logger.info(f"BUY order executed: {order_result}")
+                        logger.info("BUY order executed: %s", order_result, extra={"sample": True})
                         self.position = 1
                         self.last_action = 1
                         return "BUY", current_price, quantity, portfolio_value
                     else:
-                        logger.error(f"BUY order failed: {order_result.get('ErrMsg', 'Unknown error')}")
+                        logger.error("BUY order failed: %s", order_result.get("ErrMsg", "Unknown error"))
                 else:
-                    logger.info(f"BUY signal received but order too small: {quantity * current_price} {self.base}")
+                    logger.info("BUY signal received but order too small: %s %s", quantity * current_price, self.base)
             
             elif action == 2 and coin_balance > 0:  # SELL
                 # Calculate sell quantity
                 quantity = coin_balance  # Sell all
                 
                 if quantity * current_price >= 1.0:  # Minimum order value check
-                    logger.info(f"Placing SELL order for {quantity} {self.coin} at {current_price}")
-                    order_result = self.api_client.place_order(
-                        self.trading_pair, "SELL", quantity
-                    )
+                    logger.info("Placing SELL order for %s %s at %s", quantity, self.coin, current_price,
+                                extra={"pair": self.trading_pair, "side": "SELL", "quantity": quantity, "price": current_price})
+                    with STAGE_SECONDS.time("orders"):
+                        order_result = self.api_client.place_order(
+                            self.trading_pair, "SELL", quantity
+                        )
                     
                     if order_result.get("Success", False):
-                        logger.info(f"SELL order executed: {order_result}")
+                        logger.info("SELL order executed: %s", order_result, extra={"sample": True})
                         self.position = 0
                         self.last_action = 2
                         return "SELL", current_price, quantity, portfolio_value
                     else:
-                        logger.error(f"SELL order failed: {order_result.get('ErrMsg', 'Unknown error')}")
+                        logger.error("SELL order failed: %s", order_result.get("ErrMsg", "Unknown error"))
                 else:
-                    logger.info(f"SELL signal received but order too small: {quantity * current_price} {self.base}")
+                    logger.info("SELL signal received but order too small: %s %s", quantity * current_price, self.base)
             
             # No trade execution
             self.last_action = 0
@@ -291,3 +300,5 @@ class TradingBot:
         except Exception as e:
             logger.error(f"Error in trading cycle: {str(e)}")
             return "HOLD", 0, 0, 0
+        finally:
+            CYCLE_SECONDS.observe(time.perf_counter() - start)
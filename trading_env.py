@@ -1,18 +1,18 @@
 import gym
 from gym import spaces
 import numpy as np
-import pandas as pd
-import ta
 import logging
 import time
 from config import WINDOW_SIZE, INITIAL_BALANCE, REWARD_SCALING
+from feature_store import FeatureStore, build_feature_table, BALANCE_COL, CRYPTO_COL, POSITION_COL
+from price_history import PriceHistory
 
 logger = logging.getLogger(__name__)
 
 class TradingEnv(gym.Env):
     """Custom Gym environment for crypto trading with RL"""
     
-    def __init__(self, api_client=None, data=None, initial_balance=INITIAL_BALANCE, window_size=WINDOW_SIZE, pair='BTC/USD'):
+    def __init__(self, api_client=None, data=None, initial_balance=INITIAL_BALANCE, window_size=WINDOW_SIZE, pair='BTC/USD', features=None, price_history=None):
         super(TradingEnv, self).__init__()
         
         self.api_client = api_client  # For live trading
@@ -22,11 +22,23 @@ class TradingEnv(gym.Env):
         
         # For backtesting/training mode
         self.data = data
-        if data is not None:
+        if features is not None:
+            # Prebuilt (possibly shared-memory) features, no frame needed
+            self.features = features
+            self.prices = features.prices
+        elif data is not None:
             self.data = data.reset_index(drop=True)
-            self.prices = self.data['close'].values
+            # Indicators are precomputed once so each step is an indexed lookup
+            self.features = FeatureStore(self.data, window_size)
+            self.prices = self.features.prices
         else:
+            self.features = None
             self.prices = None
+
+        # Live bars built from ticker polling (only used without historical features)
+        if price_history is None and self.features is None:
+            price_history = PriceHistory()
+        self.price_history = price_history
             
         # Initialize portfolio state
         self.balance = initial_balance
@@ -50,7 +62,7 @@ class TradingEnv(gym.Env):
         self.balance = self.initial_balance
         self.crypto_owned = 0
         
-        if self.data is not None:
+        if self.features is not None:
             # For backtesting/training mode
             self.current_step = self.window_size
         else:
@@ -65,7 +77,7 @@ class TradingEnv(gym.Env):
         prev_portfolio_value = self._get_portfolio_value()
         
         # Get current price (either from data or live API)
-        if self.data is not None and self.current_step < len(self.data):
+        if self.features is not None and self.current_step < len(self.prices):
             # For backtesting/training mode
             current_price = self.prices[self.current_step]
             self.current_price = current_price
@@ -75,7 +87,7 @@ class TradingEnv(gym.Env):
                 try:
                     ticker_data = self.api_client.get_ticker(self.pair)
                     current_price = ticker_data['Data'][self.pair]['LastPrice']
-                    self.current_price = current_price
+                    self.update_price(current_price)
                 except Exception as e:
                     logger.error(f"Error getting current price: {e}")
                     # Return the previous state with negative reward if price fetching fails
@@ -88,7 +100,7 @@ class TradingEnv(gym.Env):
                 qty_to_buy = min(0.01, self.balance / current_price)  # At least 0.01 BTC or what we can afford
                 self.crypto_owned += qty_to_buy
                 self.balance -= qty_to_buy * current_price
-                logger.info(f"BUY {qty_to_buy} at {current_price}")
+                logger.debug("BUY %s at %s", qty_to_buy, current_price)
                 
                 # Record transaction in history
                 self.history.append({
@@ -105,7 +117,7 @@ class TradingEnv(gym.Env):
                 # Sell all owned crypto
                 self.balance += self.crypto_owned * current_price
                 
-                logger.info(f"SELL {self.crypto_owned} at {current_price}")
+                logger.debug("SELL %s at %s", self.crypto_owned, current_price)
                 
                 # Record transaction in history
                 self.history.append({
@@ -120,9 +132,9 @@ class TradingEnv(gym.Env):
                 self.crypto_owned = 0
         
         # Move to next step (for backtesting/training)
-        if self.data is not None:
+        if self.features is not None:
             self.current_step += 1
-            done = self.current_step >= len(self.data) - 1
+            done = self.current_step >= len(self.prices) - 1
         else:
             # For live trading, we're never "done"
             done = False
@@ -144,6 +156,12 @@ class TradingEnv(gym.Env):
         
         return obs, reward, done, info
     
+    def update_price(self, price, volume=0.0, timestamp=None):
+        """Record a live ticker price as the current price and in the bar history"""
+        self.current_price = price
+        if self.price_history is not None:
+            self.price_history.add_tick(price, volume, timestamp)
+
     def _get_portfolio_value(self):
         """Calculate total portfolio value"""
         if self.current_price is None:
@@ -152,68 +170,38 @@ class TradingEnv(gym.Env):
     
     def _get_price_history(self):
         """Get price history for observation"""
-        if self.data is not None:
+        if self.features is not None:
             # For backtesting/training mode
-            start_idx = max(0, self.current_step - self.window_size)
-            end_idx = self.current_step
-            return self.data.iloc[start_idx:end_idx]['close'].values
+            return self.features.price_window(self.current_step)
         else:
-            # For live trading, we need to fetch historical data from API
-            if self.api_client is not None:
-                try:
-                    # This would need to be implemented in the API client
-                    # For now, we'll just use the current price repeated
-                    return np.ones(self.window_size) * self.current_price
-                except Exception as e:
-                    logger.error(f"Error getting price history: {e}")
-                    return np.zeros(self.window_size)
+            # For live trading, a view of the bars built from ticker updates
+            if self.price_history is not None and len(self.price_history) > 0:
+                return self.price_history.closes(self.window_size)
             else:
                 return np.zeros(self.window_size)
     
     def _get_observation(self):
         """Construct the observation (state) for the agent"""
-        if self.data is not None:
-            # For backtesting/training mode
-            price_history = self._get_price_history()
-            
-            # Normalize the price history
-            if len(price_history) > 0 and price_history.max() > 0:
-                price_history = price_history / price_history.max()
-            
-            # Get technical indicators
-            if self.current_step >= self.window_size:
-                frame = self.data.iloc[self.current_step - self.window_size:self.current_step].copy()
-                frame['sma5'] = ta.trend.sma_indicator(frame['close'], window=5)
-                frame['sma20'] = ta.trend.sma_indicator(frame['close'], window=20)
-                frame['rsi'] = ta.momentum.rsi(frame['close'], window=14)
-                
-                # Fill NaN values
-                frame = frame.fillna(0)
-                
-                # Get the latest indicators
-                sma5 = frame['sma5'].iloc[-1] / frame['close'].max() if frame['close'].max() > 0 else 0
-                sma20 = frame['sma20'].iloc[-1] / frame['close'].max() if frame['close'].max() > 0 else 0
-                rsi = frame['rsi'].iloc[-1] / 100.0  # Normalize RSI to [0, 1]
-                
-                # Calculate MACD
-                macd = ta.trend.macd(frame['close'], window_slow=26, window_fast=12, window_sign=9)
-                macd_line = macd.iloc[-1] / frame['close'].max() if frame['close'].max() > 0 else 0
-                
-                # Volume indicators if available
-                volume_sma = 0
-                if 'volume' in frame.columns:
-                    volume_sma = ta.volume.volume_sma_indicator(frame['close'], frame['volume'], window=5)
-                    volume_sma = volume_sma.iloc[-1] if not pd.isna(volume_sma.iloc[-1]) else 0
-            else:
-                sma5, sma20, rsi, macd_line, volume_sma = 0, 0, 0, 0, 0
-        else:
-            # For live trading without historical data
-            # We'd need to implement this to fetch and calculate indicators from API
-            price_history = np.zeros(self.window_size)
-            sma5, sma20, rsi, macd_line, volume_sma = 0, 0, 0, 0, 0
+        balance_norm = self.balance / self.initial_balance if self.initial_balance > 0 else 0
+        
+        if self.features is not None:
+            # For backtesting/training mode, gather the precomputed features
+            return self.features.observation(self.current_step, balance_norm, self.crypto_owned)
+        
+        # For live trading, compute the same features from the live bar window
+        if self.price_history is not None and len(self.price_history) >= self.window_size:
+            w = self.window_size
+            obs = build_feature_table(self.price_history.closes(w), self.price_history.volumes(w), w)[0]
+            obs[w + BALANCE_COL] = balance_norm
+            obs[w + CRYPTO_COL] = self.crypto_owned
+            obs[w + POSITION_COL] = 1 if self.crypto_owned > 0 else 0
+            return obs
+
+        # Not enough live history yet
+        price_history = np.zeros(self.window_size)
+        sma5, sma20, rsi, macd_line, volume_sma = 0, 0, 0, 0, 0
         
         # Combine all features
-        balance_norm = self.balance / self.initial_balance if self.initial_balance > 0 else 0
         crypto_owned_norm = self.crypto_owned
         
         # Create observation vector
@@ -9,7 +9,10 @@ import argparse
 from datetime import datetime
 
 from trading_env import TradingEnv
+from vec_trading_env import VecTradingEnv
+from parallel_env import SharedSubprocVecEnv, ThroughputCallback
 from utils import fetch_historical_data, preprocess_data, normalize_data, split_data_train_test, calculate_sharpe_ratio
+from policy_export import export_policy
 from config import WINDOW_SIZE, INITIAL_BALANCE, MODEL_PATH
 
 # Set up logging
@@ -17,13 +20,25 @@ logging.basicConfig(level=logging.INFO,
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def train_model(data, model_path=MODEL_PATH, timesteps=100000, eval_freq=10000):
+def train_model(data, model_path=MODEL_PATH, timesteps=100000, eval_freq=10000, num_envs=1, parallel=False):
     """Train a PPO model on the provided data"""
-    # Create the environment
-    env = TradingEnv(data=data, initial_balance=INITIAL_BALANCE, window_size=WINDOW_SIZE)
-    
-    # Vectorize the environment
-    env = DummyVecEnv([lambda: env])
+    callback = None
+    if parallel:
+        # One worker process per env, all mapping the same precomputed features
+        env = SharedSubprocVecEnv(data, num_envs, window_size=WINDOW_SIZE, initial_balance=INITIAL_BALANCE)
+        callback = ThroughputCallback()
+        logger.info(f"Training on {num_envs} worker processes (features in {env.feature_dir})")
+    elif num_envs > 1:
+        # Step all portfolios in one batched NumPy call, each from a random start
+        env = VecTradingEnv(data, num_envs=num_envs, initial_balance=INITIAL_BALANCE,
+                            window_size=WINDOW_SIZE, random_start=True)
+        logger.info(f"Training on {num_envs} batched environments")
+    else:
+        # Create the environment
+        env = TradingEnv(data=data, initial_balance=INITIAL_BALANCE, window_size=WINDOW_SIZE)
+        
+        # Vectorize the environment
+        env = DummyVecEnv([lambda: env])
     
     # Create the model
     model = PPO(
@@ -46,12 +61,18 @@ def train_model(data, model_path=MODEL_PATH, timesteps=100000, eval_freq=10000):
     logger.info(f"Starting model training for {timesteps} timesteps...")
     
     # Train the model
-    model.learn(total_timesteps=timesteps)
+    try:
+        model.learn(total_timesteps=timesteps, callback=callback)
+    finally:
+        env.close()
     
     # Save the model
     model.save(model_path)
     logger.info(f"Model saved to {model_path}")
     
+    # Lightweight NumPy copy of the actor for live trading processes
+    export_policy(model, model_path)
+    
     return model
 
 def evaluate_model(model, env, episodes=10):
@@ -96,6 +117,8 @@ def main():
     parser.add_argument('--interval', type=str, default='5m', help='Data interval (default: 5m)')
     parser.add_argument('--timesteps', type=int, default=100000, help='Training timesteps (default: 100000)')
     parser.add_argument('--model-path', type=str, default=MODEL_PATH, help='Path to save model')
+    parser.add_argument('--num-envs', type=int, default=1, help='Number of training environments (default: 1)')
+    parser.add_argument('--parallel', action='store_true', help='Run each environment in its own worker process')
     args = parser.parse_args()
     
     # Create a unique model path with timestamp if not specified
@@ -123,7 +146,7 @@ def main():
         return
     
     # Train the model
-    model = train_model(train_data, args.model_path, args.timesteps)
+    model = train_model(train_data, args.model_path, args.timesteps, num_envs=args.num_envs, parallel=args.parallel)
     
     # Evaluate the model
     env = TradingEnv(data=test_data, initial_balance=INITIAL_BALANCE, window_size=WINDOW_SIZE)
@@ -0,0 +1,291 @@
+import time
+import queue
+import asyncio
+import threading
+import logging
+import http.client
+import urllib.request
+import urllib.parse
+import urllib.error
+import ssl
+from concurrent.futures import ThreadPoolExecutor
+from config import API_MAX_IDLE
+from metrics import EXCHANGE_REQUESTS, EXCHANGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean a kept-alive connection was closed by the server while idle
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+# Methods that can be resent safely when the connection dies after the request went out
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+
+class TransportMetrics:
+    """Thread-safe per-endpoint latency and connection counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all counters"""
+        with self._lock:
+            self.endpoints = {}
+            self.connections_opened = 0
+            self.connections_reused = 0
+            self.connect_time = 0.0
+            self.errors = 0
+
+    def record_connect(self, seconds):
+        """Record the time taken to open (TCP + TLS) a new connection"""
+        with self._lock:
+            self.connections_opened += 1
+            self.connect_time += seconds
+
+    def record_request(self, endpoint, seconds, reused=False, error=False, status=None):
+        """Record the latency of one request, and its HTTP status (None: no response) in the process metrics"""
+        EXCHANGE_REQUESTS.inc(endpoint, str(status) if status is not None else "error")
+        EXCHANGE_SECONDS.observe(seconds, endpoint)
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = {"count": 0, "total": 0.0, "min": float("inf"), "max": 0.0}
+            stats["count"] += 1
+            stats["total"] += seconds
+            stats["min"] = min(stats["min"], seconds)
+            stats["max"] = max(stats["max"], seconds)
+            if reused:
+                self.connections_reused += 1
+            if error:
+                self.errors += 1
+
+    def snapshot(self):
+        """Return a JSON-serializable copy of the counters (latencies in ms)"""
+        with self._lock:
+            endpoints = {
+                name: {
+                    "count": stats["count"],
+                    "avg_ms": stats["total"] / stats["count"] * 1000,
+                    "min_ms": stats["min"] * 1000,
+                    "max_ms": stats["max"] * 1000
+                }
+                for name, stats in self.endpoints.items()
+            }
+            return {
+                "endpoints": endpoints,
+                "connections_opened": self.connections_opened,
+                "connections_reused": self.connections_reused,
+                "avg_connect_ms": self.connect_time / self.connections_opened * 1000 if self.connections_opened else 0.0,
+                "errors": self.errors
+            }
+
+
+class Transport:
+    """Interface used by RoostooClient to send HTTP requests"""
+
+    def __init__(self, timeout=10.0, metrics=None):
+        self.timeout = timeout
+        self.metrics = metrics or TransportMetrics()
+
+    def request(self, method, url, headers=None, body=None):
+        """Send a request and return the response body
+
+        Args:
+            method (str): HTTP method
+            url (str): Absolute URL including any query string
+            headers (dict, optional): Request headers
+            body (bytes, optional): Request body
+
+        Returns:
+            bytes: Response body
+
+        Raises:
+            urllib.error.HTTPError: If the server answers with a 4xx/5xx status
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release any open connections"""
+        pass
+
+
+class UrllibTransport(Transport):
+    """One-shot urllib transport that opens a fresh connection per request"""
+
+    def request(self, method, url, headers=None, body=None):
+        req = urllib.request.Request(url, data=body, headers=headers or {}, method=method)
+        endpoint = urllib.parse.urlsplit(url).path
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                data = response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            self.metrics.record_request(endpoint, time.perf_counter() - start, error=True, status=e.code)
+            raise
+        except Exception:
+            self.metrics.record_request(endpoint, time.perf_counter() - start, error=True)
+            raise
+        self.metrics.record_request(endpoint, time.perf_counter() - start, status=status)
+        return data
+
+
+class ConnectionPool:
+    """Bounded pool of keep-alive connections to a single host
+
+    Connections idle for more than ``max_idle`` seconds are closed instead of reused:
+    the server may already have dropped them, and a non-idempotent request that dies
+    on such a connection after being sent cannot be retried.
+    """
+
+    def __init__(self, scheme, host, port, maxsize, timeout, metrics, max_idle=API_MAX_IDLE):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.metrics = metrics
+        self.max_idle = max_idle
+        self._idle = queue.LifoQueue()  # (connection, time.monotonic() when released)
+        self._slots = threading.BoundedSemaphore(maxsize)
+        self._ssl_context = ssl.create_default_context() if scheme == "https" else None
+
+    def _new_connection(self):
+        if self._ssl_context is not None:
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout, context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        start = time.perf_counter()
+        conn.connect()
+        self.metrics.record_connect(time.perf_counter() - start)
+        return conn
+
+    def acquire(self):
+        """Take an idle connection (or open one) once a pool slot is free
+
+        Returns:
+            tuple: (connection, reused)
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No free connection to {self.host} within {self.timeout}s")
+        now = time.monotonic()
+        while True:
+            try:
+                conn, released = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if now - released <= self.max_idle:
+                return conn, True
+            # Newest first, so every connection left in the queue has idled even longer
+            conn.close()
+        try:
+            return self._new_connection(), False
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn, reusable=True):
+        """Return a connection to the pool, or close it if it can't be reused"""
+        if reusable:
+            self._idle.put((conn, time.monotonic()))
+        else:
+            conn.close()
+        self._slots.release()
+
+    def close(self):
+        """Close all idle connections"""
+        while True:
+            try:
+                self._idle.get_nowait()[0].close()
+            except queue.Empty:
+                return
+
+
+class PooledTransport(Transport):
+    """Transport that reuses keep-alive HTTP connections from a bounded pool per host"""
+
+    def __init__(self, timeout=10.0, max_connections=4, metrics=None, max_idle=API_MAX_IDLE):
+        super(PooledTransport, self).__init__(timeout, metrics)
+        self.max_connections = max_connections
+        self.max_idle = max_idle
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _pool_for(self, scheme, host, port):
+        key = (scheme, host, port)
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    pool = self._pools[key] = ConnectionPool(
+                        scheme, host, port, self.max_connections, self.timeout, self.metrics, self.max_idle
+                    )
+        return pool
+
+    def request(self, method, url, headers=None, body=None):
+        parts = urllib.parse.urlsplit(url)
+        pool = self._pool_for(parts.scheme, parts.hostname, parts.port)
+        target = f"{parts.path}?{parts.query}" if parts.query else parts.path
+        start = time.perf_counter()
+
+        conn, reused = pool.acquire()
+        try:
+            sent = False
+            try:
+                conn.request(method, target, body=body, headers=headers or {})
+                sent = True
+                response = conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                # A request that went out may have been executed (e.g. an order placed before
+                # the reset), so only idempotent methods are resent once it was sent. The pool's
+                # max_idle keeps connections the server has likely dropped from getting here.
+                if not reused or (sent and method.upper() not in IDEMPOTENT_METHODS):
+                    raise
+                # The server dropped the idle connection; retry once on a fresh one
+                logger.debug("Stale connection to %s, reconnecting", parts.hostname)
+                conn.close()
+                conn = pool._new_connection()
+                reused = False
+                conn.request(method, target, body=body, headers=headers or {})
+                response = conn.getresponse()
+            data = response.read()
+        except Exception:
+            pool.release(conn, reusable=False)
+            self.metrics.record_request(parts.path, time.perf_counter() - start, reused, error=True)
+            raise
+
+        pool.release(conn, reusable=not response.will_close)
+        self.metrics.record_request(parts.path, time.perf_counter() - start, reused, error=response.status >= 400,
+                                    status=response.status)
+
+        if response.status >= 400:
+            raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+        return data
+
+    def close(self):
+        with self._lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
+
+
+class AsyncTransport:
+    """Awaitable adapter that runs a blocking Transport on a thread pool
+
+    Concurrent coroutines each get their own pooled connection, so independent
+    requests overlap instead of queueing behind one another.
+    """
+
+    def __init__(self, transport, max_workers=4):
+        self.transport = transport
+        self.metrics = transport.metrics
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="roostoo-io")
+
+    async def request(self, method, url, headers=None, body=None):
+        """Send a request without blocking the event loop (see Transport.request)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.transport.request, method, url, headers, body)
+
+    def close(self):
+        self.transport.close()
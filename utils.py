@@ -1,17 +1,18 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import logging
 from datetime import datetime, timedelta
-import ta
+import data_processor
 from config import SMA_PERIODS, RSI_PERIOD
 
 logger = logging.getLogger(__name__)
 
 def fetch_historical_data(symbol="BTC-USD", period="1mo", interval="5m"):
-    """Fetch historical price data from Yahoo Finance"""
+    """Fetch historical price data from Yahoo Finance (through the local OHLCV cache)"""
     try:
-        data = yf.download(symbol, period=period, interval=interval)
+        data = data_processor.fetch_historical_data(symbol, period, interval)
+        if data is None:
+            raise ValueError(f"No data available for {symbol}")
         data.columns = [col.lower() for col in data.columns]  # Convert column names to lowercase
         data = data.reset_index()
         data.rename(columns={"date": "timestamp"}, inplace=True)
@@ -23,6 +24,8 @@ def fetch_historical_data(symbol="BTC-USD", period="1mo", interval="5m"):
 
 def preprocess_data(data):
     """Preprocess and calculate technical indicators for the data"""
+    import ta
+    
     if data.empty:
         logger.error("Cannot preprocess empty data")
         return data
@@ -131,4 +134,5 @@ def split_data_train_test(data, test_size=0.2):
 def log_trade(side, price, quantity, balance, crypto_owned):
     """Log a trade with timestamp"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    logger.info(f"[{timestamp}] {side} {quantity:.8f} BTC at ${price:.2f} - Balance: ${balance:.2f}, BTC: {crypto_owned:.8f}")
+    logger.info("[%s] %s %.8f BTC at $%.2f - Balance: $%.2f, BTC: %.8f", timestamp, side, quantity, price, balance,
+                crypto_owned, extra={"side": side, "quantity": quantity, "price": price})
@@ -0,0 +1,186 @@
+import numpy as np
+import logging
+from gymnasium import spaces
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+from config import WINDOW_SIZE, INITIAL_BALANCE, REWARD_SCALING
+from feature_store import FeatureStore, NUM_EXTRA_FEATURES
+
+logger = logging.getLogger(__name__)
+
+# Fixed order size used by TradingEnv for BUY actions
+ORDER_SIZE = 0.01
+
+
+class VecTradingEnv(VecEnv):
+    """Batched trading environment advancing N independent portfolios per step
+
+    Each portfolio follows the same rules as ``TradingEnv`` (BUY 0.01, SELL all,
+    reward is the scaled change in portfolio value) but the state of all of them
+    lives in arrays of shape (N,), so a single NumPy step serves every env.
+    Portfolios can trade different symbols and/or start at different offsets.
+    """
+
+    def __init__(self, data, num_envs=None, initial_balance=INITIAL_BALANCE, window_size=WINDOW_SIZE,
+                 start_steps=None, random_start=False, seed=None):
+        """
+        Initialize the batched environment
+
+        Args:
+            data (pd.DataFrame or list): Price data, or one frame per symbol
+            num_envs (int, optional): Number of portfolios. Defaults to one per frame.
+            initial_balance (float): Starting cash for every portfolio
+            window_size (int): Number of past bars in each observation
+            start_steps (array-like, optional): Episode start step for each env
+            random_start (bool): Draw a random start step on every reset
+            seed (int, optional): Seed for random starts
+        """
+        frames = data if isinstance(data, (list, tuple)) else [data]
+        if num_envs is None:
+            num_envs = len(frames)
+
+        self.initial_balance = initial_balance
+        self.window_size = window_size
+        self.random_start = random_start
+        self.np_random = np.random.default_rng(seed)
+
+        # Stack every symbol's feature table so one gather serves all envs
+        stores = [FeatureStore(frame.reset_index(drop=True), window_size) for frame in frames]
+        lengths = np.array([len(store.prices) for store in stores])
+        price_offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        row_offsets = np.concatenate([[0], np.cumsum([len(store) for store in stores])[:-1]])
+        self.prices = np.concatenate([store.prices for store in stores])
+        self.table = np.concatenate([store.table for store in stores])
+
+        # Env i trades symbol i modulo the number of frames
+        symbol = np.arange(num_envs) % len(stores)
+        self.price_offset = price_offsets[symbol]
+        self.row_offset = row_offsets[symbol]
+        self.data_length = lengths[symbol]
+
+        if start_steps is None:
+            self.start_steps = np.full(num_envs, window_size, dtype=np.int64)
+        else:
+            self.start_steps = np.asarray(start_steps, dtype=np.int64)
+            if np.any(self.start_steps < window_size) or np.any(self.start_steps >= self.data_length - 1):
+                raise ValueError("start_steps must lie in [window_size, len(data) - 1)")
+
+        # Portfolio state, one entry per env
+        self.balance = np.full(num_envs, initial_balance, dtype=np.float64)
+        self.crypto_owned = np.zeros(num_envs, dtype=np.float64)
+        self.current_step = self.start_steps.copy()
+        self.current_price = np.full(num_envs, np.nan)
+
+        self._actions = None
+        self._env_index = np.arange(num_envs)
+
+        observation_space = spaces.Box(
+            low=-np.inf, high=np.inf, shape=(window_size + NUM_EXTRA_FEATURES,), dtype=np.float32
+        )
+        super(VecTradingEnv, self).__init__(num_envs, observation_space, spaces.Discrete(3))
+
+    def _reset_envs(self, mask):
+        """Reset the portfolios selected by a boolean mask"""
+        self.balance[mask] = self.initial_balance
+        self.crypto_owned[mask] = 0
+        self.current_price[mask] = np.nan
+        if self.random_start:
+            self.current_step[mask] = self.np_random.integers(self.window_size, self.data_length[mask] - 1)
+        else:
+            self.current_step[mask] = self.start_steps[mask]
+
+    def _portfolio_value(self):
+        """Calculate total portfolio value of every env"""
+        # Before the first step there is no price yet, as in TradingEnv
+        return np.where(np.isnan(self.current_price), self.balance,
+                        self.balance + self.crypto_owned * self.current_price)
+
+    def _get_observations(self):
+        """Gather the observation of every env in one indexed lookup"""
+        w = self.window_size
+        obs = self.table[self.row_offset + self.current_step - w]
+        obs[:, w] = self.balance / self.initial_balance if self.initial_balance > 0 else 0
+        obs[:, w + 1] = self.crypto_owned
+        obs[:, w + 7] = self.crypto_owned > 0
+        return obs
+
+    def reset(self):
+        """Reset every portfolio and return the batched observation"""
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self._get_observations()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions).reshape(self.num_envs)
+
+    def step_wait(self):
+        """Apply the pending actions to every portfolio at once"""
+        actions = self._actions
+        prev_value = self._portfolio_value()
+
+        price = self.prices[self.price_offset + self.current_step]
+        self.current_price = price
+
+        # BUY: fixed order size when cash covers the minimum order
+        buy = (actions == 1) & (self.balance >= price * ORDER_SIZE)
+        qty = np.minimum(ORDER_SIZE, self.balance / price)
+        self.crypto_owned = np.where(buy, self.crypto_owned + qty, self.crypto_owned)
+        self.balance = np.where(buy, self.balance - qty * price, self.balance)
+
+        # SELL: liquidate the whole position
+        sell = (actions == 2) & (self.crypto_owned > 0)
+        self.balance = np.where(sell, self.balance + self.crypto_owned * price, self.balance)
+        self.crypto_owned = np.where(sell, 0.0, self.crypto_owned)
+
+        self.current_step += 1
+        dones = self.current_step >= self.data_length - 1
+
+        new_value = self._portfolio_value()
+        rewards = ((new_value - prev_value) * REWARD_SCALING).astype(np.float32)
+        obs = self._get_observations()
+
+        infos = [
+            {
+                'portfolio_value': new_value[i],
+                'balance': self.balance[i],
+                'crypto_owned': self.crypto_owned[i],
+                'current_price': price[i]
+            }
+            for i in self._env_index
+        ]
+
+        # Auto-reset finished episodes as SB3 vectorized envs do
+        if dones.any():
+            for i in np.flatnonzero(dones):
+                infos[i]['terminal_observation'] = obs[i].copy()
+            self._reset_envs(dones)
+            obs[dones] = self._get_observations()[dones]
+
+        return obs, rewards, dones, infos
+
+    def close(self):
+        pass
+
+    def seed(self, seed=None):
+        self.np_random = np.random.default_rng(seed)
+        return [seed] * self.num_envs
+
+    def get_attr(self, attr_name, indices=None):
+        """Return an attribute for each selected env (array attributes are split per env)"""
+        value = getattr(self, attr_name)
+        indices = self._get_indices(indices)
+        if isinstance(value, np.ndarray) and value.shape[:1] == (self.num_envs,):
+            return [value[i] for i in indices]
+        return [value for _ in indices]
+
+    def set_attr(self, attr_name, value, indices=None):
+        current = getattr(self, attr_name)
+        if isinstance(current, np.ndarray) and current.shape[:1] == (self.num_envs,):
+            current[list(self._get_indices(indices))] = value
+        else:
+            setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]